@@ -7,6 +7,7 @@ and expense tracking functionalities through various subpackages.
 Subpackages
 -----------
 - api: Provides FastAPI endpoints for interacting with the backend.
+- benchmarks: Measures performance of the backend.
 - auth_app: Handles user authentication and authorization using AWS Cognito.
 - entries_app: Manages budget entries, transactions, and related data.
 - reports_app: Generates and manages financial reports.
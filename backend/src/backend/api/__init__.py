@@ -6,6 +6,7 @@ for handling user authentication, budget entries, and reports.
 
 Modules
 -------
+    - `dependencies`: Provides services shared by requests.
     - `auth`: Handles user authentication via AWS Cognito.
     - `entries`: Manages budget entries creation, reading, updating, deletion.
     - `reports`: Provides report generation and retrieval functionality.
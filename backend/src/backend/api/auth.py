@@ -10,21 +10,21 @@ import logging
 from custom_logging import config_logging
 from fastapi import APIRouter
 
-from backend.auth_app.cognito_client import CognitoClient
+from backend.api.dependencies import CognitoClientDep
 from backend.auth_app.models import UserConfirm, UserLogin
-from backend.auth_app.settings import AuthSettings
 
 logger = logging.getLogger(__name__)
 
 
 config_logging()
-settings = AuthSettings()
-cognito_client = CognitoClient(settings)
 auth_router = APIRouter()
 
 
 @auth_router.post('/register')
-def register(user: UserLogin) -> dict[str, str]:
+def register(
+    user: UserLogin,
+    cognito_client: CognitoClientDep,
+) -> dict[str, str]:
     """
     Register a new user with AWS Cognito.
 
@@ -32,6 +32,8 @@ def register(user: UserLogin) -> dict[str, str]:
     ----------
     user : UserLogin
         The user credentials (username and password) for registration.
+    cognito_client : CognitoClient
+        The shared client of AWS Cognito.
 
     Returns
     -------
@@ -44,7 +46,10 @@ def register(user: UserLogin) -> dict[str, str]:
 
 
 @auth_router.post('/confirm')
-def confirm(user: UserConfirm) -> dict[str, str]:
+def confirm(
+    user: UserConfirm,
+    cognito_client: CognitoClientDep,
+) -> dict[str, str]:
     """
     Confirm user registration using a confirmation code.
 
@@ -52,6 +57,8 @@ def confirm(user: UserConfirm) -> dict[str, str]:
     ----------
     user : UserConfirm
         The username and confirmation code received via email.
+    cognito_client : CognitoClient
+        The shared client of AWS Cognito.
 
     Returns
     -------
@@ -64,7 +71,10 @@ def confirm(user: UserConfirm) -> dict[str, str]:
 
 
 @auth_router.post('/login')
-def login(user: UserLogin) -> dict[str, str]:
+def login(
+    user: UserLogin,
+    cognito_client: CognitoClientDep,
+) -> dict[str, str]:
     """
     Authenticate a user and return an authentication token.
 
@@ -72,6 +82,8 @@ def login(user: UserLogin) -> dict[str, str]:
     ----------
     user : UserLogin
         The user credentials (username and password) for authentication.
+    cognito_client : CognitoClient
+        The shared client of AWS Cognito.
 
     Returns
     -------
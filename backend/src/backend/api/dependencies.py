@@ -0,0 +1,243 @@
+"""
+Application-scoped services shared by API routes.
+
+This module defines a container creating the database engine, the S3 client
+and the services once per application, and FastAPI dependencies returning
+them. The container is created by the application lifespan and stored
+in the application state.
+
+"""
+import logging
+import time
+from typing import Annotated
+
+import sqlalchemy as sql
+from fastapi import Depends, Request
+from fastapi.concurrency import run_in_threadpool
+
+from backend.api.metrics import instrument_queries, instrument_s3_client
+from backend.auth_app.cognito_client import CognitoClient
+from backend.auth_app.settings import AuthSettings
+from backend.entries_app.async_budget_service import AsyncBudgetService
+from backend.entries_app.budget_service import BudgetService
+from backend.entries_app.db_engine import (
+    create_postgres_database,
+    create_schema,
+    get_async_engine,
+    get_engine,
+    query_profiler,
+)
+from backend.entries_app.search import has_trigram_search
+from backend.entries_app.settings import DBSettings
+from backend.jobs_app.job_queue import JobQueue
+from backend.jobs_app.settings import JobsSettings
+from backend.reports_app.reports_service import ReportsService
+from backend.reports_app.s3client import S3Client
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Container of long-lived objects shared by requests.
+
+    Attributes
+    ----------
+    engine : sql.Engine
+        SQLAlchemy database engine.
+    s3client : S3Client
+        Interface for interacting with S3 storage.
+    budget_service : BudgetService
+        Service managing budget entries.
+    async_budget_service : AsyncBudgetService
+        Asynchronous service managing budget entries. It uses
+        asyncpg if `db_async_mode` is enabled, and the threadpool
+        otherwise.
+    reports_service : ReportsService
+        Service generating and retrieving financial reports.
+    cognito_client : CognitoClient
+        Client for interacting with AWS Cognito.
+    job_queue : JobQueue
+        Queue running uploads and report generation in the background.
+
+    """
+
+    def __init__(self, engine: sql.Engine | None = None) -> None:
+        """
+        Initialize the ServiceContainer.
+
+        Parameters
+        ----------
+        engine : sql.Engine, optional
+            SQLAlchemy database engine. By default, it is created
+            with database settings.
+
+        """
+        self.engine = engine if engine is not None else get_engine()
+        self.s3client = S3Client()
+        self.budget_service = BudgetService(self.engine)
+        self.async_budget_service = AsyncBudgetService(
+            budget_service=self.budget_service,
+            engine=get_async_engine() if DBSettings().db_async_mode else None,
+        )
+        self.reports_service = ReportsService(
+            self.engine,
+            s3client=self.s3client,
+        )
+        self.cognito_client = CognitoClient(AuthSettings())
+        jobs_settings = JobsSettings()
+        self.job_queue = JobQueue(
+            self.engine,
+            max_workers=jobs_settings.jobs_max_workers,
+            heartbeat_interval=jobs_settings.jobs_heartbeat_interval,
+            heartbeat_timeout=jobs_settings.jobs_heartbeat_timeout,
+        )
+        instrument_queries(profiler=query_profiler)
+        instrument_s3_client(client=self.s3client.s3)
+
+    def bootstrap(self) -> None:
+        """
+        Create the database and its schema if they do not exist.
+
+        It also detects whether entries can be searched
+        with trigram indexes, fails the jobs that are left
+        unfinished by stopped workers, and starts heartbeats of jobs.
+
+        """
+        start = time.perf_counter()
+        create_postgres_database()
+        create_schema(engine=self.engine)
+        with self.engine.connect() as connection:
+            self.budget_service.trigram_search = has_trigram_search(
+                connection=connection,
+            )
+        self.job_queue.start()
+        logger.info(
+            'Database is bootstrapped in %.3f s.',
+            time.perf_counter() - start,
+        )
+
+    def get_pool_stats(self) -> dict[str, dict[str, int | float]]:
+        """
+        Return statistics of the database connection pools.
+
+        Returns
+        -------
+        dict
+            Statistics of the synchronous pool, and of the asynchronous
+            pool if the asynchronous mode is enabled.
+
+        """
+        pool_stats = {'sync': self.engine.pool.get_stats()}
+        async_engine = self.async_budget_service.engine
+        if async_engine is not None:
+            pool_stats['async'] = async_engine.sync_engine.pool.get_stats()
+        return pool_stats
+
+    async def close(self) -> None:
+        """Wait for running jobs and release database connections."""
+        await run_in_threadpool(self.job_queue.shutdown)
+        self.engine.dispose()
+        await self.async_budget_service.close()
+
+
+def get_container(request: Request) -> ServiceContainer:
+    """
+    Return the service container of the application.
+
+    Parameters
+    ----------
+    request : Request
+        The current request.
+
+    Returns
+    -------
+    ServiceContainer
+        The container created by the application lifespan.
+
+    """
+    return request.app.state.container
+
+
+ContainerDep = Annotated[ServiceContainer, Depends(get_container)]
+
+
+def get_budget_service(container: ContainerDep) -> AsyncBudgetService:
+    """
+    Return the shared asynchronous service managing budget entries.
+
+    Parameters
+    ----------
+    container : ServiceContainer
+        The service container of the application.
+
+    Returns
+    -------
+    AsyncBudgetService
+        The asynchronous budget service of the service container.
+
+    """
+    return container.async_budget_service
+
+
+def get_reports_service(container: ContainerDep) -> ReportsService:
+    """
+    Return the shared service of financial reports.
+
+    Parameters
+    ----------
+    container : ServiceContainer
+        The service container of the application.
+
+    Returns
+    -------
+    ReportsService
+        The reports service of the service container.
+
+    """
+    return container.reports_service
+
+
+def get_cognito_client(container: ContainerDep) -> CognitoClient:
+    """
+    Return the shared client of AWS Cognito.
+
+    Parameters
+    ----------
+    container : ServiceContainer
+        The service container of the application.
+
+    Returns
+    -------
+    CognitoClient
+        The Cognito client of the service container.
+
+    """
+    return container.cognito_client
+
+
+def get_job_queue(container: ContainerDep) -> JobQueue:
+    """
+    Return the shared queue of background jobs.
+
+    Parameters
+    ----------
+    container : ServiceContainer
+        The service container of the application.
+
+    Returns
+    -------
+    JobQueue
+        The job queue of the service container.
+
+    """
+    return container.job_queue
+
+
+BudgetServiceDep = Annotated[
+    AsyncBudgetService,
+    Depends(get_budget_service),
+]
+ReportsServiceDep = Annotated[ReportsService, Depends(get_reports_service)]
+CognitoClientDep = Annotated[CognitoClient, Depends(get_cognito_client)]
+JobQueueDep = Annotated[JobQueue, Depends(get_job_queue)]
@@ -5,22 +5,118 @@ This module defines endpoints for managing budget entries, including creating,
 reading, updating, and deleting entries. It also supports file uploads.
 
 """
+from http import HTTPStatus
+from typing import Annotated
+
 from custom_logging import config_logging
-from fastapi import APIRouter, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 
-from backend.entries_app.budget_service import BudgetService
-from backend.entries_app.db_engine import create_postgres_database, get_engine
-from backend.entries_app.models import Base, BudgetEntry, BudgetEntrySchema
+from backend.api.dependencies import (
+    BudgetServiceDep,
+    ContainerDep,
+    JobQueueDep,
+)
+from backend.entries_app.arrow_format import (
+    ARROW_STREAM_TYPE,
+    decode_entries,
+    encode_page,
+)
+from backend.entries_app.batch_updater import BatchCounts
+from backend.entries_app.exporter import MEDIA_TYPES
+from backend.entries_app.models import (
+    MAX_PAGE_SIZE,
+    BudgetEntriesExport,
+    BudgetEntriesPage,
+    BudgetEntriesQuery,
+    BudgetEntrySchema,
+)
+from backend.jobs_app.models import JobSchema
 
 config_logging()
-create_postgres_database()
-engine = get_engine()
-Base.metadata.create_all(bind=engine)
 entries_router = APIRouter()
+MAX_QUERY_LENGTH = 100
+ENTRIES_ADAPTER = TypeAdapter(list[BudgetEntrySchema])
+ARROW_RESPONSE = {200: {'content': {ARROW_STREAM_TYPE: {}}}}
+ARROW_REQUEST_BODY = {
+    'requestBody': {
+        'required': True,
+        'content': {
+            'application/json': {
+                'schema': {
+                    'type': 'array',
+                    'items': {
+                        '$ref': '#/components/schemas/BudgetEntrySchema',
+                    },
+                },
+            },
+            ARROW_STREAM_TYPE: {
+                'schema': {'type': 'string', 'format': 'binary'},
+            },
+        },
+    },
+}
+
+
+async def get_updated_entries(request: Request) -> list[BudgetEntrySchema]:
+    """
+    Return budget entries from a JSON array or an Arrow IPC stream.
+
+    The format of the request body is selected by its content type.
+
+    Parameters
+    ----------
+    request : Request
+        The current request.
+
+    Returns
+    -------
+    list of BudgetEntrySchema
+        The budget entries of the request body.
+
+    Raises
+    ------
+    RequestValidationError
+        If the JSON array does not contain valid budget entries.
+
+    """
+    body = await request.body()
+    content_type = request.headers.get('content-type', '')
+    if content_type.startswith(ARROW_STREAM_TYPE):
+        return await run_in_threadpool(decode_entries, body)
+    try:
+        return ENTRIES_ADAPTER.validate_json(body)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            errors=[
+                {**error, 'loc': ('body', *error['loc'])}
+                for error in exc.errors(include_url=False)
+            ],
+        ) from exc
+
+
+UpdatedEntriesDep = Annotated[
+    list[BudgetEntrySchema],
+    Depends(get_updated_entries),
+]
 
 
 @entries_router.post(path='/create')
-def create_entry(entry: BudgetEntrySchema) -> dict[str, str]:
+async def create_entry(
+    entry: BudgetEntrySchema,
+    budget_service: BudgetServiceDep,
+) -> dict[str, str]:
     """
     Create a new budget entry in the database.
 
@@ -28,6 +124,8 @@ def create_entry(entry: BudgetEntrySchema) -> dict[str, str]:
     ----------
     entry : BudgetEntrySchema
         The budget entry details.
+    budget_service : AsyncBudgetService
+        The shared asynchronous service managing budget entries.
 
     Returns
     -------
@@ -35,58 +133,179 @@ def create_entry(entry: BudgetEntrySchema) -> dict[str, str]:
         A response dictionary indicating the creation status.
 
     """
-    return BudgetService(engine).create_entry(entry=entry)
+    return await budget_service.create_entry(entry=entry)
+
+
+@entries_router.get(
+    path='/',
+    response_model=BudgetEntriesPage,
+    responses=ARROW_RESPONSE,
+)
+async def read_entries(
+    budget_service: BudgetServiceDep,
+    query: Annotated[BudgetEntriesQuery, Query()],
+    accept: Annotated[str | None, Header()] = None,
+) -> BudgetEntriesPage | Response:
+    """
+    Return a page of filtered and sorted budget entries from the database.
+
+    Parameters
+    ----------
+    budget_service : AsyncBudgetService
+        The shared asynchronous service managing budget entries.
+    query : BudgetEntriesQuery
+        Filters, sorting, page size and cursor of entries. Multi-valued
+        filters are passed as repeated query parameters
+        (e.g. `?category=food&category=rent`).
+    accept : str, optional
+        Accepted media types. If they include Arrow IPC stream,
+        the page is returned in this format.
+
+    Returns
+    -------
+    BudgetEntriesPage or Response
+        A page of budget entries and the cursor of the next page,
+        as JSON or as an Arrow IPC stream with the cursor
+        in the schema metadata.
+
+    """
+    page = await budget_service.read_entries(
+        limit=query.limit,
+        cursor=query.cursor,
+        filters=query,
+    )
+    if accept and ARROW_STREAM_TYPE in accept:
+        return Response(
+            content=await run_in_threadpool(encode_page, page),
+            media_type=ARROW_STREAM_TYPE,
+        )
+    return page
+
+
+@entries_router.get(path='/search')
+async def search_entries(
+    q: Annotated[str, Query(min_length=1, max_length=MAX_QUERY_LENGTH)],
+    budget_service: BudgetServiceDep,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 10,
+    cursor: str | None = None,
+) -> BudgetEntriesPage:
+    """
+    Search budget entries by product and shop.
+
+    Parameters
+    ----------
+    q : str
+        Searched text.
+    budget_service : AsyncBudgetService
+        The shared asynchronous service managing budget entries.
+    limit : int, optional
+        Maximum number of entries in the page, by default 10.
+    cursor : str, optional
+        Cursor of the page returned as `next_cursor` with the previous page.
+        If not specified, the first page is returned.
+
+    Returns
+    -------
+    BudgetEntriesPage
+        A page of the best matching entries and the cursor of the next page.
+
+    """
+    return await budget_service.search_entries(
+        query=q,
+        limit=limit,
+        cursor=cursor,
+    )
 
 
-@entries_router.get(path='/', response_model=list[BudgetEntrySchema])
-def read_entries() -> list[BudgetEntry]:
+@entries_router.get(path='/export')
+async def export_entries(
+    budget_service: BudgetServiceDep,
+    query: Annotated[BudgetEntriesExport, Query()],
+) -> StreamingResponse:
     """
-    Return all budget entries from the database.
+    Stream filtered and sorted budget entries as a file.
+
+    Parameters
+    ----------
+    budget_service : AsyncBudgetService
+        The shared asynchronous service managing budget entries.
+    query : BudgetEntriesExport
+        Filters and sorting of entries as for reading them,
+        and the file format ('csv', 'ndjson' or 'parquet').
 
     Returns
     -------
-    list[BudgetEntry]
-        A list of budget entries.
+    StreamingResponse
+        A response sending the file in chunks as entries are fetched.
 
     """
-    return BudgetService(engine).read_entries()
+    file_name = f'budget_entries.{query.format.value}'
+    return StreamingResponse(
+        budget_service.export_entries(query=query),
+        media_type=MEDIA_TYPES[query.format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{file_name}"',
+        },
+    )
 
 
 @entries_router.get(path='/info')
-def get_entries_info() -> dict[str, str | int]:
+async def get_entries_info(
+    budget_service: BudgetServiceDep,
+) -> dict[str, str | int | None]:
     """
     Return summary information about budget entries.
 
+    Parameters
+    ----------
+    budget_service : AsyncBudgetService
+        The shared asynchronous service managing budget entries.
+
     Returns
     -------
     dict
         A dictionary containing statistics about the budget entries.
 
     """
-    return BudgetService(engine).get_entries_info()
+    return await budget_service.get_entries_info()
 
 
-@entries_router.post(path='/update')
-def update_entries(updated_entries: list[BudgetEntrySchema]) -> dict[str, str]:
+@entries_router.post(path='/update', openapi_extra=ARROW_REQUEST_BODY)
+async def update_entries(
+    updated_entries: UpdatedEntriesDep,
+    budget_service: BudgetServiceDep,
+) -> dict[str, str | int | list[BatchCounts]]:
     """
     Update existing budget entries in the database.
 
     Parameters
     ----------
     updated_entries : list[BudgetEntrySchema]
-        A list of updated budget entries.
+        A list of updated budget entries, sent as a JSON array
+        or as an Arrow IPC stream.
+    budget_service : AsyncBudgetService
+        The shared asynchronous service managing budget entries.
 
     Returns
     -------
     dict
-        A response dictionary indicating the update status.
+        A response dictionary indicating the update status
+        and the numbers of inserted and updated entries.
 
     """
-    return BudgetService(engine).update_entries(updated_entries)
+    return await budget_service.update_entries(updated_entries)
 
 
 @entries_router.post(path='/upload')
-def upload_entries(uploaded_file: UploadFile) -> dict[str, str]:
+async def upload_entries(  # noqa: PLR0913
+    uploaded_file: UploadFile,
+    budget_service: BudgetServiceDep,
+    job_queue: JobQueueDep,
+    response: Response,
+    *,
+    streaming: bool = False,
+    background: bool = False,
+) -> dict[str, str | int | float] | JobSchema:
     """
     Process and upload budget entries from a file.
 
@@ -94,25 +313,78 @@ def upload_entries(uploaded_file: UploadFile) -> dict[str, str]:
     ----------
     uploaded_file : UploadFile
         The file containing budget entries to be uploaded.
+    budget_service : AsyncBudgetService
+        The shared asynchronous service managing budget entries.
+    job_queue : JobQueue
+        The shared queue of background jobs.
+    response : Response
+        The response whose status code is set for background jobs.
+    streaming : bool, optional
+        Whether to parse and save the file in fixed-size chunks,
+        by default False.
+    background : bool, optional
+        Whether to upload the file in a background job, by default
+        False. Then the job is returned with the status 202,
+        and its progress is available at `/jobs/{job_id}`.
 
     Returns
     -------
-    dict
-        A response dictionary indicating the upload status.
+    dict or JobSchema
+        A response dictionary indicating the upload status
+        and the upload rate, or the submitted job.
 
     """
-    return BudgetService(engine).upload_entries(uploaded_file)
+    if background:
+        response.status_code = HTTPStatus.ACCEPTED
+        return await budget_service.submit_upload(
+            uploaded_file,
+            job_queue,
+            streaming=streaming,
+        )
+    return await budget_service.upload_entries(
+        uploaded_file,
+        streaming=streaming,
+    )
 
 
 @entries_router.post(path='/clean')
-def delete_all_entries() -> dict[str, str]:
+async def delete_all_entries(
+    budget_service: BudgetServiceDep,
+) -> dict[str, str]:
     """
     Delete all budget entries from the database.
 
+    Parameters
+    ----------
+    budget_service : AsyncBudgetService
+        The shared asynchronous service managing budget entries.
+
     Returns
     -------
     dict
         A response dictionary indicating the deletion status.
 
     """
-    return BudgetService(engine).delete_all_entries()
+    return await budget_service.delete_all_entries()
+
+
+@entries_router.get(path='/pool')
+async def get_pool_stats(
+    container: ContainerDep,
+) -> dict[str, dict[str, int | float]]:
+    """
+    Return statistics of the database connection pools.
+
+    Parameters
+    ----------
+    container : ServiceContainer
+        The service container of the application.
+
+    Returns
+    -------
+    dict
+        Pool size, numbers of checked-in, checked-out and overflow
+        connections, and checkout waiting times for each pool.
+
+    """
+    return container.get_pool_stats()
@@ -0,0 +1,69 @@
+"""
+Jobs API routes using FastAPI and PostgreSQL.
+
+This module defines endpoints for polling the progress of background
+jobs, such as uploads of budget entries and generation of reports.
+
+"""
+import uuid
+from typing import Annotated
+
+from custom_logging import config_logging
+from fastapi import APIRouter, Query
+
+from backend.api.dependencies import JobQueueDep
+from backend.jobs_app.models import JobSchema, JobStatus
+
+config_logging()
+jobs_router = APIRouter()
+MAX_JOBS_NUMBER = 100
+
+
+@jobs_router.get(path='/')
+def list_jobs(
+    job_queue: JobQueueDep,
+    limit: Annotated[int, Query(ge=1, le=MAX_JOBS_NUMBER)] = 20,
+    status: JobStatus | None = None,
+) -> list[JobSchema]:
+    """
+    Return the latest background jobs.
+
+    Parameters
+    ----------
+    job_queue : JobQueue
+        The shared queue of background jobs.
+    limit : int, optional
+        Maximum number of returned jobs, by default 20.
+    status : JobStatus, optional
+        Status of returned jobs. By default, jobs of all statuses
+        are returned.
+
+    Returns
+    -------
+    list of JobSchema
+        Jobs sorted from the latest submitted.
+
+    """
+    return job_queue.list_jobs(limit=limit, status=status)
+
+
+@jobs_router.get(path='/{job_id}')
+def get_job(job_id: uuid.UUID, job_queue: JobQueueDep) -> JobSchema:
+    """
+    Return the state of a background job.
+
+    Parameters
+    ----------
+    job_id : uuid.UUID
+        The ID of the job.
+    job_queue : JobQueue
+        The shared queue of background jobs.
+
+    Returns
+    -------
+    JobSchema
+        The status, progress, number of processed rows and duration
+        of the job, and its result or error once it is finished.
+
+    """
+    return job_queue.get_job(job_id=job_id)
@@ -0,0 +1,945 @@
+"""
+Request metrics of the backend in Prometheus text format.
+
+This module defines simple thread-safe counters, gauges and histograms,
+an ASGI middleware recording latency, in-flight requests, payload sizes
+and status codes of HTTP requests, and hooks recording the time spent
+in database queries and S3 requests. Another middleware counts
+database queries of each request.
+
+Metrics are collected per worker process. If the server runs several
+workers, each of them periodically writes a snapshot of its metrics
+to a shared directory, and the worker serving `/metrics` sums up
+the snapshots of all workers. Snapshots of stopped workers are kept,
+so that counters do not decrease when workers are restarted,
+but their gauges are skipped.
+
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable, MutableMapping
+from pathlib import Path
+from typing import Any
+
+from backend.entries_app.query_profiler import (
+    QueryProfiler,
+    QueryStats,
+    track_queries,
+)
+
+logger = logging.getLogger(__name__)
+LabelValues = tuple[str, ...]
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30,
+)
+SIZE_BUCKETS = (100, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+UNMATCHED_ROUTE = 'unmatched'
+S3_START_KEY = 'metrics_start'
+SNAPSHOT_SUFFIX = '.json'
+MetricState = dict[str, list]
+
+
+class Metric:
+    """
+    Base class of metrics with labels.
+
+    Attributes
+    ----------
+    name : str
+        The name of the metric.
+    documentation : str
+        The description of the metric.
+    label_names : tuple of str
+        The names of labels of the metric.
+
+    """
+
+    metric_type = 'untyped'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: LabelValues = (),
+    ) -> None:
+        """
+        Initialize the metric.
+
+        Parameters
+        ----------
+        name : str
+            The name of the metric.
+        documentation : str
+            The description of the metric.
+        label_names : tuple of str, optional
+            The names of labels of the metric.
+
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        """
+        Return the metric in Prometheus text format.
+
+        Returns
+        -------
+        list of str
+            Lines describing the metric and its samples.
+
+        """
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.metric_type}',
+        ]
+        with self._lock:
+            samples = self._get_samples()
+        lines.extend(
+            f'{name}{self._format_labels(labels)} {_format_value(value)}'
+            for name, labels, value in samples
+        )
+        return lines
+
+    def dump(self) -> MetricState:
+        """
+        Return the state of the metric that can be serialized to JSON.
+
+        Returns
+        -------
+        dict
+            Values of the metric by its label values.
+
+        """
+        with self._lock:
+            return {
+                'values': [
+                    [list(labels), metric_value]
+                    for labels, metric_value in self._values.items()
+                ],
+            }
+
+    def merge(self, state: MetricState) -> None:
+        """
+        Add the state of the same metric of another process.
+
+        Parameters
+        ----------
+        state : dict
+            The state returned by `dump`.
+
+        """
+        with self._lock:
+            for labels, metric_value in state['values']:
+                key = tuple(labels)
+                self._values[key] = self._values.get(key, 0) + metric_value
+
+    def _get_samples(self) -> list[tuple[str, dict[str, str], float]]:
+        """
+        Return samples of the metric.
+
+        Returns
+        -------
+        list of tuple
+            Names, labels and values of samples.
+
+        """
+        return [
+            (
+                self.name,
+                dict(zip(self.label_names, labels, strict=True)),
+                metric_value,
+            )
+            for labels, metric_value in sorted(self._values.items())
+        ]
+
+    @classmethod
+    def _format_labels(cls, labels: dict[str, str]) -> str:
+        """
+        Format labels of a sample.
+
+        Parameters
+        ----------
+        labels : dict
+            Label values by label names.
+
+        Returns
+        -------
+        str
+            Labels in braces, or an empty string if there are no labels.
+
+        """
+        if not labels:
+            return ''
+        formatted = ','.join(
+            f'{name}="{_escape(label_value)}"'
+            for name, label_value in labels.items()
+        )
+        return f'{{{formatted}}}'
+
+
+class Counter(Metric):
+    """Monotonically increasing metric."""
+
+    metric_type = 'counter'
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        """
+        Increase the counter.
+
+        Parameters
+        ----------
+        labels : tuple of str, optional
+            The label values.
+        amount : float, optional
+            The increment, by default 1.
+
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Counter):
+    """Metric that can go up and down."""
+
+    metric_type = 'gauge'
+
+
+class Histogram(Metric):
+    """
+    Metric counting observed values in buckets.
+
+    Attributes
+    ----------
+    buckets : tuple of float
+        Upper bounds of the buckets.
+
+    """
+
+    metric_type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: LabelValues = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        """
+        Initialize the histogram.
+
+        Parameters
+        ----------
+        name : str
+            The name of the metric.
+        documentation : str
+            The description of the metric.
+        label_names : tuple of str, optional
+            The names of labels of the metric.
+        buckets : tuple of float, optional
+            Upper bounds of the buckets.
+
+        """
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[LabelValues, list[int]] = {}
+
+    def observe(self, observed: float, labels: LabelValues = ()) -> None:
+        """
+        Add an observed value to the histogram.
+
+        Parameters
+        ----------
+        observed : float
+            The observed value.
+        labels : tuple of str, optional
+            The label values.
+
+        """
+        with self._lock:
+            counts = self._counts.setdefault(
+                labels,
+                [0] * (len(self.buckets) + 1),
+            )
+            for index, bound in enumerate(self.buckets):
+                if observed <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._values[labels] = self._values.get(labels, 0) + observed
+
+    def dump(self) -> MetricState:
+        """
+        Return the state of the histogram that can be serialized to JSON.
+
+        Returns
+        -------
+        dict
+            Sums and bucket counts of observed values
+            by their label values.
+
+        """
+        state = super().dump()
+        with self._lock:
+            state['counts'] = [
+                [list(labels), list(counts)]
+                for labels, counts in self._counts.items()
+            ]
+        return state
+
+    def merge(self, state: MetricState) -> None:
+        """
+        Add the state of the same histogram of another process.
+
+        Parameters
+        ----------
+        state : dict
+            The state returned by `dump`.
+
+        """
+        super().merge(state)
+        with self._lock:
+            for labels, counts in state['counts']:
+                merged_counts = self._counts.setdefault(
+                    tuple(labels),
+                    [0] * (len(self.buckets) + 1),
+                )
+                for index, bucket_count in enumerate(counts):
+                    merged_counts[index] += bucket_count
+
+    def _get_samples(self) -> list[tuple[str, dict[str, str], float]]:
+        """
+        Return cumulative buckets, sums and counts of the histogram.
+
+        Returns
+        -------
+        list of tuple
+            Names, labels and values of samples.
+
+        """
+        samples = []
+        for labels, counts in sorted(self._counts.items()):
+            label_dict = dict(zip(self.label_names, labels, strict=True))
+            cumulative = 0
+            bounds = [*map(_format_value, self.buckets), '+Inf']
+            for bound, bucket_count in zip(bounds, counts, strict=True):
+                cumulative += bucket_count
+                samples.append((
+                    f'{self.name}_bucket',
+                    {**label_dict, 'le': bound},
+                    cumulative,
+                ))
+            samples.extend((
+                (f'{self.name}_sum', label_dict, self._values[labels]),
+                (f'{self.name}_count', label_dict, cumulative),
+            ))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Registry of metrics of the backend.
+
+    Attributes
+    ----------
+    requests_total : Counter
+        Number of HTTP requests by method, route and status code.
+    request_duration : Histogram
+        Latency of HTTP requests by method and route.
+    requests_in_progress : Gauge
+        Number of HTTP requests being processed by method.
+    request_size : Histogram
+        Size of request bodies by method and route.
+    response_size : Histogram
+        Size of response bodies by method and route.
+    db_query_duration : Histogram
+        Duration of database queries.
+    s3_request_duration : Histogram
+        Duration of S3 requests by operation.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize the MetricsRegistry."""
+        route_labels = ('method', 'route')
+        self.requests_total = Counter(
+            'http_requests_total',
+            'Number of HTTP requests.',
+            ('method', 'route', 'status'),
+        )
+        self.request_duration = Histogram(
+            'http_request_duration_seconds',
+            'Latency of HTTP requests in seconds.',
+            route_labels,
+        )
+        self.requests_in_progress = Gauge(
+            'http_requests_in_progress',
+            'Number of HTTP requests being processed.',
+            ('method',),
+        )
+        self.request_size = Histogram(
+            'http_request_size_bytes',
+            'Size of HTTP request bodies in bytes.',
+            route_labels,
+            buckets=SIZE_BUCKETS,
+        )
+        self.response_size = Histogram(
+            'http_response_size_bytes',
+            'Size of HTTP response bodies in bytes.',
+            route_labels,
+            buckets=SIZE_BUCKETS,
+        )
+        self.db_query_duration = Histogram(
+            'db_query_duration_seconds',
+            'Duration of database queries in seconds.',
+        )
+        self.s3_request_duration = Histogram(
+            's3_request_duration_seconds',
+            'Duration of S3 requests in seconds.',
+            ('operation',),
+        )
+
+    @property
+    def metrics(self) -> tuple[Metric, ...]:
+        """
+        Return all metrics of the registry.
+
+        Returns
+        -------
+        tuple of Metric
+            The metrics in the order of their exposition.
+
+        """
+        return (
+            self.requests_total,
+            self.request_duration,
+            self.requests_in_progress,
+            self.request_size,
+            self.response_size,
+            self.db_query_duration,
+            self.s3_request_duration,
+        )
+
+    def render(self) -> str:
+        """
+        Return all metrics in Prometheus text format.
+
+        Returns
+        -------
+        str
+            The exposition of metrics.
+
+        """
+        lines = [line for metric in self.metrics for line in metric.render()]
+        return '\n'.join(lines) + '\n'
+
+    def dump(self) -> dict[str, MetricState]:
+        """
+        Return the state of all metrics that can be serialized to JSON.
+
+        Returns
+        -------
+        dict
+            States of the metrics by their names.
+
+        """
+        return {metric.name: metric.dump() for metric in self.metrics}
+
+    def merge(
+        self,
+        snapshot: dict[str, MetricState],
+        *,
+        is_live: bool = True,
+    ) -> None:
+        """
+        Add metrics of another process.
+
+        Parameters
+        ----------
+        snapshot : dict
+            States of metrics returned by `dump`.
+        is_live : bool, optional
+            Whether the process is running, by default True.
+            Gauges of stopped processes are skipped.
+
+        """
+        for metric in self.metrics:
+            if metric.name not in snapshot:
+                continue
+            if isinstance(metric, Gauge) and not is_live:
+                continue
+            metric.merge(snapshot[metric.name])
+
+
+registry = MetricsRegistry()
+
+
+class SnapshotWriter:
+    """
+    Writer of snapshots of metrics of a worker to a shared directory.
+
+    Attributes
+    ----------
+    directory : Path
+        The directory of snapshots of all workers.
+    interval : float
+        Seconds between snapshots.
+    registry : MetricsRegistry
+        Registry storing the metrics.
+
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        interval: float,
+        metrics_registry: MetricsRegistry = registry,
+    ) -> None:
+        """
+        Initialize the SnapshotWriter.
+
+        Parameters
+        ----------
+        directory : Path
+            The directory of snapshots of all workers.
+        interval : float
+            Seconds between snapshots.
+        metrics_registry : MetricsRegistry, optional
+            Registry storing the metrics, by default the registry
+            of the module.
+
+        """
+        self.directory = directory
+        self.interval = interval
+        self.registry = metrics_registry
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name='metrics-snapshots',
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        """Start writing snapshots in a background thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write the last snapshot."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.write()
+
+    def write(self) -> None:
+        """Write the current snapshot of metrics of the process."""
+        try:
+            write_snapshot(
+                directory=self.directory,
+                metrics_registry=self.registry,
+            )
+        except OSError:
+            logger.exception('Snapshot of metrics is not written.')
+
+    def _run(self) -> None:
+        """Write snapshots until the writer is stopped."""
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording metrics of HTTP requests.
+
+    Requests are labelled by the path template of the matched route,
+    so that path parameters do not create new label values.
+
+    Attributes
+    ----------
+    app : ASGIApp
+        The wrapped ASGI application.
+    registry : MetricsRegistry
+        Registry storing the metrics.
+
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        metrics_registry: MetricsRegistry = registry,
+    ) -> None:
+        """
+        Initialize the MetricsMiddleware.
+
+        Parameters
+        ----------
+        app : ASGIApp
+            The wrapped ASGI application.
+        metrics_registry : MetricsRegistry, optional
+            Registry storing the metrics, by default the registry
+            of the module.
+
+        """
+        self.app = app
+        self.registry = metrics_registry
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        """
+        Process a request and record its metrics.
+
+        Parameters
+        ----------
+        scope : Scope
+            The connection scope.
+        receive : Receive
+            The coroutine receiving messages from the client.
+        send : Send
+            The coroutine sending messages to the client.
+
+        """
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        method = scope['method']
+        response = {'status': '500', 'size': 0}
+        request_size = 0
+
+        async def receive_wrapper() -> Message:  # noqa: WPS430
+            nonlocal request_size
+            message = await receive()
+            request_size += len(message.get('body', b''))
+            return message
+
+        async def send_wrapper(message: Message) -> None:  # noqa: WPS430
+            if message['type'] == 'http.response.start':
+                response['status'] = str(message['status'])
+            elif message['type'] == 'http.response.body':
+                response['size'] += len(message.get('body', b''))
+            await send(message)
+
+        self.registry.requests_in_progress.inc(labels=(method,))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            self.registry.requests_in_progress.inc(
+                labels=(method,),
+                amount=-1,
+            )
+            route = getattr(scope.get('route'), 'path', UNMATCHED_ROUTE)
+            route_labels = (method, route)
+            self.registry.requests_total.inc(
+                labels=(method, route, response['status']),
+            )
+            self.registry.request_duration.observe(
+                duration,
+                labels=route_labels,
+            )
+            self.registry.request_size.observe(
+                request_size,
+                labels=route_labels,
+            )
+            self.registry.response_size.observe(
+                response['size'],
+                labels=route_labels,
+            )
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware counting database queries of each request.
+
+    The number and total duration of queries are logged
+    at debug level, and optionally returned in `X-DB-Queries`
+    and `X-DB-Time` (in seconds) response headers.
+
+    Attributes
+    ----------
+    app : ASGIApp
+        The wrapped ASGI application.
+    add_headers : bool
+        Whether query statistics are added to response headers.
+
+    """
+
+    def __init__(self, app: ASGIApp, *, add_headers: bool = False) -> None:
+        """
+        Initialize the QueryStatsMiddleware.
+
+        Parameters
+        ----------
+        app : ASGIApp
+            The wrapped ASGI application.
+        add_headers : bool, optional
+            Whether query statistics are added to response headers,
+            by default False.
+
+        """
+        self.app = app
+        self.add_headers = add_headers
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        """
+        Process a request and count its database queries.
+
+        Parameters
+        ----------
+        scope : Scope
+            The connection scope.
+        receive : Receive
+            The coroutine receiving messages from the client.
+        send : Send
+            The coroutine sending messages to the client.
+
+        """
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        with track_queries() as query_stats:
+            await self.app(
+                scope,
+                receive,
+                self._wrap_send(send=send, query_stats=query_stats),
+            )
+        logger.debug(
+            '%s %s: %d queries in %.3f s.',
+            scope['method'],
+            scope['path'],
+            query_stats.queries_number,
+            query_stats.duration,
+        )
+
+    def _wrap_send(self, send: Send, query_stats: QueryStats) -> Send:
+        """
+        Return a coroutine adding query statistics to response headers.
+
+        Parameters
+        ----------
+        send : Send
+            The coroutine sending messages to the client.
+        query_stats : QueryStats
+            Statistics of queries of the request.
+
+        Returns
+        -------
+        Send
+            The wrapped coroutine, or the original one
+            if headers are not added.
+
+        """
+        if not self.add_headers:
+            return send
+
+        async def send_wrapper(message: Message) -> None:  # noqa: WPS430
+            if message['type'] == 'http.response.start':
+                message['headers'] = [
+                    *message.get('headers', []),
+                    (b'x-db-queries', b'%d' % query_stats.queries_number),
+                    (b'x-db-time', b'%.6f' % query_stats.duration),
+                ]
+            await send(message)
+
+        return send_wrapper
+
+
+def instrument_queries(
+    profiler: QueryProfiler,
+    metrics_registry: MetricsRegistry = registry,
+) -> None:
+    """
+    Record durations of queries timed by a query profiler.
+
+    The profiler is attached to all database engines, so queries
+    are timed once for both the profiler and the metrics.
+
+    Parameters
+    ----------
+    profiler : QueryProfiler
+        The profiler attached to database engines.
+    metrics_registry : MetricsRegistry, optional
+        Registry storing the metrics, by default the registry
+        of the module.
+
+    """
+    observe = metrics_registry.db_query_duration.observe
+    if observe not in profiler.duration_observers:
+        profiler.duration_observers.append(observe)
+
+
+def instrument_s3_client(
+    client: Any,  # noqa: ANN401
+    metrics_registry: MetricsRegistry = registry,
+) -> None:
+    """
+    Record the duration of requests made by a boto3 S3 client.
+
+    Parameters
+    ----------
+    client : botocore.client.BaseClient
+        The boto3 S3 client.
+    metrics_registry : MetricsRegistry, optional
+        Registry storing the metrics, by default the registry
+        of the module.
+
+    """
+
+    def before_call(context: dict, **kwargs) -> None:  # noqa: WPS430
+        context[S3_START_KEY] = time.perf_counter()
+
+    def after_call(  # noqa: WPS430
+        context: dict,
+        model: Any,  # noqa: ANN401
+        **kwargs,
+    ) -> None:
+        start = context.pop(S3_START_KEY, None)
+        if start is not None:
+            metrics_registry.s3_request_duration.observe(
+                time.perf_counter() - start,
+                labels=(model.name,),
+            )
+
+    events = client.meta.events
+    events.register('before-call.s3', before_call)
+    events.register('after-call.s3', after_call)
+    events.register('after-call-error.s3', after_call)
+
+
+def write_snapshot(
+    directory: Path,
+    metrics_registry: MetricsRegistry = registry,
+) -> None:
+    """
+    Write a snapshot of metrics of the process to a directory.
+
+    The snapshot is written to a temporary file, which then replaces
+    the previous snapshot, so that readers never see a partial file.
+
+    Parameters
+    ----------
+    directory : Path
+        The directory of snapshots of all workers.
+    metrics_registry : MetricsRegistry, optional
+        Registry storing the metrics, by default the registry
+        of the module.
+
+    """
+    path = directory.joinpath(f'{os.getpid()}{SNAPSHOT_SUFFIX}')
+    temporary_path = path.with_suffix('.tmp')
+    temporary_path.write_text(json.dumps(metrics_registry.dump()))
+    temporary_path.replace(path)
+
+
+def render_snapshots(directory: Path) -> str:
+    """
+    Return the sum of metrics of all workers in Prometheus text format.
+
+    Parameters
+    ----------
+    directory : Path
+        The directory of snapshots of all workers.
+
+    Returns
+    -------
+    str
+        The exposition of the summed metrics.
+
+    """
+    aggregated = MetricsRegistry()
+    for path in sorted(directory.glob(f'*{SNAPSHOT_SUFFIX}')):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            logger.warning('Snapshot of metrics "%s" is skipped.', path)
+            continue
+        aggregated.merge(snapshot, is_live=_is_running(pid=int(path.stem)))
+    return aggregated.render()
+
+
+def _is_running(pid: int) -> bool:
+    """
+    Check whether a process of the host is running.
+
+    Parameters
+    ----------
+    pid : int
+        The ID of the process.
+
+    Returns
+    -------
+    bool
+        True if the process exists.
+
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _format_value(sample_value: float) -> str:
+    """
+    Format a sample value.
+
+    Parameters
+    ----------
+    sample_value : float
+        The value to format.
+
+    Returns
+    -------
+    str
+        Integers without fractional part, other numbers in repr format.
+
+    """
+    if float(sample_value).is_integer():
+        return str(int(sample_value))
+    return repr(float(sample_value))
+
+
+def _escape(label_value: str) -> str:
+    """
+    Escape a label value.
+
+    Parameters
+    ----------
+    label_value : str
+        The value to escape.
+
+    Returns
+    -------
+    str
+        The value with escaped backslashes, quotes and line breaks.
+
+    """
+    return (
+        str(label_value)
+        .replace('\\', r'\\')
+        .replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
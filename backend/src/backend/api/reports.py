@@ -4,22 +4,69 @@ Reports API routes using FastAPI and PostgreSQL.
 This module defines endpoints for generating and retrieving reports.
 
 """
+from http import HTTPStatus
+
 from custom_logging import config_logging
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
-from backend.entries_app.db_engine import get_engine
-from backend.entries_app.models import Base
-from backend.reports_app.reports_generator import ReportsType
-from backend.reports_app.reports_service import ReportsService
+from backend.api.dependencies import JobQueueDep, ReportsServiceDep
+from backend.jobs_app.models import JobSchema, JobType
+from backend.reports_app.reports_generator import (
+    AggregationBackend,
+    ReportsType,
+)
 
 config_logging()
-engine = get_engine()
-Base.metadata.create_all(bind=engine)
 reports_router = APIRouter()
 
 
+@reports_router.post(path='/generate')
+def generate_reports(
+    report_names: list[str],
+    reports_service: ReportsServiceDep,
+    backend: AggregationBackend = AggregationBackend.rollup,
+    *,
+    force: bool = False,
+) -> dict[str, ReportsType]:
+    """
+    Generate several reports sharing one data fetch.
+
+    Parameters
+    ----------
+    report_names : list of str
+        The names of the reports to generate.
+    reports_service : ReportsService
+        The shared service of financial reports.
+    backend : AggregationBackend, optional
+        Backend aggregating financial data, by default rollup.
+    force : bool, optional
+        Whether to regenerate the reports even if the stored ones
+        are built from the current data, by default False.
+
+    Returns
+    -------
+    dict
+        The generated reports data by their names.
+
+    """
+    return reports_service.generate_reports(
+        report_names=report_names,
+        backend=backend,
+        force=force,
+    )
+
+
 @reports_router.post(path='/generate/{report_name}')
-def generate_report(report_name: str) -> ReportsType:
+def generate_report(  # noqa: PLR0913
+    report_name: str,
+    reports_service: ReportsServiceDep,
+    job_queue: JobQueueDep,
+    response: Response,
+    backend: AggregationBackend = AggregationBackend.rollup,
+    *,
+    force: bool = False,
+    background: bool = False,
+) -> ReportsType | JobSchema:
     """
     Generate a report based on the specified report name.
 
@@ -27,18 +74,53 @@ def generate_report(report_name: str) -> ReportsType:
     ----------
     report_name : str
         The name of the report to generate.
+    reports_service : ReportsService
+        The shared service of financial reports.
+    job_queue : JobQueue
+        The shared queue of background jobs.
+    response : Response
+        The response whose status code is set for background jobs.
+    backend : AggregationBackend, optional
+        Backend aggregating financial data: 'rollup' (default) reads
+        the incrementally maintained monthly rollup, 'sql' aggregates
+        expenses in the database, 'pandas' aggregates all entries
+        in the application.
+    force : bool, optional
+        Whether to regenerate the report even if the stored one
+        is built from the current data, by default False.
+    background : bool, optional
+        Whether to generate the report in a background job, by default
+        False. Then the job is returned with the status 202,
+        and its progress is available at `/jobs/{job_id}`.
 
     Returns
     -------
-    ReportsType
-        The generated report data.
+    ReportsType or JobSchema
+        The generated report data, or the submitted job.
 
     """
-    return ReportsService(engine).generate_report(report_name=report_name)
+    if background:
+        reports_service.get_report_method(report_name=report_name)
+        response.status_code = HTTPStatus.ACCEPTED
+        return job_queue.submit(
+            JobType.report,
+            reports_service.generate_report,
+            report_name=report_name,
+            backend=backend,
+            force=force,
+        )
+    return reports_service.generate_report(
+        report_name=report_name,
+        backend=backend,
+        force=force,
+    )
 
 
 @reports_router.get(path='/latest/{report_name}')
-def get_latest_report(report_name: str) -> ReportsType:
+def get_latest_report(
+    report_name: str,
+    reports_service: ReportsServiceDep,
+) -> ReportsType:
     """
     Return the latest generated report based on the report name.
 
@@ -46,6 +128,8 @@ def get_latest_report(report_name: str) -> ReportsType:
     ----------
     report_name : str
         The name of the report to fetch.
+    reports_service : ReportsService
+        The shared service of financial reports.
 
     Returns
     -------
@@ -53,4 +137,26 @@ def get_latest_report(report_name: str) -> ReportsType:
         The latest report data.
 
     """
-    return ReportsService(engine).get_latest_report(report_name=report_name)
+    return reports_service.get_latest_report(report_name=report_name)
+
+
+@reports_router.get(path='/cache')
+def get_cache_stats(
+    reports_service: ReportsServiceDep,
+) -> dict[str, int | float]:
+    """
+    Return statistics of the cache of reports loaded from S3.
+
+    Parameters
+    ----------
+    reports_service : ReportsService
+        The shared service of financial reports.
+
+    Returns
+    -------
+    dict
+        The cache size, its limits, and numbers of hits,
+        misses and revalidations.
+
+    """
+    return reports_service.get_cache_stats()
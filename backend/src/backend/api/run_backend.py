@@ -2,43 +2,204 @@
 FastAPI Backend Application Entry Point.
 
 This module initializes and starts the FastAPI application, including
-API routers for authentication, budget entries, and reports.
+API routers for authentication, budget entries, reports and jobs.
+Shared services and the database schema are created by the application
+lifespan when the server starts, not when this module is imported.
 
 """
 import logging
+import os
+import tempfile
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
 
 import uvicorn
+from anyio import to_thread
 from custom_logging import config_logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
 
 from backend.api.auth import auth_router
+from backend.api.dependencies import ServiceContainer
 from backend.api.entries import entries_router
+from backend.api.jobs import jobs_router
+from backend.api.metrics import (
+    CONTENT_TYPE,
+    SNAPSHOT_SUFFIX,
+    MetricsMiddleware,
+    QueryStatsMiddleware,
+    SnapshotWriter,
+    registry,
+    render_snapshots,
+    write_snapshot,
+)
 from backend.api.reports import reports_router
+from backend.api.settings import ServerSettings
 
 config_logging()
 logger = logging.getLogger(__name__)
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(fastapi_app: FastAPI) -> AsyncIterator[None]:
+    """
+    Create shared services on startup and release them on shutdown.
+
+    The size of the threadpool running synchronous routes
+    is also set on startup, and snapshots of metrics are written
+    if the directory of snapshots is set.
+
+    Parameters
+    ----------
+    fastapi_app : FastAPI
+        The application storing the service container in its state.
+
+    Yields
+    ------
+    None
+        Control to the running application.
+
+    """
+    settings = ServerSettings()
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = settings.server_threadpool_size
+    container = await run_in_threadpool(ServiceContainer)
+    await run_in_threadpool(container.bootstrap)
+    fastapi_app.state.container = container
+    snapshot_writer = None
+    if settings.server_metrics_dir is not None:
+        snapshot_writer = SnapshotWriter(
+            directory=settings.server_metrics_dir,
+            interval=settings.server_metrics_interval,
+        )
+        snapshot_writer.start()
+    try:
+        yield
+    finally:
+        await container.close()
+        if snapshot_writer is not None:
+            await run_in_threadpool(snapshot_writer.stop)
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(
+    QueryStatsMiddleware,
+    add_headers=ServerSettings().server_debug,
+)
+app.add_middleware(MetricsMiddleware)
 app.include_router(auth_router, prefix='/auth')
 app.include_router(entries_router, prefix='/entries')
 app.include_router(reports_router, prefix='/reports')
+app.include_router(jobs_router, prefix='/jobs')
+
+
+@app.get(path='/metrics', include_in_schema=False)
+def get_metrics() -> Response:
+    """
+    Return metrics of the server in Prometheus text format.
+
+    If the directory of snapshots is set, the worker writes
+    its own snapshot and returns the sum of metrics of all workers,
+    so that every scrape returns the same series
+    whichever worker serves it.
+
+    Returns
+    -------
+    Response
+        Latency, throughput, payload sizes and status codes
+        of HTTP requests, and durations of database and S3 requests.
+
+    """
+    metrics_dir = ServerSettings().server_metrics_dir
+    if metrics_dir is None:
+        return Response(content=registry.render(), media_type=CONTENT_TYPE)
+    write_snapshot(directory=metrics_dir)
+    return Response(
+        content=render_snapshots(directory=metrics_dir),
+        media_type=CONTENT_TYPE,
+    )
+
+
+@contextmanager
+def metrics_directory(settings: ServerSettings) -> Iterator[Path | None]:
+    """
+    Provide the directory where workers write snapshots of metrics.
+
+    Snapshots of a previous run are removed from the configured
+    directory. If it is not configured and there are several workers,
+    a temporary directory is created and removed when the server stops.
+
+    Parameters
+    ----------
+    settings : ServerSettings
+        Settings of the server.
+
+    Yields
+    ------
+    Path or None
+        The directory, or None if the only worker exposes
+        its own metrics.
+
+    """
+    metrics_dir = settings.server_metrics_dir
+    if metrics_dir is not None:
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        for path in metrics_dir.glob(f'*{SNAPSHOT_SUFFIX}'):
+            path.unlink()
+        yield metrics_dir
+    elif settings.server_workers > 1:
+        with tempfile.TemporaryDirectory(prefix='metrics-') as temporary_dir:
+            yield Path(temporary_dir)
+    else:
+        yield None
 
 
 def start_backend() -> None:
     """
     Start the FastAPI backend using Uvicorn.
 
-    This function runs the application with predefined settings.
+    This function runs the application with server settings.
+    The limit of requests of a worker is ignored if there is
+    a single worker, because Uvicorn does not restart it,
+    and the server would stop once the limit is reached.
+    The directory of snapshots of metrics is passed to workers
+    in the `SERVER_METRICS_DIR` environment variable.
 
     """
-    logger.info('Backend is running.')
-    port = 8000
-    reload = False
-    uvicorn.run(
-        app='backend.api.run_backend:app',
-        host='127.0.0.1',
-        port=port,
-        reload=reload,
+    settings = ServerSettings()
+    limit_max_requests = settings.server_limit_max_requests
+    if limit_max_requests and settings.server_workers == 1:
+        logger.warning(
+            'The limit of %d requests is ignored, because the only '
+            'worker is not restarted. Use more workers to restart them.',
+            limit_max_requests,
+        )
+        limit_max_requests = None
+    logger.info(
+        'Backend is running on %s:%d with %d worker(s).',
+        settings.server_host,
+        settings.server_port,
+        settings.server_workers,
     )
+    with metrics_directory(settings=settings) as metrics_dir:
+        if metrics_dir is not None:
+            os.environ['SERVER_METRICS_DIR'] = str(metrics_dir)
+        uvicorn.run(
+            app='backend.api.run_backend:app',
+            host=settings.server_host,
+            port=settings.server_port,
+            reload=False,
+            workers=settings.server_workers,
+            loop=settings.server_loop,
+            http=settings.server_http,
+            timeout_keep_alive=settings.server_timeout_keep_alive,
+            backlog=settings.server_backlog,
+            limit_max_requests=limit_max_requests,
+            timeout_graceful_shutdown=(
+                settings.server_timeout_graceful_shutdown
+            ),
+        )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,78 @@
+"""The module providing Pydantic settings for the backend server."""
+from pathlib import Path
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ServerSettings(BaseSettings):
+    """
+    Pydantic settings model for the Uvicorn server.
+
+    Attributes
+    ----------
+    server_host : str
+        Host address the server is bound to (default: '127.0.0.1').
+    server_port : int
+        Port number the server is bound to (default: 8000).
+    server_workers : int
+        Number of worker processes (default: 1). Report generation
+        holds the GIL, so one worker per CPU core is recommended
+        in production.
+    server_loop : {'auto', 'asyncio', 'uvloop'}
+        Event loop implementation (default: 'auto').
+        'auto' selects uvloop if it is installed.
+    server_http : {'auto', 'h11', 'httptools'}
+        HTTP protocol implementation (default: 'auto').
+        'auto' selects httptools if it is installed.
+    server_timeout_keep_alive : int
+        Seconds an idle keep-alive connection is kept open (default: 5).
+    server_backlog : int
+        Maximum number of pending connections (default: 2048).
+    server_limit_max_requests : int or None
+        Number of requests after which a worker is gracefully restarted
+        to release memory held by pandas (default: None, no restarts).
+        It is ignored if there is a single worker, because Uvicorn
+        restarts workers only if there are more than one of them.
+    server_timeout_graceful_shutdown : int or None
+        Seconds a stopping worker waits for running requests
+        (default: 30).
+    server_threadpool_size : int
+        Number of threads running synchronous routes (default: 40).
+    server_debug : bool
+        Whether responses contain `X-DB-Queries` and `X-DB-Time`
+        headers with the number and duration of database queries
+        of the request (default: False).
+    server_metrics_dir : Path or None
+        Directory where workers write snapshots of their metrics,
+        which are summed up by `/metrics` (default: None). Snapshots
+        left by a previous run are removed on start. If it is not set
+        and there are several workers, `start_backend` creates
+        a temporary directory and passes it to the workers.
+    server_metrics_interval : float
+        Seconds between snapshots of metrics of a worker (default: 1).
+        Metrics of other workers are up to this interval old.
+    model_config : SettingsConfigDict
+        Configuration for loading settings from an environment file.
+        The file is expected to be located at 'src/backend/api/.env'.
+
+    """
+
+    server_host: str = '127.0.0.1'
+    server_port: int = 8000
+    server_workers: int = 1
+    server_loop: Literal['auto', 'asyncio', 'uvloop'] = 'auto'
+    server_http: Literal['auto', 'h11', 'httptools'] = 'auto'
+    server_timeout_keep_alive: int = 5
+    server_backlog: int = 2048
+    server_limit_max_requests: int | None = None
+    server_timeout_graceful_shutdown: int | None = 30
+    server_threadpool_size: int = 40
+    server_debug: bool = False
+    server_metrics_dir: Path | None = None
+    server_metrics_interval: float = 1
+
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).parent.joinpath('.env'),
+        env_file_encoding='utf-8',
+    )
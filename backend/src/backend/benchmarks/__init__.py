@@ -0,0 +1,6 @@
+"""
+The package provides benchmarks of the backend.
+
+They are run as console scripts and log their measurements.
+
+"""
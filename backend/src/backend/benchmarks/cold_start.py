@@ -0,0 +1,75 @@
+"""
+Benchmark of the cold start of the backend application.
+
+Each measurement imports the application module in a new Python
+interpreter, so that nothing is cached by previous imports.
+
+Examples
+--------
+To measure the import time ten times, run:
+```
+python -m backend.benchmarks.cold_start --repeat 10
+```
+
+"""
+import argparse
+import logging
+import statistics
+import subprocess  # noqa: S404
+import sys
+
+from custom_logging import config_logging
+
+logger = logging.getLogger(__name__)
+APP_MODULE = 'backend.api.run_backend'
+IMPORT_SCRIPT = '\n'.join((
+    'import time',
+    'start = time.perf_counter()',
+    f'import {APP_MODULE}',
+    'print(time.perf_counter() - start)',
+))
+
+
+def measure_import_time() -> float:
+    """
+    Import the application module in a new interpreter.
+
+    Returns
+    -------
+    float
+        The import time in seconds.
+
+    """
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, '-c', IMPORT_SCRIPT],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    """Measure the import time of the application and log statistics."""
+    config_logging()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='number of measurements',
+    )
+    args = parser.parse_args()
+    durations = [measure_import_time() for _ in range(args.repeat)]
+    logger.info(
+        'Import of "%s" (%d runs): min %.3f s, median %.3f s, max %.3f s.',
+        APP_MODULE,
+        len(durations),
+        min(durations),
+        statistics.median(durations),
+        max(durations),
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+The module encoding budget entries as Apache Arrow IPC streams.
+
+Arrow streams transfer entries as typed columns, so that clients read
+them into data frames without parsing JSON objects row by row.
+The cursor of the next page is stored in the metadata of the schema.
+
+"""
+import pyarrow as pa
+from pydantic import ValidationError
+
+from backend.entries_app.exceptions import (
+    MissedColumnsError,
+    ProcessingError,
+)
+from backend.entries_app.models import BudgetEntriesPage, BudgetEntrySchema
+
+ARROW_STREAM_TYPE = 'application/vnd.apache.arrow.stream'
+NEXT_CURSOR_KEY = 'next_cursor'
+ENTRIES_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('date', pa.timestamp('us')),
+    ('shop', pa.string()),
+    ('product', pa.string()),
+    ('amount', pa.float64()),
+    ('category', pa.string()),
+    ('person', pa.string()),
+    ('currency', pa.string()),
+])
+
+
+def encode_page(page: BudgetEntriesPage) -> bytes:
+    """
+    Encode a page of budget entries as an Arrow IPC stream.
+
+    Parameters
+    ----------
+    page : BudgetEntriesPage
+        A page of budget entries and the cursor of the next page.
+
+    Returns
+    -------
+    bytes
+        The stream containing one record batch of the entries.
+
+    """
+    schema = ENTRIES_SCHEMA
+    if page.next_cursor is not None:
+        schema = schema.with_metadata({NEXT_CURSOR_KEY: page.next_cursor})
+    table = pa.Table.from_pylist(
+        [entry.model_dump() for entry in page.entries],
+        schema=schema,
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema=schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_entries(data: bytes) -> list[BudgetEntrySchema]:
+    """
+    Decode budget entries from an Arrow IPC stream.
+
+    Columns are cast to the types of budget entries as a whole,
+    and the `id` column may be missing or contain nulls
+    for new entries.
+
+    Parameters
+    ----------
+    data : bytes
+        The stream containing record batches of entries.
+
+    Returns
+    -------
+    list of BudgetEntrySchema
+        The decoded budget entries.
+
+    Raises
+    ------
+    MissedColumnsError
+        If required columns are missing in the stream.
+    ProcessingError
+        If the stream cannot be read, or its columns cannot be cast,
+        or required values are missing.
+
+    """
+    try:
+        table = pa.ipc.open_stream(data).read_all()
+    except pa.ArrowInvalid as exc:
+        raise ProcessingError from exc
+    missed_columns = [
+        field.name
+        for field in ENTRIES_SCHEMA
+        if field.name != 'id' and field.name not in table.column_names
+    ]
+    if missed_columns:
+        raise MissedColumnsError(missed_columns=missed_columns)
+    if 'id' not in table.column_names:
+        table = table.append_column(
+            'id',
+            pa.nulls(table.num_rows, type=pa.int64()),
+        )
+    try:
+        table = table.select(ENTRIES_SCHEMA.names).cast(ENTRIES_SCHEMA)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as exc:
+        raise ProcessingError from exc
+    try:
+        return [
+            BudgetEntrySchema.model_validate(entry)
+            for entry in table.to_pylist()
+        ]
+    except ValidationError as exc:
+        raise ProcessingError from exc
@@ -0,0 +1,414 @@
+"""The module providing an asynchronous service for budget entries."""
+from collections.abc import AsyncIterator
+
+import sqlalchemy as sql
+from anyio import CancelScope
+from fastapi import UploadFile
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from backend.entries_app.batch_updater import BatchCounts
+from backend.entries_app.budget_service import (
+    FILTERED_DIMENSIONS,
+    MSG_FIELD,
+    BudgetService,
+)
+from backend.entries_app.models import (
+    BudgetEntriesExport,
+    BudgetEntriesFilter,
+    BudgetEntriesPage,
+    BudgetEntry,
+    BudgetEntrySchema,
+    EntriesSummary,
+)
+from backend.entries_app.summary import SUMMARY_ID
+from backend.jobs_app.job_queue import JobQueue
+from backend.jobs_app.models import JobSchema
+
+
+class AsyncBudgetService:
+    """
+    Asynchronous service for managing budget entries in a database.
+
+    It exposes the methods of `BudgetService` as coroutines.
+    If an asynchronous engine is specified, queries are awaited
+    on it without occupying threads. Otherwise, the methods
+    of `BudgetService` are run in the threadpool.
+    Uploads are always run in the threadpool, because they are
+    parsed with pandas and written with psycopg2 `COPY`. Exports are
+    also read with psycopg2 server-side cursors in the threadpool.
+    Names of fields of saved and filtered entries are converted
+    into IDs by the cache of `BudgetService` in the threadpool,
+    because missing names are added with the synchronous engine.
+    Pages without filters by these fields skip the threadpool.
+
+    Attributes
+    ----------
+    budget_service : BudgetService
+        Synchronous service for managing budget entries.
+    engine : AsyncEngine or None
+        SQLAlchemy asynchronous database engine.
+    session_factory : async_sessionmaker or None
+        Factory of asynchronous sessions bound to the engine.
+
+    """
+
+    def __init__(
+        self,
+        budget_service: BudgetService,
+        engine: AsyncEngine | None = None,
+    ) -> None:
+        """
+        Initialize the AsyncBudgetService.
+
+        Parameters
+        ----------
+        budget_service : BudgetService
+            Synchronous service for managing budget entries.
+        engine : AsyncEngine, optional
+            SQLAlchemy asynchronous database engine.
+            If not specified, the threadpool mode is used.
+
+        """
+        self.budget_service = budget_service
+        self.engine = engine
+        self.session_factory = None
+        if engine is not None:
+            self.session_factory = async_sessionmaker(
+                engine,
+                expire_on_commit=False,
+            )
+
+    async def create_entry(
+        self,
+        entry: BudgetEntrySchema,
+    ) -> dict[str, str]:
+        """
+        Create a new budget entry.
+
+        Parameters
+        ----------
+        entry : BudgetEntrySchema
+            The budget entry schema containing the entry details.
+
+        Returns
+        -------
+        dict
+            A success message indicating the entry was added.
+
+        """
+        if self.session_factory is None:
+            return await run_in_threadpool(
+                self.budget_service.create_entry,
+                entry=entry,
+            )
+        row, = await run_in_threadpool(
+            self.budget_service.dimensions.encode,
+            rows=[entry.model_dump(exclude_unset=True)],
+        )
+        async with self.session_factory() as session:
+            session.add(BudgetEntry(**row))
+            await session.commit()
+        return {MSG_FIELD: 'Entry is added successfully.'}
+
+    async def get_entries_info(self) -> dict[str, str | int | None]:
+        """
+        Return summary information about the budget entries.
+
+        Returns
+        -------
+        dict
+            A dictionary containing the number of entries, date range,
+            number of unique categories, and number of unique persons.
+
+        """
+        if self.session_factory is None:
+            return await run_in_threadpool(
+                self.budget_service.get_entries_info,
+            )
+        async with self.session_factory() as session:
+            summary = await session.get(EntriesSummary, SUMMARY_ID)
+            if summary is None:
+                result = await session.execute(BudgetService.select_info())
+                summary = result.one()
+        return BudgetService.format_info(summary=summary)
+
+    async def read_entries(
+        self,
+        limit: int = 10,
+        cursor: str | None = None,
+        filters: BudgetEntriesFilter | None = None,
+    ) -> BudgetEntriesPage:
+        """
+        Return a page of filtered and sorted budget entries.
+
+        Parameters
+        ----------
+        limit : int, optional
+            Maximum number of entries to return, by default 10.
+        cursor : str, optional
+            Cursor returned with the previous page, by default None.
+            If None, the first page is returned.
+        filters : BudgetEntriesFilter, optional
+            Filters and sorting of entries. By default, all entries
+            are ordered by date and ID in descending order.
+
+        Returns
+        -------
+        BudgetEntriesPage
+            A page of budget entries and the cursor of the next page.
+
+        """
+        if self.session_factory is None:
+            return await run_in_threadpool(
+                self.budget_service.read_entries,
+                limit=limit,
+                cursor=cursor,
+                filters=filters,
+            )
+        if filters is None:
+            filters = BudgetEntriesFilter()
+        dimension_ids = None
+        if any(getattr(filters, field) for field in FILTERED_DIMENSIONS):
+            dimension_ids = await run_in_threadpool(
+                self.budget_service.get_dimension_ids,
+                filters=filters,
+            )
+        stmt = BudgetService.select_page(
+            limit=limit,
+            cursor=cursor,
+            filters=filters,
+            dimension_ids=dimension_ids,
+        )
+        async with self.session_factory() as session:
+            entries = list(await session.execute(stmt))
+        return BudgetService.build_page(
+            entries=entries,
+            limit=limit,
+            sort_by=filters.sort_by,
+        )
+
+    async def search_entries(
+        self,
+        query: str,
+        limit: int = 10,
+        cursor: str | None = None,
+    ) -> BudgetEntriesPage:
+        """
+        Return a page of entries whose product or shop match a query.
+
+        Parameters
+        ----------
+        query : str
+            Searched text.
+        limit : int, optional
+            Maximum number of entries to return, by default 10.
+        cursor : str, optional
+            Cursor returned with the previous page, by default None.
+            If None, the first page is returned.
+
+        Returns
+        -------
+        BudgetEntriesPage
+            A page of the best matching entries and the cursor
+            of the next page.
+
+        """
+        if self.session_factory is None:
+            return await run_in_threadpool(
+                self.budget_service.search_entries,
+                query=query,
+                limit=limit,
+                cursor=cursor,
+            )
+        stmt = BudgetService.select_matches(
+            query=query,
+            limit=limit,
+            cursor=cursor,
+            trigram_search=self.budget_service.trigram_search,
+        )
+        async with self.session_factory() as session:
+            rows = list(await session.execute(stmt))
+        return BudgetService.build_search_page(rows=rows, limit=limit)
+
+    async def export_entries(
+        self,
+        query: BudgetEntriesExport,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield encoded budget entries fetching them in the threadpool.
+
+        The synchronous generator of the file is closed
+        in the threadpool when the export stops, even if the client
+        disconnects and the response is cancelled, so that
+        its server-side cursor and connection are released at once.
+
+        Parameters
+        ----------
+        query : BudgetEntriesExport
+            Filters and sorting of entries, and the file format.
+
+        Yields
+        ------
+        bytes
+            Encoded chunks of the file.
+
+        """
+        chunks = self.budget_service.export_entries(query=query)
+        try:
+            async for chunk in iterate_in_threadpool(chunks):
+                yield chunk
+        finally:
+            with CancelScope(shield=True):
+                await run_in_threadpool(chunks.close)
+
+    async def update_entries(
+        self,
+        updated_entries: list[BudgetEntrySchema],
+    ) -> dict[str, str | int | list[BatchCounts]]:
+        """
+        Update multiple budget entries.
+
+        Entries without ID (or with ID equal to -1) are added as new ones.
+
+        Parameters
+        ----------
+        updated_entries : list of BudgetEntrySchema
+            A list of budget entry schemas with updated data.
+
+        Returns
+        -------
+        dict
+            A success message indicating the entries were updated,
+            total numbers of inserted and updated entries,
+            and these numbers for each batch.
+
+        """
+        if self.session_factory is None:
+            return await run_in_threadpool(
+                self.budget_service.update_entries,
+                updated_entries=updated_entries,
+            )
+        rows = await run_in_threadpool(
+            self.budget_service.dimensions.encode,
+            rows=[entry.model_dump() for entry in updated_entries],
+        )
+        async with self.session_factory() as session:
+            batches = await session.run_sync(self._save_entries, rows)
+            await session.commit()
+        return BudgetService.format_batches(batches=batches)
+
+    async def upload_entries(
+        self,
+        uploaded_entries: UploadFile,
+        *,
+        streaming: bool = False,
+    ) -> dict[str, str | int | float]:
+        """
+        Upload and save budget entries from a CSV file in the threadpool.
+
+        Parameters
+        ----------
+        uploaded_entries : UploadFile
+            The uploaded CSV file containing budget entries.
+        streaming : bool, optional
+            Whether to parse and save the file in chunks
+            of `upload_chunk_size` rows, by default False.
+
+        Returns
+        -------
+        dict
+            A success message, the numbers of uploaded entries,
+            new entries, skipped entries, and skipped duplicates
+            within the file, and the upload rate in rows per second.
+
+        """
+        return await run_in_threadpool(
+            self.budget_service.upload_entries,
+            uploaded_entries,
+            streaming=streaming,
+        )
+
+    async def submit_upload(
+        self,
+        uploaded_entries: UploadFile,
+        job_queue: JobQueue,
+        *,
+        streaming: bool = False,
+    ) -> JobSchema:
+        """
+        Copy an uploaded file and submit a background job uploading it.
+
+        Parameters
+        ----------
+        uploaded_entries : UploadFile
+            The uploaded file containing budget entries.
+        job_queue : JobQueue
+            The queue running the upload.
+        streaming : bool, optional
+            Whether to parse and save the file in chunks
+            of `upload_chunk_size` rows, by default False.
+
+        Returns
+        -------
+        JobSchema
+            The pending job.
+
+        """
+        return await run_in_threadpool(
+            self.budget_service.submit_upload,
+            uploaded_entries,
+            job_queue,
+            streaming=streaming,
+        )
+
+    async def delete_all_entries(self) -> dict[str, str]:
+        """
+        Delete all budget entries from the database.
+
+        Returns
+        -------
+        dict
+            A success message indicating all entries were deleted.
+
+        """
+        if self.session_factory is None:
+            return await run_in_threadpool(
+                self.budget_service.delete_all_entries,
+            )
+        async with self.session_factory() as session:
+            await session.execute(sql.delete(BudgetEntry))
+            await session.commit()
+        return {MSG_FIELD: 'All entries are deleted successfully.'}
+
+    async def close(self) -> None:
+        """Release connections of the asynchronous engine."""
+        if self.engine is not None:
+            await self.engine.dispose()
+
+    def _save_entries(
+        self,
+        session: Session,
+        rows: list[dict],
+    ) -> list[BatchCounts]:
+        """
+        Save entries with the batch updater of the synchronous service.
+
+        Parameters
+        ----------
+        session : Session
+            Synchronous facade of an asynchronous session.
+        rows : list of dict
+            Rows of budget entries to save.
+
+        Returns
+        -------
+        list of dict
+            Numbers of inserted and updated entries for each batch.
+
+        """
+        return self.budget_service.batch_updater.save(
+            rows=rows,
+            session=session,
+        )
@@ -0,0 +1,177 @@
+"""The module providing a set-based updater of budget entries."""
+import sqlalchemy as sql
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from backend.entries_app.models import BudgetEntry
+
+NEW_ENTRY_IDS = frozenset((-1, None))
+BatchCounts = dict[str, int]
+
+
+class BatchUpdater:
+    """
+    Updater of budget entries using set-based database operations.
+
+    Entries without ID (or with ID equal to -1) are inserted,
+    the other entries are updated, or inserted with their IDs
+    if they do not exist. If an ID occurs several times in a batch,
+    only its last row is saved, because PostgreSQL cannot update
+    a row twice in one statement. Each batch of entries takes
+    a constant number of database round trips.
+
+    Attributes
+    ----------
+    batch_size : int
+        Maximum number of entries processed in one batch.
+
+    """
+
+    def __init__(self, batch_size: int) -> None:
+        """
+        Initialize the BatchUpdater.
+
+        Parameters
+        ----------
+        batch_size : int
+            Maximum number of entries processed in one batch.
+
+        """
+        self.batch_size = batch_size
+
+    def save(
+        self,
+        rows: list[dict],
+        session: Session,
+    ) -> list[BatchCounts]:
+        """
+        Insert new entries and update existing ones batch by batch.
+
+        Parameters
+        ----------
+        rows : list of dict
+            Rows of budget entries to save, containing IDs
+            of names of their fields (see `DimensionCache.encode`).
+        session : Session
+            The database session. It is not committed by this method.
+
+        Returns
+        -------
+        list of dict
+            Numbers of inserted and updated entries for each batch.
+
+        """
+        return [
+            self._save_batch(
+                rows=rows[start:start + self.batch_size],
+                session=session,
+            )
+            for start in range(0, len(rows), self.batch_size)
+        ]
+
+    @classmethod
+    def _save_batch(
+        cls,
+        rows: list[dict],
+        session: Session,
+    ) -> BatchCounts:
+        """
+        Insert new entries and update existing ones.
+
+        Parameters
+        ----------
+        rows : list of dict
+            Rows of budget entries of a batch.
+        session : Session
+            The database session.
+
+        Returns
+        -------
+        dict
+            Numbers of inserted and updated entries. Rows sharing
+            an ID are counted once.
+
+        """
+        new_rows = [
+            {column: row[column] for column in row if column != 'id'}
+            for row in rows
+            if row.get('id') in NEW_ENTRY_IDS
+        ]
+        existing_rows = list({
+            row['id']: row
+            for row in rows
+            if row.get('id') not in NEW_ENTRY_IDS
+        }.values())
+        if new_rows:
+            session.execute(sql.insert(BudgetEntry), new_rows)
+        counts = {'inserted': len(new_rows), 'updated': 0}
+        if existing_rows:
+            if session.get_bind().dialect.name == 'postgresql':
+                inserted = cls._upsert(rows=existing_rows, session=session)
+            else:
+                inserted = cls._update(rows=existing_rows, session=session)
+            counts['inserted'] += inserted
+            counts['updated'] += len(existing_rows) - inserted
+        return counts
+
+    @classmethod
+    def _upsert(cls, rows: list[dict], session: Session) -> int:
+        """
+        Save entries with `INSERT ... ON CONFLICT DO UPDATE`.
+
+        Parameters
+        ----------
+        rows : list of dict
+            Budget entries with IDs.
+        session : Session
+            The database session bound to PostgreSQL.
+
+        Returns
+        -------
+        int
+            Number of inserted entries.
+
+        """
+        stmt = postgresql.insert(BudgetEntry)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BudgetEntry.id],
+            set_={
+                column: stmt.excluded[column]
+                for column in rows[0]
+                if column != 'id'
+            },
+        ).returning(sql.literal_column('xmax = 0'))
+        return sum(session.scalars(stmt, rows))
+
+    @classmethod
+    def _update(cls, rows: list[dict], session: Session) -> int:
+        """
+        Save entries with bulk `UPDATE` and `INSERT` statements.
+
+        Parameters
+        ----------
+        rows : list of dict
+            Budget entries with IDs.
+        session : Session
+            The database session.
+
+        Returns
+        -------
+        int
+            Number of inserted entries.
+
+        """
+        existing_ids = set(
+            session.scalars(
+                sql.select(BudgetEntry.id).where(
+                    BudgetEntry.id.in_([row['id'] for row in rows]),
+                ),
+            ),
+        )
+        updated_rows = [row for row in rows if row['id'] in existing_ids]
+        inserted_rows = [row for row in rows if row['id'] not in existing_ids]
+        if updated_rows:
+            session.execute(sql.update(BudgetEntry), updated_rows)
+        if inserted_rows:
+            session.execute(sql.insert(BudgetEntry), inserted_rows)
+        return len(inserted_rows)
@@ -1,20 +1,76 @@
 """The module providing a class for managing budget entries in a database."""
-import io
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
 
-import pandas as pd
 import sqlalchemy as sql
 from fastapi import UploadFile
-from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import Session
 
-from backend.entries_app.exceptions import MissedColumnsError, NoFileUploaded
-from backend.entries_app.models import BudgetEntry, BudgetEntrySchema
+from backend.entries_app.batch_updater import BatchCounts, BatchUpdater
+from backend.entries_app.bulk_loader import BulkLoader
+from backend.entries_app.dimensions import (
+    ENTRY_COLUMNS,
+    ID_COLUMNS,
+    SORT_COLUMNS,
+    DimensionCache,
+    join_dimensions,
+    select_entries,
+)
+from backend.entries_app.exceptions import NoFileUploaded
+from backend.entries_app.exporter import EntriesExporter
+from backend.entries_app.models import (
+    BudgetEntriesExport,
+    BudgetEntriesFilter,
+    BudgetEntriesPage,
+    BudgetEntry,
+    BudgetEntrySchema,
+    EntriesSummary,
+    SortColumn,
+    SortOrder,
+)
+from backend.entries_app.pagination import (
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+)
+from backend.entries_app.search import get_search_rank
+from backend.entries_app.settings import ExportSettings, UploadSettings
+from backend.entries_app.summary import SUMMARY_ID
+from backend.entries_app.upload_reader import UploadReader
+from backend.jobs_app.job_queue import JobQueue
+from backend.jobs_app.models import JobSchema, JobType
 
 MSG_FIELD = 'message'
+FILTERED_DIMENSIONS = ('category', 'person', 'shop', 'currency')
 
 
 class BudgetService:  # noqa: WPS214
-    """Service class for managing budget entries in a database."""
+    """
+    Service class for managing budget entries in a database.
+
+    Attributes
+    ----------
+    engine : sql.Engine
+        SQLAlchemy database engine.
+    dimensions : DimensionCache
+        Cache converting names of entry fields into IDs of lookup tables.
+    upload_settings : UploadSettings
+        Settings of batching and chunking of uploaded entries.
+    upload_reader : UploadReader
+        Reader parsing and validating uploaded files.
+    bulk_loader : BulkLoader
+        Loader writing uploaded entries with bulk database operations.
+    batch_updater : BatchUpdater
+        Updater saving changed entries with set-based database operations.
+    exporter : EntriesExporter
+        Exporter streaming entries from a server-side cursor.
+    trigram_search : bool
+        Whether entries are searched with trigram indexes. It is set
+        when the database schema is bootstrapped.
+
+    """
 
     def __init__(
         self,
@@ -30,6 +86,22 @@ class BudgetService:  # noqa: WPS214
 
         """
         self.engine = engine
+        self.dimensions = DimensionCache(engine=engine)
+        self.upload_settings = UploadSettings()
+        self.upload_reader = UploadReader(
+            chunk_size=self.upload_settings.upload_chunk_size,
+        )
+        self.bulk_loader = BulkLoader(
+            batch_size=self.upload_settings.upload_batch_size,
+            dimensions=self.dimensions,
+        )
+        self.batch_updater = BatchUpdater(
+            batch_size=self.upload_settings.upload_batch_size,
+        )
+        self.exporter = EntriesExporter(
+            chunk_size=ExportSettings().export_chunk_size,
+        )
+        self.trigram_search = False
 
     def create_entry(
         self,
@@ -49,17 +121,24 @@ class BudgetService:  # noqa: WPS214
             A success message indicating the entry was added.
 
         """
+        row, = self.dimensions.encode(
+            rows=[entry.model_dump(exclude_unset=True)],
+        )
         with Session(self.engine) as session:
-            db_entry = BudgetEntry(**entry.model_dump(exclude_unset=True))
+            db_entry = BudgetEntry(**row)
             session.add(db_entry)
             session.commit()
-            session.refresh(db_entry)
             return {MSG_FIELD: 'Entry is added successfully.'}
 
-    def get_entries_info(self) -> dict[str, str | int]:
+    def get_entries_info(self) -> dict[str, str | int | None]:
         """
         Return summary information about the budget entries.
 
+        The information is read from the summary table maintained
+        by database triggers. If the table is not filled
+        (e.g., for databases other than PostgreSQL),
+        the budget entries are aggregated directly.
+
         Returns
         -------
         dict
@@ -68,59 +147,127 @@ class BudgetService:  # noqa: WPS214
 
         """
         with Session(self.engine) as session:
-            summary = session.query(
-                sql.func.count(BudgetEntry.id),
-                sql.func.min(BudgetEntry.date),
-                sql.func.max(BudgetEntry.date),
-                sql.func.count(sql.func.distinct(BudgetEntry.category)),
-                sql.func.count(sql.func.distinct(BudgetEntry.person)),
-            ).first()
-        return {
-            'entries_number': summary[0],
-            'min_date': summary[1].isoformat() if summary[1] else None,
-            'max_date': summary[2].isoformat() if summary[2] else None,
-            'categories_number': summary[3],
-            'persons_number': summary[4],
-        }
+            summary = session.get(EntriesSummary, SUMMARY_ID)
+            if summary is None:
+                summary = session.execute(self.select_info()).one()
+        return self.format_info(summary=summary)
 
     def read_entries(
         self,
-        skip: int = 0,
         limit: int = 10,
-    ) -> list[BudgetEntry]:
+        cursor: str | None = None,
+        filters: BudgetEntriesFilter | None = None,
+    ) -> BudgetEntriesPage:
+        """
+        Return a page of filtered and sorted budget entries.
+
+        Pages are selected by keyset pagination, so that the cost
+        of reading a page does not depend on its position.
+
+        Parameters
+        ----------
+        limit : int, optional
+            Maximum number of entries to return, by default 10.
+        cursor : str, optional
+            Cursor returned with the previous page, by default None.
+            If None, the first page is returned.
+        filters : BudgetEntriesFilter, optional
+            Filters and sorting of entries. By default, all entries
+            are ordered by date and ID in descending order.
+
+        Returns
+        -------
+        BudgetEntriesPage
+            A page of budget entries and the cursor of the next page.
+
+        """
+        if filters is None:
+            filters = BudgetEntriesFilter()
+        stmt = self.select_page(
+            limit=limit,
+            cursor=cursor,
+            filters=filters,
+            dimension_ids=self.get_dimension_ids(filters=filters),
+        )
+        with Session(self.engine) as session:
+            entries = list(session.execute(stmt))
+        return self.build_page(
+            entries=entries,
+            limit=limit,
+            sort_by=filters.sort_by,
+        )
+
+    def search_entries(
+        self,
+        query: str,
+        limit: int = 10,
+        cursor: str | None = None,
+    ) -> BudgetEntriesPage:
         """
-        Return a paginated list of budget entries ordered by date and ID.
+        Return a page of entries whose product or shop match a query.
 
         Parameters
         ----------
-        skip : int, optional
-            Number of entries to skip, by default 0.
+        query : str
+            Searched text.
         limit : int, optional
             Maximum number of entries to return, by default 10.
+        cursor : str, optional
+            Cursor returned with the previous page, by default None.
+            If None, the first page is returned.
 
         Returns
         -------
-        list of BudgetEntry
-            A list of budget entries.
+        BudgetEntriesPage
+            A page of the best matching entries and the cursor
+            of the next page.
 
         """
-        stmt = (
-            sql.select(BudgetEntry)
-            .order_by(BudgetEntry.date.desc())
-            .order_by(BudgetEntry.id.desc())
-            .offset(skip)
-            .limit(limit)
+        stmt = self.select_matches(
+            query=query,
+            limit=limit,
+            cursor=cursor,
+            trigram_search=self.trigram_search,
         )
         with Session(self.engine) as session:
-            return list(session.scalars(stmt))
+            rows = list(session.execute(stmt))
+        return self.build_search_page(rows=rows, limit=limit)
+
+    def export_entries(self, query: BudgetEntriesExport) -> Iterator[bytes]:
+        """
+        Yield filtered and sorted budget entries encoded as a file.
+
+        Parameters
+        ----------
+        query : BudgetEntriesExport
+            Filters and sorting of entries, and the file format.
+
+        Yields
+        ------
+        bytes
+            Encoded chunks of the file.
+
+        """
+        stmt = self.filter_entries(
+            stmt=self.exporter.select_columns(),
+            filters=query,
+            dimension_ids=self.get_dimension_ids(filters=query),
+        ).order_by(*self.get_order(filters=query))
+        yield from self.exporter.export(
+            engine=self.engine,
+            stmt=stmt,
+            export_format=query.format,
+        )
 
     def update_entries(
         self,
         updated_entries: list[BudgetEntrySchema],
-    ) -> dict[str, str]:
+    ) -> dict[str, str | int | list[BatchCounts]]:
         """
         Update multiple budget entries.
 
+        Entries without ID (or with ID equal to -1) are added as new ones.
+
         Parameters
         ----------
         updated_entries : list of BudgetEntrySchema
@@ -129,51 +276,162 @@ class BudgetService:  # noqa: WPS214
         Returns
         -------
         dict
-            A success message indicating the entries were updated.
+            A success message indicating the entries were updated,
+            total numbers of inserted and updated entries,
+            and these numbers for each batch.
 
         """
+        rows = self.dimensions.encode(
+            rows=[entry.model_dump() for entry in updated_entries],
+        )
         with Session(self.engine) as session:
-            for updated_entry in updated_entries:
-                self._update_entry(
-                    updated_entry=updated_entry,
-                    session=session,
-                )
+            batches = self.batch_updater.save(rows=rows, session=session)
             session.commit()
-            return {MSG_FIELD: 'Entries are saved successfully.'}
+        return self.format_batches(batches=batches)
 
     def upload_entries(
         self,
         uploaded_entries: UploadFile,
-    ) -> dict[str, str]:
+        *,
+        streaming: bool = False,
+        progress: Callable[[int, float | None], None] | None = None,
+    ) -> dict[str, str | int | float]:
         """
-        Upload and save budget entries from a CSV file.
+        Upload and save budget entries from a file.
+
+        Semicolon-separated CSV files, optionally compressed with gzip
+        or zstd, Parquet files and Arrow IPC files or streams
+        are accepted. Entries that are already saved are skipped,
+        so uploading the same file again does not duplicate them.
+        Equal entries of the same file (or of the same chunk
+        in the streaming mode) are saved once as well, and they are
+        reported as duplicates.
 
         Parameters
         ----------
         uploaded_entries : UploadFile
-            The uploaded CSV file containing budget entries.
+            The uploaded file containing budget entries.
+        streaming : bool, optional
+            Whether to parse and save the file in chunks
+            of `upload_chunk_size` rows, by default False.
+            In the streaming mode, the peak memory does not depend on
+            the file size, and each chunk is committed separately, so
+            the chunks preceding an invalid one remain saved.
+        progress : Callable, optional
+            Callback called after saving each chunk with the number
+            of saved rows and the fraction of the file that is read.
 
         Returns
         -------
         dict
-            A success message indicating the number of uploaded entries.
+            A success message, the numbers of uploaded entries,
+            new entries, skipped entries, and skipped duplicates
+            within the file, and the upload rate in rows per second.
 
         """
         if not uploaded_entries:
             raise NoFileUploaded
-        df = self._process_upload_entries(uploaded_entries=uploaded_entries)
-        with Session(self.engine) as session:
-            for record in df.to_dict(orient='records'):
-                entry_schema = BudgetEntrySchema(**record)
-                db_entry = BudgetEntry(
-                    **entry_schema.model_dump(exclude_unset=True),
-                )
-                session.add(db_entry)
-            session.commit()
-            session.refresh(db_entry)
-            return {
-                MSG_FIELD: f'{df.shape[0]} entries is uploaded successfully.',
-            }
+        start = time.perf_counter()
+        if streaming:
+            counts = Counter()
+            for df in self.upload_reader.iter_chunks(uploaded_entries):
+                with self.engine.begin() as connection:
+                    counts.update(
+                        self.bulk_loader.load(df=df, connection=connection),
+                    )
+                if progress is not None:
+                    progress(
+                        counts.total(),
+                        self.upload_reader.get_read_fraction(
+                            uploaded_entries=uploaded_entries,
+                        ),
+                    )
+        else:
+            df = self.upload_reader.read(uploaded_entries=uploaded_entries)
+            with self.engine.begin() as connection:
+                counts = self.bulk_loader.load(df=df, connection=connection)
+        duration = time.perf_counter() - start
+        new_entries_number = counts.get('new_entries_number', 0)
+        skipped_entries_number = counts.get('skipped_entries_number', 0)
+        duplicates_number = counts.get('duplicates_number', 0)
+        entries_number = new_entries_number + skipped_entries_number
+        return {
+            MSG_FIELD: (
+                f'{new_entries_number} entries is uploaded successfully, '
+                f'{skipped_entries_number} entries are skipped, '
+                f'including {duplicates_number} duplicates within the file.'
+            ),
+            'entries_number': entries_number,
+            'new_entries_number': new_entries_number,
+            'skipped_entries_number': skipped_entries_number,
+            'duplicates_number': duplicates_number,
+            'rows_per_second': round(entries_number / duration, 1),
+        }
+
+    def submit_upload(
+        self,
+        uploaded_entries: UploadFile,
+        job_queue: JobQueue,
+        *,
+        streaming: bool = False,
+    ) -> JobSchema:
+        """
+        Upload and save budget entries from a file in a background job.
+
+        Parameters
+        ----------
+        uploaded_entries : UploadFile
+            The uploaded file containing budget entries.
+        job_queue : JobQueue
+            The queue running the upload.
+        streaming : bool, optional
+            Whether to parse and save the file in chunks
+            of `upload_chunk_size` rows, by default False.
+            In the streaming mode, the progress of the job
+            is updated after each chunk.
+
+        Returns
+        -------
+        JobSchema
+            The pending job. The result of the succeeded job
+            is the response of `upload_entries`.
+
+        """
+        if not uploaded_entries:
+            raise NoFileUploaded
+        return job_queue.submit(
+            JobType.upload,
+            self._upload_detached_entries,
+            self.upload_reader.detach(uploaded_entries=uploaded_entries),
+            streaming=streaming,
+        )
+
+    def get_dimension_ids(
+        self,
+        filters: BudgetEntriesFilter,
+    ) -> dict[str, list[int]]:
+        """
+        Return IDs of names of entry fields filtering budget entries.
+
+        Parameters
+        ----------
+        filters : BudgetEntriesFilter
+            Filters of budget entries.
+
+        Returns
+        -------
+        dict
+            IDs of the filtered names of each filtered field.
+
+        """
+        return {
+            field: self.dimensions.find_ids(
+                dimension=field,
+                names=getattr(filters, field),
+            )
+            for field in FILTERED_DIMENSIONS
+            if getattr(filters, field)
+        }
 
     def delete_all_entries(self) -> dict[str, str]:
         """
@@ -191,76 +449,376 @@ class BudgetService:  # noqa: WPS214
             return {MSG_FIELD: 'All entries are deleted successfully.'}
 
     @classmethod
-    def _update_entry(
+    def select_info(cls) -> sql.Select:
+        """
+        Return a query aggregating summary information of all entries.
+
+        Returns
+        -------
+        sql.Select
+            A query returning one row with the same fields
+            as the summary table.
+
+        """
+        return sql.select(
+            sql.func.count(BudgetEntry.id).label('entries_number'),
+            sql.func.min(BudgetEntry.date).label('min_date'),
+            sql.func.max(BudgetEntry.date).label('max_date'),
+            sql.func.count(
+                sql.func.distinct(BudgetEntry.category_id),
+            ).label('categories_number'),
+            sql.func.count(
+                sql.func.distinct(BudgetEntry.person_id),
+            ).label('persons_number'),
+        )
+
+    @classmethod
+    def format_info(
         cls,
-        updated_entry: BudgetEntrySchema,
-        session: Session,
-    ) -> None:
+        summary: EntriesSummary | sql.Row,
+    ) -> dict[str, str | int | None]:
+        """
+        Convert summary information into a response dictionary.
+
+        Parameters
+        ----------
+        summary : EntriesSummary or sql.Row
+            The summary row or the result of `select_info`.
+
+        Returns
+        -------
+        dict
+            A dictionary containing the number of entries, date range,
+            number of unique categories, and number of unique persons.
+
+        """
+        min_date = summary.min_date
+        max_date = summary.max_date
+        return {
+            'entries_number': summary.entries_number,
+            'min_date': min_date.isoformat() if min_date else None,
+            'max_date': max_date.isoformat() if max_date else None,
+            'categories_number': summary.categories_number,
+            'persons_number': summary.persons_number,
+        }
+
+    @classmethod
+    def filter_entries(
+        cls,
+        stmt: sql.Select,
+        filters: BudgetEntriesFilter,
+        dimension_ids: dict[str, list[int]] | None = None,
+    ) -> sql.Select:
+        """
+        Add filters of budget entries to the WHERE clause of a query.
+
+        Fields with IDs of the filtered names are filtered by the indexed
+        ID columns. The other fields are filtered by names joined
+        from the lookup tables, which cannot be estimated by the planner.
+
+        Parameters
+        ----------
+        stmt : sql.Select
+            A query built on `join_dimensions`.
+        filters : BudgetEntriesFilter
+            Filters of budget entries.
+        dimension_ids : dict, optional
+            IDs returned by `get_dimension_ids`, by default None.
+
+        Returns
+        -------
+        sql.Select
+            The query selecting only the entries matching the filters.
+
+        """
+        if filters.date_from is not None:
+            stmt = stmt.where(BudgetEntry.date >= filters.date_from)
+        if filters.date_to is not None:
+            stmt = stmt.where(BudgetEntry.date <= filters.date_to)
+        if filters.amount_min is not None:
+            stmt = stmt.where(BudgetEntry.amount >= filters.amount_min)
+        if filters.amount_max is not None:
+            stmt = stmt.where(BudgetEntry.amount <= filters.amount_max)
+        dimension_ids = dimension_ids or {}
+        for field in FILTERED_DIMENSIONS:
+            values = getattr(filters, field)
+            if not values:
+                continue
+            if field in dimension_ids:
+                id_column = BudgetEntry.__table__.c[ID_COLUMNS[field]]
+                stmt = stmt.where(id_column.in_(dimension_ids[field]))
+            else:
+                stmt = stmt.where(ENTRY_COLUMNS[field].in_(values))
+        return stmt
+
+    @classmethod
+    def get_order(
+        cls,
+        filters: BudgetEntriesFilter,
+    ) -> tuple[sql.UnaryExpression, sql.UnaryExpression]:
+        """
+        Return the ORDER BY clause of filtered budget entries.
+
+        Parameters
+        ----------
+        filters : BudgetEntriesFilter
+            Filters and sorting of entries.
+
+        Returns
+        -------
+        tuple
+            The sort column and ID, both in the sort direction.
+            Fields stored in lookup tables are sorted by IDs
+            of their names.
+
+        """
+        sort_column = SORT_COLUMNS[filters.sort_by.value]
+        if filters.sort_order == SortOrder.desc:
+            return sort_column.desc(), BudgetEntry.id.desc()
+        return sort_column.asc(), BudgetEntry.id.asc()
+
+    @classmethod
+    def select_page(
+        cls,
+        limit: int,
+        cursor: str | None,
+        filters: BudgetEntriesFilter | None = None,
+        dimension_ids: dict[str, list[int]] | None = None,
+    ) -> sql.Select:
         """
-        Update or insert a single budget entry.
+        Return a query selecting a page of entries and one entry more.
+
+        IDs of the entries of the page are selected first, and then
+        names of their fields are joined from the lookup tables.
+        Shops, categories, persons and currencies are sorted
+        by IDs of their names, which group entries with equal names
+        in the order the names were first saved, rather than
+        alphabetically. So every sort column except for the product
+        is backed by an index, and pages are read in constant time.
 
         Parameters
         ----------
-        updated_entry : BudgetEntrySchema
-            The budget entry schema with updated data.
-        session : Session
-            The database session.
+        limit : int
+            Maximum number of entries in the page.
+        cursor : str or None
+            Cursor returned with the previous page.
+        filters : BudgetEntriesFilter, optional
+            Filters and sorting of entries. By default, all entries
+            are ordered by date and ID in descending order.
+        dimension_ids : dict, optional
+            IDs returned by `get_dimension_ids`, by default None.
+
+        Returns
+        -------
+        sql.Select
+            A query ordered by the sort column and ID.
+            For fields stored in lookup tables, the IDs of the names
+            are also selected for cursors.
 
         """
-        stmt = (
-            sql.select(BudgetEntry)
-            .where(BudgetEntry.id.in_([updated_entry.id]))
-            .order_by(BudgetEntry.id)
+        if filters is None:
+            filters = BudgetEntriesFilter()
+        sort_column = SORT_COLUMNS[filters.sort_by.value]
+        descending = filters.sort_order == SortOrder.desc
+        order = cls.get_order(filters=filters)
+        page = cls.filter_entries(
+            stmt=sql.select(BudgetEntry.id).select_from(join_dimensions()),
+            filters=filters,
+            dimension_ids=dimension_ids,
+        ).order_by(*order)
+        if cursor is not None:
+            position = sql.tuple_(sort_column, BudgetEntry.id)
+            last_position = sql.tuple_(
+                *decode_cursor(cursor=cursor, sort_by=filters.sort_by),
+            )
+            page = page.where(
+                position < last_position if descending
+                else position > last_position,
+            )
+        page_ids = page.limit(limit + 1).subquery()
+        entries = select_entries()
+        if filters.sort_by.value in ID_COLUMNS:
+            entries = entries.add_columns(sort_column)
+        return (
+            entries
+            .join(page_ids, page_ids.c.id == BudgetEntry.id)
+            .order_by(*order)
         )
-        try:
-            entry = session.scalars(stmt).one()
-        except NoResultFound:
-            dumped_model = updated_entry.model_dump(exclude_unset=True)
-            if dumped_model.get('id') in {-1, None}:
-                dumped_model.pop('id')
-            entry = BudgetEntry(**dumped_model)
-            session.add(entry)
-        else:
-            for entry_field in updated_entry.model_dump().items():
-                setattr(entry, *entry_field)
 
     @classmethod
-    def _process_upload_entries(
+    def build_page(
         cls,
-        uploaded_entries: UploadFile,
-    ) -> pd.DataFrame:
+        entries: list[sql.Row],
+        limit: int,
+        sort_by: SortColumn = SortColumn.date,
+    ) -> BudgetEntriesPage:
         """
-        Process and validate uploaded CSV entries.
+        Build a page from the entries selected by `select_page`.
 
         Parameters
         ----------
-        uploaded_entries : UploadFile
-            The uploaded CSV file.
+        entries : list of sql.Row
+            The selected entries.
+        limit : int
+            Maximum number of entries in the page.
+        sort_by : SortColumn, optional
+            Column sorting the entries, by default date.
 
         Returns
         -------
-        pd.DataFrame
-            A DataFrame containing the validated budget entries.
+        BudgetEntriesPage
+            A page of budget entries and the cursor of the next page.
 
-        Raises
-        ------
-        MissedColumnsError
-            If required columns are missing from the uploaded file.
+        """
+        next_cursor = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = encode_cursor(entry=entries[-1], sort_by=sort_by)
+        return BudgetEntriesPage(
+            entries=[
+                BudgetEntrySchema.model_validate(entry)
+                for entry in entries
+            ],
+            next_cursor=next_cursor,
+        )
+
+    @classmethod
+    def select_matches(
+        cls,
+        query: str,
+        limit: int,
+        cursor: str | None,
+        *,
+        trigram_search: bool,
+    ) -> sql.Select:
+        """
+        Return a query selecting a page of found entries and one more.
+
+        Parameters
+        ----------
+        query : str
+            Searched text.
+        limit : int
+            Maximum number of entries in the page.
+        cursor : str or None
+            Cursor returned with the previous page.
+        trigram_search : bool
+            Whether trigram indexes and functions are used.
+
+        Returns
+        -------
+        sql.Select
+            A query selecting entries with their ranks, ordered
+            by rank and ID in descending order.
+
+        """
+        condition, rank = get_search_rank(
+            query=query,
+            trigram_search=trigram_search,
+        )
+        stmt = select_entries().add_columns(rank.label('rank')).where(
+            condition,
+        )
+        if cursor is not None:
+            stmt = stmt.where(
+                sql.tuple_(rank, BudgetEntry.id)
+                < sql.tuple_(*decode_rank_cursor(cursor=cursor)),
+            )
+        return (
+            stmt
+            .order_by(rank.desc(), BudgetEntry.id.desc())
+            .limit(limit + 1)
+        )
+
+    @classmethod
+    def build_search_page(
+        cls,
+        rows: list[sql.Row],
+        limit: int,
+    ) -> BudgetEntriesPage:
+        """
+        Build a page from the rows selected by `select_matches`.
+
+        Parameters
+        ----------
+        rows : list of sql.Row
+            The selected entries with their ranks.
+        limit : int
+            Maximum number of entries in the page.
+
+        Returns
+        -------
+        BudgetEntriesPage
+            A page of budget entries and the cursor of the next page.
 
         """
-        df = pd.read_csv(
-            io.StringIO(uploaded_entries.file.read().decode('utf-8')),
-            sep=';',
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_rank_cursor(
+                rank=rows[-1].rank,
+                entry_id=rows[-1].id,
+            )
+        return BudgetEntriesPage(
+            entries=[BudgetEntrySchema.model_validate(row) for row in rows],
+            next_cursor=next_cursor,
         )
-        expected_fields = {**BudgetEntrySchema.model_fields}
-        expected_fields.pop('id')
-        missed_columns = [
-            column
-            for column in expected_fields
-            if column not in df.columns
-        ]
-        if missed_columns:
-            raise MissedColumnsError(missed_columns=missed_columns)
-
-        df['date'] = pd.to_datetime(df['date'])
-        return df
+
+    @classmethod
+    def format_batches(
+        cls,
+        batches: list[BatchCounts],
+    ) -> dict[str, str | int | list[BatchCounts]]:
+        """
+        Convert numbers of saved entries into a response dictionary.
+
+        Parameters
+        ----------
+        batches : list of dict
+            Numbers of inserted and updated entries for each batch.
+
+        Returns
+        -------
+        dict
+            A success message, total numbers of inserted
+            and updated entries, and these numbers for each batch.
+
+        """
+        return {
+            MSG_FIELD: 'Entries are saved successfully.',
+            'inserted': sum(batch['inserted'] for batch in batches),
+            'updated': sum(batch['updated'] for batch in batches),
+            'batches': batches,
+        }
+
+    def _upload_detached_entries(
+        self,
+        uploaded_entries: UploadFile,
+        *,
+        streaming: bool,
+        progress: Callable[[int, float | None], None],
+    ) -> dict[str, str | int | float]:
+        """
+        Upload entries from a copy of an uploaded file and delete it.
+
+        Parameters
+        ----------
+        uploaded_entries : UploadFile
+            The copy of the uploaded file.
+        streaming : bool
+            Whether to parse and save the file in chunks.
+        progress : Callable
+            Callback called after saving each chunk.
+
+        Returns
+        -------
+        dict
+            The response of `upload_entries`.
+
+        """
+        with uploaded_entries.file:
+            return self.upload_entries(
+                uploaded_entries,
+                streaming=streaming,
+                progress=progress,
+            )
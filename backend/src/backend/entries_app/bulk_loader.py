@@ -0,0 +1,458 @@
+"""The module providing a bulk loader of budget entries into a database."""
+import csv
+import io
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import sqlalchemy as sql
+from sqlalchemy.dialects import postgresql
+
+from backend.entries_app.arrow_format import ENTRIES_SCHEMA
+from backend.entries_app.dimensions import (
+    DIMENSIONS,
+    ENTRY_COLUMNS,
+    ID_COLUMNS,
+    DimensionCache,
+    insert_names,
+)
+from backend.entries_app.exceptions import MissedColumnsError, ProcessingError
+from backend.entries_app.fingerprint import get_fingerprint
+from backend.entries_app.models import BudgetEntry, BudgetEntrySchema
+
+logger = logging.getLogger(__name__)
+LoadCounts = dict[str, int]
+STAGING_TABLE = 'budget_entries_staging'
+
+COLUMN_CONVERTERS: dict[type, Callable[[pd.Series], pd.Series]] = {
+    datetime: pd.to_datetime,
+    float: pd.to_numeric,
+    str: lambda column: column.astype(str),
+}
+
+
+class BulkLoader:
+    """
+    Loader of budget entries using bulk database operations.
+
+    Entries are validated column by column and written with
+    PostgreSQL `COPY FROM STDIN` if the database driver supports it,
+    or with batched multi-row `INSERT` statements otherwise.
+    Loading into PostgreSQL is idempotent with both methods: entries
+    are deduplicated by their fingerprints, so a file imported twice
+    is saved once. Fingerprints are computed by PostgreSQL functions,
+    so other databases save all entries.
+
+    Attributes
+    ----------
+    batch_size : int
+        Maximum number of rows sent to the database in one batch.
+    dimensions : DimensionCache
+        Cache converting names of entry fields into IDs
+        of lookup tables for `INSERT` statements.
+
+    """
+
+    def __init__(self, batch_size: int, dimensions: DimensionCache) -> None:
+        """
+        Initialize the BulkLoader.
+
+        Parameters
+        ----------
+        batch_size : int
+            Maximum number of rows sent to the database in one batch.
+        dimensions : DimensionCache
+            Cache converting names of entry fields into IDs
+            of lookup tables for `INSERT` statements.
+
+        """
+        self.batch_size = batch_size
+        self.dimensions = dimensions
+
+    @classmethod
+    def get_columns(cls) -> list[str]:
+        """
+        Return the names of columns expected in uploaded entries.
+
+        Returns
+        -------
+        list of str
+            Names of budget entry fields except for `id`.
+
+        """
+        return [
+            column
+            for column in BudgetEntrySchema.model_fields
+            if column != 'id'
+        ]
+
+    @classmethod
+    def validate(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Validate and convert uploaded entries column by column.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            A DataFrame containing uploaded budget entries.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing only expected columns
+            converted to their schema types.
+
+        Raises
+        ------
+        MissedColumnsError
+            If required columns are missing from the uploaded entries.
+        ProcessingError
+            If the uploaded entries contain missing or invalid values.
+
+        """
+        columns = cls.get_columns()
+        missed_columns = [
+            column
+            for column in columns
+            if column not in df.columns
+        ]
+        if missed_columns:
+            raise MissedColumnsError(missed_columns=missed_columns)
+
+        validated = {}
+        for column in columns:
+            if df[column].isna().any():
+                raise ProcessingError
+            annotation = BudgetEntrySchema.model_fields[column].annotation
+            try:
+                validated[column] = COLUMN_CONVERTERS[annotation](df[column])
+            except (TypeError, ValueError) as exc:
+                raise ProcessingError from exc
+        return pd.DataFrame(validated)
+
+    @classmethod
+    def validate_table(cls, table: pa.Table) -> pd.DataFrame:
+        """
+        Validate and convert typed columns of uploaded entries.
+
+        Columns are cast to their schema types by Arrow, so that
+        columns that already have these types are not parsed.
+
+        Parameters
+        ----------
+        table : pa.Table
+            A table containing uploaded budget entries.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing only expected columns
+            converted to their schema types.
+
+        Raises
+        ------
+        MissedColumnsError
+            If required columns are missing from the uploaded entries.
+        ProcessingError
+            If the uploaded entries contain missing or invalid values.
+
+        """
+        columns = cls.get_columns()
+        missed_columns = [
+            column
+            for column in columns
+            if column not in table.column_names
+        ]
+        if missed_columns:
+            raise MissedColumnsError(missed_columns=missed_columns)
+
+        schema = pa.schema([
+            ENTRIES_SCHEMA.field(column)
+            for column in columns
+        ])
+        try:
+            table = table.select(columns).cast(schema)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as exc:
+            raise ProcessingError from exc
+        for field in schema:
+            column = table.column(field.name)
+            has_nan = (
+                pa.types.is_floating(field.type)
+                and pc.any(pc.is_nan(column)).as_py()
+            )
+            if column.null_count or has_nan:
+                raise ProcessingError
+        return table.to_pandas()
+
+    @classmethod
+    def supports_copy(cls, connection: sql.Connection) -> bool:
+        """
+        Check whether the connection supports `COPY FROM STDIN`.
+
+        Parameters
+        ----------
+        connection : sql.Connection
+            SQLAlchemy database connection.
+
+        Returns
+        -------
+        bool
+            True if the connection uses PostgreSQL with psycopg2 driver.
+
+        """
+        dialect = connection.dialect
+        return dialect.name == 'postgresql' and dialect.driver == 'psycopg2'
+
+    @classmethod
+    def supports_fingerprints(cls, connection: sql.Connection) -> bool:
+        """
+        Check whether the database computes fingerprints of entries.
+
+        Parameters
+        ----------
+        connection : sql.Connection
+            SQLAlchemy database connection.
+
+        Returns
+        -------
+        bool
+            True if the connection uses PostgreSQL.
+
+        """
+        return connection.dialect.name == 'postgresql'
+
+    def load(
+        self,
+        df: pd.DataFrame,
+        connection: sql.Connection,
+    ) -> LoadCounts:
+        """
+        Write validated entries into the database.
+
+        In PostgreSQL, entries that have the same fingerprints
+        as saved entries, or as preceding entries of the same
+        DataFrame, are skipped. The latter are also counted
+        as duplicates, because they may be separate purchases
+        of the same product at the same time.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            A DataFrame returned by `validate`.
+        connection : sql.Connection
+            SQLAlchemy database connection with an active transaction.
+
+        Returns
+        -------
+        dict
+            Numbers of new entries, skipped entries, and skipped
+            entries repeating preceding entries of the DataFrame.
+
+        """
+        start = time.perf_counter()
+        method = 'INSERT'
+        if self.supports_copy(connection=connection):
+            method = 'COPY'
+        if self.supports_fingerprints(connection=connection):
+            new_entries_number, duplicates_number = self._load_staged(
+                df=df,
+                connection=connection,
+            )
+        else:
+            new_entries_number = self._insert(df=df, connection=connection)
+            duplicates_number = 0
+        duration = time.perf_counter() - start
+        entries_number = df.shape[0]
+        skipped_entries_number = entries_number - new_entries_number
+        logger.info(
+            '%d entries are loaded with %s in %.3f s (%.0f rows/s), '
+            '%d entries are skipped, including %d duplicates.',
+            new_entries_number,
+            method,
+            duration,
+            entries_number / duration if duration else 0,
+            skipped_entries_number,
+            duplicates_number,
+        )
+        return {
+            'new_entries_number': new_entries_number,
+            'skipped_entries_number': skipped_entries_number,
+            'duplicates_number': duplicates_number,
+        }
+
+    def _iter_batches(self, df: pd.DataFrame) -> list[pd.DataFrame]:
+        """
+        Split a DataFrame into batches of `batch_size` rows.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            A DataFrame to split.
+
+        Returns
+        -------
+        list of pd.DataFrame
+            Consecutive slices of the DataFrame.
+
+        """
+        return [
+            df.iloc[start:start + self.batch_size]
+            for start in range(0, df.shape[0], self.batch_size)
+        ]
+
+    def _load_staged(
+        self,
+        df: pd.DataFrame,
+        connection: sql.Connection,
+    ) -> tuple[int, int]:
+        """
+        Write new entries to PostgreSQL through a staging table.
+
+        Entries are copied into a temporary staging table, with `COPY`
+        if the driver supports it, or with `INSERT` statements
+        otherwise, new names of their fields are added to the lookup
+        tables, and then the entries are inserted with IDs of the names
+        and with their fingerprints, except for duplicates.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            A DataFrame returned by `validate`.
+        connection : sql.Connection
+            SQLAlchemy connection to a PostgreSQL database.
+
+        Returns
+        -------
+        tuple of int
+            Numbers of inserted entries, and of entries repeating
+            preceding entries of the DataFrame.
+
+        """
+        staging_table = sql.Table(
+            STAGING_TABLE,
+            sql.MetaData(),
+            *(
+                sql.Column(column, ENTRY_COLUMNS[column].type)
+                for column in df.columns
+            ),
+            prefixes=['TEMPORARY'],
+        )
+        staging_table.create(bind=connection)
+        if self.supports_copy(connection=connection):
+            self._copy(
+                df=df,
+                staging_table=staging_table,
+                connection=connection,
+            )
+        else:
+            for batch in self._iter_batches(df=df):
+                connection.execute(
+                    sql.insert(staging_table),
+                    batch.to_dict(orient='records'),
+                )
+        source = staging_table
+        values = {}
+        for column in staging_table.c:
+            model = DIMENSIONS.get(column.name)
+            if model is None:
+                values[column.name] = column
+                continue
+            insert_names(
+                connection=connection,
+                dimension=column.name,
+                names=sql.select(column),
+            )
+            source = source.join(model, model.name == column)
+            id_column = ID_COLUMNS[column.name]
+            values[id_column] = model.id.label(id_column)
+        fingerprint = get_fingerprint(columns=staging_table.c)
+        entries_number, unique_entries_number = connection.execute(
+            sql.select(
+                sql.func.count(),
+                sql.func.count(sql.distinct(fingerprint)),
+            ).select_from(staging_table),
+        ).one()
+        values[BudgetEntry.fingerprint.key] = fingerprint
+        result = connection.execute(
+            postgresql.insert(BudgetEntry)
+            .from_select(
+                list(values),
+                sql.select(*values.values()).select_from(source),
+            )
+            .on_conflict_do_nothing(
+                index_elements=[BudgetEntry.fingerprint.key],
+            ),
+        )
+        staging_table.drop(bind=connection)
+        return result.rowcount, entries_number - unique_entries_number
+
+    def _copy(
+        self,
+        df: pd.DataFrame,
+        staging_table: sql.Table,
+        connection: sql.Connection,
+    ) -> None:
+        """
+        Copy entries into a staging table using `COPY FROM STDIN`.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            A DataFrame returned by `validate`.
+        staging_table : sql.Table
+            The staging table with the columns of the DataFrame.
+        connection : sql.Connection
+            SQLAlchemy database connection with psycopg2 driver.
+
+        """
+        preparer = connection.dialect.identifier_preparer
+        columns = ', '.join(preparer.quote(column) for column in df.columns)
+        copy_query = ' '.join([
+            'COPY',
+            preparer.format_table(staging_table),
+            f'({columns})',
+            'FROM STDIN WITH (FORMAT csv)',
+        ])
+        dbapi_connection = connection.connection.driver_connection
+        with dbapi_connection.cursor() as cursor:
+            for batch in self._iter_batches(df=df):
+                buffer = io.StringIO()
+                batch.to_csv(
+                    buffer,
+                    index=False,
+                    header=False,
+                    quoting=csv.QUOTE_NONNUMERIC,
+                )
+                buffer.seek(0)
+                cursor.copy_expert(copy_query, buffer)
+
+    def _insert(self, df: pd.DataFrame, connection: sql.Connection) -> int:
+        """
+        Write entries using batched multi-row `INSERT` statements.
+
+        It is used for databases other than PostgreSQL, which do not
+        calculate fingerprints, so all entries are inserted.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            A DataFrame returned by `validate`.
+        connection : sql.Connection
+            SQLAlchemy database connection.
+
+        Returns
+        -------
+        int
+            Number of inserted entries.
+
+        """
+        for batch in self._iter_batches(df=df):
+            connection.execute(
+                sql.insert(BudgetEntry),
+                self.dimensions.encode(rows=batch.to_dict(orient='records')),
+            )
+        return df.shape[0]
@@ -1,48 +1,76 @@
 """The module provides function for creating database."""
+import logging
+
 import sqlalchemy as sql
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateColumn
 
+from backend.entries_app.dimensions import (
+    DIMENSIONS,
+    has_legacy_names,
+    normalize_entries,
+)
+from backend.entries_app.exceptions import MigrationRequiredError
+from backend.entries_app.fingerprint import backfill_fingerprints
+from backend.entries_app.models import Base, BudgetEntry
+from backend.entries_app.pool_metrics import (
+    TimedAsyncQueuePool,
+    TimedQueuePool,
+)
+from backend.entries_app.query_profiler import QueryProfiler
+from backend.entries_app.search import install_search_indexes
 from backend.entries_app.settings import DBSettings
+from backend.entries_app.summary import (
+    SUMMARY_TABLES,
+    install_summary_triggers,
+    rebuild_summary,
+    uninstall_summary,
+)
 
+logger = logging.getLogger(__name__)
 db_settings = DBSettings()
+SCHEMA_LOCK_ID = 20250301
+MIGRATION_COMMAND = 'backend-migrate-entries'
+# Indexes of ID columns replaced by (ID, entry ID) indexes.
+REPLACED_INDEXES = tuple(
+    f'ix_{BudgetEntry.__tablename__}_{dimension}_id'
+    for dimension in DIMENSIONS
+)
+DUPLICATE_DATABASE = '42P04'
+query_profiler = QueryProfiler(
+    slow_query_threshold=db_settings.db_slow_query_threshold,
+    explain_slow_queries=db_settings.db_explain_slow_queries,
+)
 
 
 def create_postgres_database() -> None:
     """
     Create a PostgreSQL database if it does not already exist.
 
-    This function connects to the PostgreSQL server using a temporary engine,
+    This function connects to the PostgreSQL server without pooling,
     checks whether the specified database exists, and creates it if necessary.
 
     """
     temp_engine = sql.create_engine(
-        sql.URL.create(
-            drivername='postgresql',
-            username=db_settings.db_user,
-            password=db_settings.db_password,
-            host=db_settings.db_host,
-            port=db_settings.db_port,
-            database='postgres',
-        ),
+        _get_url(drivername='postgresql', database='postgres'),
+        poolclass=NullPool,
+        isolation_level='AUTOCOMMIT',
     )
     with temp_engine.connect() as conn:
-        conn.execute(sql.text('COMMIT'))
-        sql_query = sql.text(
-            """
-            DO $$ BEGIN
-                IF NOT EXISTS (
-                    SELECT 1 FROM pg_database WHERE datname = :db_name
-                ) THEN
-                    EXECUTE format('CREATE DATABASE %I', :db_name);
-                END IF;
-            END $$;
-            """,
-        )
-        conn.execute(
-            sql_query,
-            parameters={
-                'db_name': db_settings.db_name,
-            },
+        is_existing = conn.scalar(
+            sql.text('SELECT 1 FROM pg_database WHERE datname = :db_name'),
+            parameters={'db_name': db_settings.db_name},
         )
+        if not is_existing:
+            db_name = conn.dialect.identifier_preparer.quote(
+                db_settings.db_name,
+            )
+            try:
+                conn.execute(sql.text(f'CREATE DATABASE {db_name}'))
+            except sql.exc.ProgrammingError as exc:
+                if getattr(exc.orig, 'pgcode', None) != DUPLICATE_DATABASE:
+                    raise
     temp_engine.dispose()
 
 
@@ -50,19 +78,300 @@ def get_engine() -> sql.Engine:
     """
     Create and return a SQLAlchemy engine for the application's database.
 
+    Queries of the engine are counted and timed by the query profiler.
+
     Returns
     -------
     sqlalchemy.Engine
         SQLAlchemy engine connected to the specified database.
 
     """
-    return sql.create_engine(
-        sql.URL.create(
-            drivername='postgresql',
-            username=db_settings.db_user,
-            password=db_settings.db_password,
-            host=db_settings.db_host,
-            port=db_settings.db_port,
-            database=db_settings.db_name,
-        ),
+    connect_args = {}
+    if db_settings.db_statement_timeout:
+        connect_args['options'] = (
+            f'-c statement_timeout={db_settings.db_statement_timeout}'
+        )
+    engine = sql.create_engine(
+        _get_url(drivername='postgresql'),
+        poolclass=TimedQueuePool,
+        connect_args=connect_args,
+        **_get_pool_options(),
+    )
+    query_profiler.attach(engine=engine)
+    return engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Create and return an asynchronous engine for the application's database.
+
+    Queries of the engine are counted and timed by the query profiler.
+
+    Returns
+    -------
+    AsyncEngine
+        SQLAlchemy engine connected to the specified database
+        with asyncpg driver.
+
+    """
+    connect_args = {}
+    if db_settings.db_statement_timeout:
+        connect_args['server_settings'] = {
+            'statement_timeout': str(db_settings.db_statement_timeout),
+        }
+    engine = create_async_engine(
+        _get_url(drivername='postgresql+asyncpg'),
+        poolclass=TimedAsyncQueuePool,
+        connect_args=connect_args,
+        **_get_pool_options(),
+    )
+    query_profiler.attach(engine=engine.sync_engine)
+    return engine
+
+
+def create_schema(engine: sql.Engine) -> None:
+    """
+    Create missing tables and indexes of the application's database.
+
+    Columns and indexes added to models are also created
+    for tables that already exist, and replaced indexes are dropped.
+    For PostgreSQL, trigram search indexes are created
+    if the extension is available, triggers maintaining summary
+    statistics are installed, the statistics are recalculated
+    if their tables are created, and fingerprints of existing entries
+    are calculated once the fingerprint column is added.
+    The schema is created under a PostgreSQL advisory lock,
+    so that concurrently starting workers do it one by one.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.Engine
+        SQLAlchemy engine connected to the application's database.
+
+    Raises
+    ------
+    MigrationRequiredError
+        If names of entry fields are stored in the entries table.
+        They are moved to lookup tables by `migrate_entries`,
+        which is not run at startup, because it rewrites the table.
+
+    """
+    with engine.begin() as connection:
+        if connection.dialect.name == 'postgresql':
+            connection.execute(
+                sql.select(sql.func.pg_advisory_xact_lock(SCHEMA_LOCK_ID)),
+            )
+        if has_legacy_names(connection=connection):
+            raise MigrationRequiredError(command=MIGRATION_COMMAND)
+        existing_columns = _get_existing_columns(
+            table=BudgetEntry.__table__,
+            connection=connection,
+        )
+        is_fingerprint_missing = bool(existing_columns) and (
+            BudgetEntry.fingerprint.key not in existing_columns
+        )
+        is_summary_missing = not all(
+            sql.inspect(connection).has_table(table.name)
+            for table in SUMMARY_TABLES
+        )
+        Base.metadata.create_all(bind=connection)
+        for table in Base.metadata.sorted_tables:
+            _add_missing_columns(table=table, connection=connection)
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
+        for index_name in REPLACED_INDEXES:
+            connection.execute(sql.DDL(f'DROP INDEX IF EXISTS {index_name}'))
+        if connection.dialect.name == 'postgresql':
+            install_search_indexes(connection=connection)
+            install_summary_triggers(connection=connection)
+            if is_summary_missing:
+                rebuild_summary(connection=connection)
+            if is_fingerprint_missing:
+                logger.info(
+                    'Fingerprints of %d existing entries are calculated.',
+                    backfill_fingerprints(connection=connection),
+                )
+
+
+def migrate_entries(engine: sql.Engine, *, vacuum_full: bool = False) -> int:
+    """
+    Move names of entry fields from the entries table to lookup tables.
+
+    The migration is irreversible, and it rewrites every entry,
+    so it is run by a separate command while the backend is stopped.
+    Summary triggers are dropped, names are moved by
+    `normalize_entries`, and then the rest of the schema is created,
+    and the summary statistics are rebuilt by `create_schema`.
+    Finally, the table is vacuumed and analyzed.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.Engine
+        SQLAlchemy engine connected to the application's PostgreSQL
+        database.
+    vacuum_full : bool, optional
+        Whether to rewrite the table with `VACUUM FULL`, so that
+        the space of removed names is returned to the operating system,
+        by default False. It locks the table exclusively
+        until it is rewritten.
+
+    Returns
+    -------
+    int
+        Number of converted entries. Zero if the entries table
+        does not contain names.
+
+    """
+    with engine.begin() as connection:
+        connection.execute(
+            sql.select(sql.func.pg_advisory_xact_lock(SCHEMA_LOCK_ID)),
+        )
+        if not has_legacy_names(connection=connection):
+            return 0
+        uninstall_summary(connection=connection)
+        for model in DIMENSIONS.values():
+            model.__table__.create(bind=connection, checkfirst=True)
+        entries_number = normalize_entries(connection=connection)
+    create_schema(engine=engine)
+    _vacuum_table(
+        table=BudgetEntry.__table__,
+        engine=engine,
+        full=vacuum_full,
+    )
+    return entries_number
+
+
+def _get_existing_columns(
+    table: sql.Table,
+    connection: sql.Connection,
+) -> set[str]:
+    """
+    Return names of columns of a table in the database.
+
+    Parameters
+    ----------
+    table : sqlalchemy.Table
+        Table of a model.
+    connection : sqlalchemy.Connection
+        SQLAlchemy connection to the application's database.
+
+    Returns
+    -------
+    set of str
+        Names of the columns, or an empty set if the table
+        does not exist.
+
+    """
+    inspector = sql.inspect(connection)
+    if not inspector.has_table(table.name):
+        return set()
+    return {column['name'] for column in inspector.get_columns(table.name)}
+
+
+def _vacuum_table(
+    table: sql.Table,
+    engine: sql.Engine,
+    *,
+    full: bool,
+) -> None:
+    """
+    Vacuum and analyze a PostgreSQL table.
+
+    Parameters
+    ----------
+    table : sqlalchemy.Table
+        Table of a model.
+    engine : sqlalchemy.Engine
+        SQLAlchemy engine connected to the application's database.
+    full : bool
+        Whether to rewrite the table to release the space
+        of removed data.
+
+    """
+    with engine.connect().execution_options(
+        isolation_level='AUTOCOMMIT',
+    ) as connection:
+        table_name = connection.dialect.identifier_preparer.format_table(
+            table,
+        )
+        command = 'VACUUM FULL ANALYZE' if full else 'VACUUM ANALYZE'
+        connection.execute(sql.text(f'{command} {table_name}'))
+
+
+def _add_missing_columns(
+    table: sql.Table,
+    connection: sql.Connection,
+) -> None:
+    """
+    Add columns that are defined in a model but missing in its table.
+
+    Parameters
+    ----------
+    table : sqlalchemy.Table
+        Table of a model.
+    connection : sqlalchemy.Connection
+        SQLAlchemy connection to the application's database.
+
+    """
+    existing_columns = {
+        column['name']
+        for column in sql.inspect(connection).get_columns(table.name)
+    }
+    preparer = connection.dialect.identifier_preparer
+    for column in table.columns:
+        if column.name in existing_columns:
+            continue
+        column_ddl = CreateColumn(column).compile(dialect=connection.dialect)
+        connection.execute(
+            sql.DDL(
+                f'ALTER TABLE {preparer.format_table(table)} '
+                f'ADD COLUMN {column_ddl}',
+            ),
+        )
+
+
+def _get_url(drivername: str, database: str | None = None) -> sql.URL:
+    """
+    Return the URL of a database on the application's server.
+
+    Parameters
+    ----------
+    drivername : str
+        The dialect and the driver of the database.
+    database : str, optional
+        The name of the database. By default,
+        the application's database is used.
+
+    Returns
+    -------
+    sqlalchemy.URL
+        URL built from database settings.
+
+    """
+    return sql.URL.create(
+        drivername=drivername,
+        username=db_settings.db_user,
+        password=db_settings.db_password,
+        host=db_settings.db_host,
+        port=db_settings.db_port,
+        database=database or db_settings.db_name,
     )
+
+
+def _get_pool_options() -> dict[str, int | float | bool]:
+    """
+    Return options of the connection pool from database settings.
+
+    Returns
+    -------
+    dict
+        Keyword arguments of the engine configuring its pool.
+
+    """
+    return {
+        'pool_size': db_settings.db_pool_size,
+        'max_overflow': db_settings.db_max_overflow,
+        'pool_timeout': db_settings.db_pool_timeout,
+        'pool_recycle': db_settings.db_pool_recycle,
+        'pool_pre_ping': db_settings.db_pool_pre_ping,
+    }
@@ -0,0 +1,465 @@
+"""
+The module mapping repeated fields of budget entries to lookup tables.
+
+Shops, categories, persons and currencies of budget entries are stored
+in lookup tables, and entries refer to them by small integer IDs,
+so that the entries table and its indexes are smaller, and entries
+are grouped by integers instead of strings. Queries join the lookup
+tables to return names, and writes convert names into IDs
+with a cache that is shared by the threads of a process.
+
+"""
+import logging
+import threading
+from collections.abc import Iterable, Iterator
+
+import sqlalchemy as sql
+from sqlalchemy.dialects import postgresql
+
+from backend.entries_app.models import (
+    BudgetEntry,
+    Category,
+    Currency,
+    DimensionValue,
+    Person,
+    Shop,
+)
+
+logger = logging.getLogger(__name__)
+DIMENSIONS: dict[str, type[DimensionValue]] = {
+    'shop': Shop,
+    'category': Category,
+    'person': Person,
+    'currency': Currency,
+}
+ID_COLUMNS = {dimension: f'{dimension}_id' for dimension in DIMENSIONS}
+ENTRY_COLUMNS: dict[str, sql.ColumnElement] = {
+    'id': BudgetEntry.id,
+    'date': BudgetEntry.date,
+    'shop': Shop.name,
+    'product': BudgetEntry.product,
+    'amount': BudgetEntry.amount,
+    'category': Category.name,
+    'person': Person.name,
+    'currency': Currency.name,
+}
+# Entries are sorted by IDs of names instead of the names, so that
+# sorting and keyset pagination are backed by (ID, entry ID) indexes.
+SORT_COLUMNS: dict[str, sql.ColumnElement] = {
+    column: BudgetEntry.__table__.c[ID_COLUMNS.get(column, column)]
+    for column in ENTRY_COLUMNS
+}
+ENTRIES = BudgetEntry.__tablename__
+# SQLite limits the number of SELECT statements joined with UNION.
+COMPOUND_SELECT_LIMIT = 500
+
+
+def join_dimensions() -> sql.FromClause:
+    """
+    Return budget entries joined with the lookup tables.
+
+    Outer joins are used, so that PostgreSQL skips the joins
+    of lookup tables whose names are not selected.
+
+    Returns
+    -------
+    sql.FromClause
+        The FROM clause of queries selecting entries with names.
+
+    """
+    entries = BudgetEntry.__table__
+    for dimension, model in DIMENSIONS.items():
+        entries = entries.outerjoin(
+            model,
+            model.id == BudgetEntry.__table__.c[ID_COLUMNS[dimension]],
+        )
+    return entries
+
+
+def select_entries(*columns: str) -> sql.Select:
+    """
+    Return a query selecting budget entries with names of their fields.
+
+    Parameters
+    ----------
+    *columns : str
+        Names of selected fields. By default, all fields
+        of `BudgetEntrySchema` are selected, so that the rows
+        can be validated by the schema.
+
+    Returns
+    -------
+    sql.Select
+        A query selecting rows labeled with the names of the fields.
+
+    """
+    return sql.select(
+        *(
+            ENTRY_COLUMNS[column].label(column)
+            for column in columns or ENTRY_COLUMNS
+        ),
+    ).select_from(join_dimensions())
+
+
+def insert_names(
+    connection: sql.Connection,
+    dimension: str,
+    names: sql.Select,
+) -> None:
+    """
+    Add names that are missing in a lookup table.
+
+    Names that already exist are filtered out before the insert,
+    so that they do not consume values of the ID sequence.
+
+    Parameters
+    ----------
+    connection : sql.Connection
+        SQLAlchemy database connection.
+    dimension : str
+        Name of the budget entry field.
+    names : sql.Select
+        A query selecting names in its single column.
+
+    """
+    model = DIMENSIONS[dimension]
+    source = names.subquery()
+    name = next(iter(source.c))
+    new_names = (
+        sql.select(name)
+        .distinct()
+        .where(
+            name.is_not(None),
+            ~sql.exists().where(model.name == name),
+        )
+    )
+    if connection.dialect.name == 'postgresql':
+        stmt = (
+            postgresql.insert(model)
+            .from_select([model.name.key], new_names)
+            .on_conflict_do_nothing(index_elements=[model.name.key])
+        )
+    else:
+        stmt = sql.insert(model).from_select([model.name.key], new_names)
+    connection.execute(stmt)
+
+
+def has_legacy_names(connection: sql.Connection) -> bool:
+    """
+    Check whether names of entry fields are stored in the entries table.
+
+    Parameters
+    ----------
+    connection : sql.Connection
+        SQLAlchemy database connection.
+
+    Returns
+    -------
+    bool
+        True if the PostgreSQL entries table has columns of names,
+        which are moved to lookup tables by `normalize_entries`.
+
+    """
+    if connection.dialect.name != 'postgresql':
+        return False
+    inspector = sql.inspect(connection)
+    if not inspector.has_table(ENTRIES):
+        return False
+    columns = {column['name'] for column in inspector.get_columns(ENTRIES)}
+    return not columns.isdisjoint(DIMENSIONS)
+
+
+def normalize_entries(connection: sql.Connection) -> int:
+    """
+    Move names of entry fields from the entries table to lookup tables.
+
+    The lookup tables are filled with distinct names of entries,
+    ID columns are added and set, and the name columns are dropped
+    together with their indexes. The change is irreversible, so it is
+    run by the one-off migration command rather than at startup.
+
+    Parameters
+    ----------
+    connection : sql.Connection
+        SQLAlchemy connection to a PostgreSQL database, where lookup
+        tables exist and summary triggers of entries are not installed.
+
+    Returns
+    -------
+    int
+        Number of converted entries.
+
+    """
+    legacy_entries = sql.table(
+        ENTRIES,
+        *(sql.column(dimension, sql.String) for dimension in DIMENSIONS),
+        *(sql.column(id_column) for id_column in ID_COLUMNS.values()),
+    )
+    preparer = connection.dialect.identifier_preparer
+    added_columns = []
+    for dimension in DIMENSIONS:
+        insert_names(
+            connection=connection,
+            dimension=dimension,
+            names=sql.select(legacy_entries.c[dimension]),
+        )
+        id_column = BudgetEntry.__table__.c[ID_COLUMNS[dimension]]
+        added_columns.append(
+            f'ADD COLUMN {preparer.quote(id_column.name)} '
+            f'{id_column.type.compile(dialect=connection.dialect)}',
+        )
+    connection.execute(sql.DDL(
+        f'ALTER TABLE {ENTRIES} {", ".join(added_columns)}',
+    ))
+    result = connection.execute(
+        sql.update(legacy_entries).values({
+            ID_COLUMNS[dimension]: (
+                sql.select(model.id)
+                .where(model.name == legacy_entries.c[dimension])
+                .scalar_subquery()
+            )
+            for dimension, model in DIMENSIONS.items()
+        }),
+    )
+    dropped_columns = ', '.join(
+        f'DROP COLUMN {preparer.quote(dimension)}'
+        for dimension in DIMENSIONS
+    )
+    connection.execute(sql.DDL(f'ALTER TABLE {ENTRIES} {dropped_columns}'))
+    return result.rowcount
+
+
+class DimensionCache:
+    """
+    Cache of IDs and names of the lookup tables.
+
+    Lookup tables only grow, and their rows are never changed,
+    so cached values are never invalidated. Missing names are added
+    to the lookup tables in separate transactions, so that the cache
+    never contains IDs of rolled back rows.
+
+    Attributes
+    ----------
+    engine : sql.Engine
+        SQLAlchemy database engine.
+
+    """
+
+    def __init__(self, engine: sql.Engine) -> None:
+        """
+        Initialize the DimensionCache.
+
+        Parameters
+        ----------
+        engine : sql.Engine
+            SQLAlchemy database engine.
+
+        """
+        self.engine = engine
+        self._ids: dict[str, dict[str, int]] = {
+            dimension: {}
+            for dimension in DIMENSIONS
+        }
+        self._names: dict[str, dict[int, str]] = {
+            dimension: {}
+            for dimension in DIMENSIONS
+        }
+        self._lock = threading.Lock()
+
+    def get_ids(self, dimension: str, names: Iterable[str]) -> dict[str, int]:
+        """
+        Return IDs of names, adding missing names to the lookup table.
+
+        Parameters
+        ----------
+        dimension : str
+            Name of the budget entry field.
+        names : iterable of str
+            Values of the field.
+
+        Returns
+        -------
+        dict
+            IDs of the names.
+
+        """
+        names = set(names)
+        missing_names = names.difference(self._ids[dimension])
+        if missing_names:
+            with self.engine.begin() as connection:
+                for names_query in self._iter_name_queries(
+                    names=sorted(missing_names),
+                    dialect=connection.dialect,
+                ):
+                    insert_names(
+                        connection=connection,
+                        dimension=dimension,
+                        names=names_query,
+                    )
+            model = DIMENSIONS[dimension]
+            self._load(
+                dimension=dimension,
+                condition=model.name.in_(missing_names),
+            )
+        ids = self._ids[dimension]
+        return {name: ids[name] for name in names}
+
+    def find_ids(self, dimension: str, names: Iterable[str]) -> list[int]:
+        """
+        Return IDs of names that exist in the lookup table.
+
+        Parameters
+        ----------
+        dimension : str
+            Name of the budget entry field.
+        names : iterable of str
+            Values of the field.
+
+        Returns
+        -------
+        list of int
+            IDs of the names. Names that are not saved are skipped.
+
+        """
+        names = set(names)
+        missing_names = names.difference(self._ids[dimension])
+        if missing_names:
+            model = DIMENSIONS[dimension]
+            self._load(
+                dimension=dimension,
+                condition=model.name.in_(missing_names),
+            )
+        ids = self._ids[dimension]
+        return sorted(ids[name] for name in names if name in ids)
+
+    def get_names(self, dimension: str, ids: Iterable[int]) -> dict[int, str]:
+        """
+        Return names of IDs.
+
+        Parameters
+        ----------
+        dimension : str
+            Name of the budget entry field.
+        ids : iterable of int
+            IDs of values of the field.
+
+        Returns
+        -------
+        dict
+            Names of the IDs that exist in the lookup table.
+
+        """
+        ids = set(ids)
+        missing_ids = ids.difference(self._names[dimension])
+        if missing_ids:
+            model = DIMENSIONS[dimension]
+            self._load(
+                dimension=dimension,
+                condition=model.id.in_(missing_ids),
+            )
+        names = self._names[dimension]
+        return {
+            value_id: names[value_id]
+            for value_id in ids
+            if value_id in names
+        }
+
+    def encode(self, rows: list[dict]) -> list[dict]:
+        """
+        Replace names of fields of budget entries with their IDs.
+
+        Parameters
+        ----------
+        rows : list of dict
+            Fields of budget entries, for example, dumped
+            `BudgetEntrySchema` objects.
+
+        Returns
+        -------
+        list of dict
+            Rows of the entries table. Names that are missing
+            in a row are not added as IDs.
+
+        """
+        rows = [dict(row) for row in rows]
+        for dimension, id_column in ID_COLUMNS.items():
+            ids = self.get_ids(
+                dimension=dimension,
+                names=(row[dimension] for row in rows if dimension in row),
+            )
+            for row in rows:
+                if dimension in row:
+                    row[id_column] = ids[row.pop(dimension)]
+        return rows
+
+    @classmethod
+    def _iter_name_queries(
+        cls,
+        names: list[str],
+        dialect: sql.Dialect,
+    ) -> Iterator[sql.Select]:
+        """
+        Yield queries selecting literal names.
+
+        PostgreSQL reads the names from a single `VALUES` list, which
+        other databases, such as SQLite, do not accept in the `FROM`
+        clause, so the names are selected one by one there and joined
+        with `UNION ALL` in groups of `COMPOUND_SELECT_LIMIT` names.
+
+        Parameters
+        ----------
+        names : list of str
+            Selected names.
+        dialect : sql.Dialect
+            The dialect of the database running the queries.
+
+        Yields
+        ------
+        sql.Select
+            Queries selecting the names in their single column.
+
+        """
+        column = sql.column('name', sql.String)
+        if dialect.name == 'postgresql':
+            yield sql.select(
+                sql.values(column, name='new_names').data(
+                    [(name,) for name in names],
+                ),
+            )
+            return
+        for start in range(0, len(names), COMPOUND_SELECT_LIMIT):
+            yield sql.select(
+                sql.union_all(*(
+                    sql.select(
+                        sql.literal(name, sql.String).label(column.name),
+                    )
+                    for name in names[start:start + COMPOUND_SELECT_LIMIT]
+                )).subquery('new_names'),
+            )
+
+    def _load(
+        self,
+        dimension: str,
+        condition: sql.ColumnElement[bool],
+    ) -> None:
+        """
+        Add values of a lookup table matching a condition to the cache.
+
+        Parameters
+        ----------
+        dimension : str
+            Name of the budget entry field.
+        condition : sql.ColumnElement
+            The WHERE clause selecting the values.
+
+        """
+        model = DIMENSIONS[dimension]
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                sql.select(model.id, model.name).where(condition),
+            ).all()
+        with self._lock:
+            for value_id, name in rows:
+                self._ids[dimension][name] = value_id
+                self._names[dimension][value_id] = name
+        logger.debug('%d values of %s are cached.', len(rows), dimension)
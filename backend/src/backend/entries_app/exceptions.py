@@ -39,11 +39,33 @@ class NoFileUploaded(HTTPException):
 
 
 class MissedColumnsError(HTTPException):
-    """Exception raised when there are missed columns in a CSV file."""
+    """Exception raised when there are missed columns in an uploaded file."""
 
     def __init__(self, missed_columns: list[str]) -> None:
         """Initialize MissedColumnsError with a default message."""
         super().__init__(
             status_code=HTTPStatus.BAD_REQUEST,
-            detail=f'Missed columns in CSV file: {missed_columns}',
+            detail=f'Missed columns in uploaded file: {missed_columns}',
+        )
+
+
+class InvalidCursorError(HTTPException):
+    """Exception raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self) -> None:
+        """Initialize InvalidCursorError with a default message."""
+        super().__init__(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Invalid pagination cursor.',
+        )
+
+
+class MigrationRequiredError(RuntimeError):
+    """Exception raised when the database schema needs a manual migration."""
+
+    def __init__(self, command: str) -> None:
+        """Initialize MigrationRequiredError with the migration command."""
+        super().__init__(
+            'Names of entry fields are stored in the entries table. '
+            f'Stop the backend, back up the table and run "{command}".',
         )
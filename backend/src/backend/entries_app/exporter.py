@@ -0,0 +1,274 @@
+"""The module providing a streaming exporter of budget entries."""
+import csv
+import io
+import json
+from collections.abc import Callable, Iterator, Sequence
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import sqlalchemy as sql
+
+from backend.entries_app.arrow_format import ENTRIES_SCHEMA
+from backend.entries_app.dimensions import select_entries
+from backend.entries_app.models import ExportFormat
+
+CSV_SEPARATOR = ';'
+COLUMN_NAMES = tuple(ENTRIES_SCHEMA.names)
+MEDIA_TYPES = {
+    ExportFormat.csv: 'text/csv',
+    ExportFormat.ndjson: 'application/x-ndjson',
+    ExportFormat.parquet: 'application/vnd.apache.parquet',
+}
+
+
+class EntriesExporter:
+    """
+    Exporter of budget entries streaming them in chunks.
+
+    Entries are read with a server-side cursor, so that the memory
+    used by the export does not depend on the number of entries,
+    and each chunk is encoded as soon as it is fetched.
+
+    Attributes
+    ----------
+    chunk_size : int
+        Number of rows fetched and encoded at once.
+
+    """
+
+    def __init__(self, chunk_size: int) -> None:
+        """
+        Initialize the EntriesExporter.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Number of rows fetched and encoded at once.
+
+        """
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def select_columns(cls) -> sql.Select:
+        """
+        Return a query selecting exported columns of budget entries.
+
+        Returns
+        -------
+        sql.Select
+            A query selecting rows with names of entry fields
+            joined from the lookup tables.
+
+        """
+        return select_entries(*COLUMN_NAMES)
+
+    def export(
+        self,
+        engine: sql.Engine,
+        stmt: sql.Select,
+        export_format: ExportFormat,
+    ) -> Iterator[bytes]:
+        """
+        Yield encoded budget entries selected by a query.
+
+        Parameters
+        ----------
+        engine : sql.Engine
+            SQLAlchemy database engine.
+        stmt : sql.Select
+            A query built on `select_columns`.
+        export_format : ExportFormat
+            File format of exported entries.
+
+        Yields
+        ------
+        bytes
+            Encoded chunks of the file.
+
+        """
+        encoders: dict[ExportFormat, Callable[..., Iterator[bytes]]] = {
+            ExportFormat.csv: self._encode_csv,
+            ExportFormat.ndjson: self._encode_ndjson,
+            ExportFormat.parquet: self._encode_parquet,
+        }
+        with engine.connect() as connection:
+            result = connection.execution_options(
+                yield_per=self.chunk_size,
+            ).execute(stmt)
+            yield from encoders[export_format](chunks=result.partitions())
+
+    @classmethod
+    def _encode_csv(
+        cls,
+        chunks: Iterator[Sequence[sql.Row]],
+    ) -> Iterator[bytes]:
+        """
+        Encode chunks of rows as a semicolon-separated CSV file.
+
+        The header is yielded before the first chunk is fetched.
+
+        Parameters
+        ----------
+        chunks : iterator of sequences of sql.Row
+            Chunks of exported rows.
+
+        Yields
+        ------
+        bytes
+            Encoded chunks of the file.
+
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=CSV_SEPARATOR)
+        writer.writerow(COLUMN_NAMES)
+        yield buffer.getvalue().encode('utf-8')
+        for rows in chunks:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue().encode('utf-8')
+
+    @classmethod
+    def _encode_ndjson(
+        cls,
+        chunks: Iterator[Sequence[sql.Row]],
+    ) -> Iterator[bytes]:
+        """
+        Encode chunks of rows as newline-delimited JSON objects.
+
+        Parameters
+        ----------
+        chunks : iterator of sequences of sql.Row
+            Chunks of exported rows.
+
+        Yields
+        ------
+        bytes
+            Encoded chunks of the file.
+
+        """
+        for rows in chunks:
+            lines = [
+                json.dumps(
+                    dict(zip(COLUMN_NAMES, row, strict=True)),
+                    default=datetime.isoformat,
+                )
+                for row in rows
+            ]
+            lines.append('')
+            yield '\n'.join(lines).encode('utf-8')
+
+    @classmethod
+    def _encode_parquet(
+        cls,
+        chunks: Iterator[Sequence[sql.Row]],
+    ) -> Iterator[bytes]:
+        """
+        Encode chunks of rows as row groups of a Parquet file.
+
+        Parameters
+        ----------
+        chunks : iterator of sequences of sql.Row
+            Chunks of exported rows.
+
+        Yields
+        ------
+        bytes
+            Encoded chunks of the file. The footer of the file
+            is yielded after the last chunk.
+
+        """
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema=ENTRIES_SCHEMA) as writer:
+            for rows in chunks:
+                columns = zip(*rows, strict=True)
+                writer.write_table(
+                    pa.Table.from_arrays(
+                        [
+                            pa.array(column, type=field.type)
+                            for column, field in zip(
+                                columns,
+                                ENTRIES_SCHEMA,
+                                strict=True,
+                            )
+                        ],
+                        schema=ENTRIES_SCHEMA,
+                    ),
+                )
+                yield sink.pop()
+        yield sink.pop()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Writable stream keeping only the data that has not been sent yet.
+
+    Unlike `io.BytesIO`, it reports the total number of written bytes
+    as its position after the data is popped, which the Parquet writer
+    uses for offsets of row groups.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize the _ChunkSink."""
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:  # noqa: PLR6301
+        """
+        Return whether the stream supports writing.
+
+        Returns
+        -------
+        bool
+            Always True.
+
+        """
+        return True
+
+    def write(self, data: bytes) -> int:
+        """
+        Append data to the stream.
+
+        Parameters
+        ----------
+        data : bytes
+            Written data.
+
+        Returns
+        -------
+        int
+            Number of written bytes.
+
+        """
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        """
+        Return the number of bytes written to the stream.
+
+        Returns
+        -------
+        int
+            The current position of the stream.
+
+        """
+        return self._position
+
+    def pop(self) -> bytes:
+        """
+        Return and forget the data written since the previous call.
+
+        Returns
+        -------
+        bytes
+            Data that has not been popped yet.
+
+        """
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
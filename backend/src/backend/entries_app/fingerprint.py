@@ -0,0 +1,96 @@
+"""
+The module computing fingerprints of budget entries.
+
+A fingerprint is the MD5 hash of the date, shop, product, amount, person
+and currency of an entry. It is computed by PostgreSQL, so that bulk
+imports and the backfill of existing entries hash values in the same way,
+and it is stored in a column with a unique index, so that imports skip
+entries that are already saved.
+
+"""
+import sqlalchemy as sql
+
+from backend.entries_app.dimensions import select_entries
+from backend.entries_app.models import BudgetEntry
+
+FIELD_SEPARATOR = chr(31)
+DATE_FORMAT = 'YYYY-MM-DD HH24:MI:SS.US'
+
+
+def get_fingerprint(
+    columns: sql.ColumnCollection,
+) -> sql.ColumnElement[bytes]:
+    """
+    Return an SQL expression computing fingerprints of entries.
+
+    Parameters
+    ----------
+    columns : sql.ColumnCollection
+        Columns of a table or a query containing budget entry fields.
+
+    Returns
+    -------
+    sql.ColumnElement
+        The 16-byte MD5 hash of the fields of an entry.
+
+    """
+    values = [
+        sql.func.to_char(columns.date, DATE_FORMAT),
+        columns.shop,
+        columns.product,
+        sql.cast(sql.cast(columns.amount, sql.Numeric), sql.Text),
+        columns.person,
+        columns.currency,
+    ]
+    return sql.func.decode(
+        sql.func.md5(sql.func.concat_ws(FIELD_SEPARATOR, *values)),
+        'hex',
+    )
+
+
+def backfill_fingerprints(connection: sql.Connection) -> int:
+    """
+    Set fingerprints of existing entries that do not have them.
+
+    Only the entry with the lowest ID gets the fingerprint among
+    entries with equal fields, so that the existing duplicates
+    remain and do not violate the unique index.
+
+    Parameters
+    ----------
+    connection : sql.Connection
+        SQLAlchemy connection to a PostgreSQL database.
+
+    Returns
+    -------
+    int
+        Number of entries with set fingerprints.
+
+    """
+    entries = (
+        select_entries()
+        .where(BudgetEntry.fingerprint.is_(None))
+        .subquery()
+    )
+    candidates = sql.select(
+        entries.c.id,
+        get_fingerprint(columns=entries.c).label('fingerprint'),
+    ).subquery()
+    saved = BudgetEntry.__table__.alias('saved')
+    first_entries = (
+        sql.select(candidates.c.id, candidates.c.fingerprint)
+        .where(
+            ~sql.exists().where(
+                saved.c.fingerprint == candidates.c.fingerprint,
+            ),
+        )
+        .distinct(candidates.c.fingerprint)
+        .order_by(candidates.c.fingerprint, candidates.c.id)
+        .subquery()
+    )
+    result = connection.execute(
+        sql.update(BudgetEntry)
+        .where(BudgetEntry.id == first_entries.c.id)
+        .values(fingerprint=first_entries.c.fingerprint),
+    )
+    return result.rowcount
@@ -0,0 +1,63 @@
+"""
+Migration moving names of entry fields to lookup tables.
+
+Databases created before the lookup tables store names of shops,
+categories, persons and currencies in the entries table. The backend
+does not start with such a database, because the migration rewrites
+every entry and drops the name columns, which cannot be undone
+and blocks other writers until it is committed.
+
+Before the migration, stop all workers of the backend
+and back up the entries table, for example:
+```
+pg_dump --table=budget_entries --format=custom --file=entries.dump budget
+```
+To roll back the migration, restore the table from the backup
+with `pg_restore --clean --table=budget_entries entries.dump`
+and run the previous version of the backend.
+
+Examples
+--------
+To migrate entries and rewrite the table in place, run:
+```
+uv run backend-migrate-entries --vacuum-full
+```
+
+"""
+import argparse
+import logging
+
+from custom_logging import config_logging
+
+from backend.entries_app.db_engine import get_engine, migrate_entries
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Move names of entry fields to lookup tables and log the result."""
+    config_logging()
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--vacuum-full',
+        action='store_true',
+        help=(
+            'rewrite the entries table to return the space of names '
+            'to the operating system (locks the table exclusively)'
+        ),
+    )
+    args = parser.parse_args()
+    engine = get_engine()
+    entries_number = migrate_entries(
+        engine=engine,
+        vacuum_full=args.vacuum_full,
+    )
+    engine.dispose()
+    logger.info(
+        'Names of fields of %d entries are moved to lookup tables.',
+        entries_number,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,71 @@
 """The module providing Pydantic models for database-related requests."""
 from datetime import UTC, datetime
+from enum import Enum
 
 import sqlalchemy as sql
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy import orm
 
+MAX_PAGE_SIZE = 1000
+
 
 class Base(orm.DeclarativeBase):
     """Base class for SQLAlchemy models."""
 
 
+class DimensionValue(Base):
+    """
+    Base SQLAlchemy model representing a unique value of an entry field.
+
+    Values of repeated budget entry fields are stored once
+    in lookup tables, and entries refer to them by small integer IDs.
+    Rows of lookup tables are never updated or deleted, so references
+    of entries are not checked by foreign keys, which would slow down
+    bulk imports.
+
+    Attributes
+    ----------
+    id : int
+        Unique identifier for the value.
+    name : str
+        The value of the field.
+
+    """
+
+    __abstract__ = True
+    # SQLite generates only IDs of INTEGER primary keys.
+    id = sql.Column(
+        sql.SmallInteger().with_variant(sql.Integer, 'sqlite'),
+        primary_key=True,
+    )
+    name = sql.Column(sql.String, nullable=False, unique=True)
+
+
+class Shop(DimensionValue):
+    """SQLAlchemy model representing a shop of budget entries."""
+
+    __tablename__ = 'shops'
+    id = sql.Column(sql.Integer, primary_key=True)
+
+
+class Category(DimensionValue):
+    """SQLAlchemy model representing a category of budget entries."""
+
+    __tablename__ = 'categories'
+
+
+class Person(DimensionValue):
+    """SQLAlchemy model representing a person of budget entries."""
+
+    __tablename__ = 'persons'
+
+
+class Currency(DimensionValue):
+    """SQLAlchemy model representing a currency of budget entries."""
+
+    __tablename__ = 'currencies'
+
+
 class BudgetEntry(Base):
     """
     SQLAlchemy model representing a budget entry.
@@ -20,30 +76,157 @@ class BudgetEntry(Base):
         Unique identifier for the budget entry.
     date : datetime
         Timestamp of the budget entry (default: current UTC time).
-    shop : str
-        Name of the shop where the purchase was made.
+    shop_id : int
+        ID of the shop where the purchase was made.
     product : str
         Name of the purchased product.
     amount : float
         Amount spent on the product.
-    category : str
-        Category of the expense.
-    person : str
-        Name of the person making the purchase.
-    currency : str
-        Currency used for the transaction.
+    category_id : int
+        ID of the category of the expense.
+    person_id : int
+        ID of the person making the purchase.
+    currency_id : int
+        ID of the currency used for the transaction.
+    fingerprint : bytes, optional
+        Hash of the date, shop, product, amount, person and currency
+        of an imported entry, which is unique among budget entries.
+        It is not recalculated when the entry is edited, so that
+        importing the same file again does not restore the original.
 
     """
 
     __tablename__ = 'budget_entries'
     id = sql.Column(sql.Integer, primary_key=True, index=True)
     date = sql.Column(sql.DateTime, default=datetime.now(UTC))
-    shop = sql.Column(sql.String, index=True)
+    shop_id = sql.Column(sql.Integer)
     product = sql.Column(sql.String)
     amount = sql.Column(sql.Float)
-    category = sql.Column(sql.String)
-    person = sql.Column(sql.String)
-    currency = sql.Column(sql.String)
+    category_id = sql.Column(sql.SmallInteger)
+    person_id = sql.Column(sql.SmallInteger)
+    currency_id = sql.Column(sql.SmallInteger)
+    fingerprint = orm.deferred(sql.Column(sql.LargeBinary))
+
+    __table_args__ = (
+        sql.Index('ix_budget_entries_date_id', 'date', 'id'),
+        sql.Index('ix_budget_entries_amount_id', 'amount', 'id'),
+        sql.Index('ix_budget_entries_shop_id_id', 'shop_id', 'id'),
+        sql.Index('ix_budget_entries_category_id_id', 'category_id', 'id'),
+        sql.Index('ix_budget_entries_person_id_id', 'person_id', 'id'),
+        sql.Index('ix_budget_entries_currency_id_id', 'currency_id', 'id'),
+        sql.Index(
+            'ix_budget_entries_fingerprint',
+            'fingerprint',
+            unique=True,
+        ),
+    )
+
+
+class EntriesSummary(Base):
+    """
+    SQLAlchemy model representing summary statistics of budget entries.
+
+    The table contains a single row that is maintained by database
+    triggers on every change of budget entries.
+
+    Attributes
+    ----------
+    id : int
+        Identifier of the summary row (always 1).
+    entries_number : int
+        Number of budget entries.
+    min_date : datetime
+        Timestamp of the earliest budget entry.
+    max_date : datetime
+        Timestamp of the latest budget entry.
+    categories_number : int
+        Number of unique categories.
+    persons_number : int
+        Number of unique persons.
+    data_version : int
+        Counter incremented on every change of budget entries.
+
+    """
+
+    __tablename__ = 'entries_summary'
+    id = sql.Column(sql.Integer, primary_key=True)
+    entries_number = sql.Column(
+        sql.BigInteger,
+        nullable=False,
+        server_default='0',
+    )
+    min_date = sql.Column(sql.DateTime)
+    max_date = sql.Column(sql.DateTime)
+    categories_number = sql.Column(
+        sql.Integer,
+        nullable=False,
+        server_default='0',
+    )
+    persons_number = sql.Column(
+        sql.Integer,
+        nullable=False,
+        server_default='0',
+    )
+    data_version = sql.Column(
+        sql.BigInteger,
+        nullable=False,
+        server_default='0',
+    )
+
+
+class DimensionCount(Base):
+    """
+    SQLAlchemy model representing references to a category or a person.
+
+    Attributes
+    ----------
+    dimension : str
+        Name of the budget entry field ('category' or 'person').
+    value_id : int
+        ID of the value of the field.
+    references_number : int
+        Number of budget entries with the value.
+
+    """
+
+    __tablename__ = 'entries_dimension_counts'
+    dimension = sql.Column(sql.String, primary_key=True)
+    value_id = sql.Column(sql.Integer, primary_key=True)
+    references_number = sql.Column(sql.BigInteger, nullable=False)
+
+
+class MonthlyCategoryRollup(Base):
+    """
+    SQLAlchemy model representing monthly expenses per category.
+
+    The table is maintained by database triggers on every change
+    of budget entries. Only entries with positive amounts are counted.
+
+    Attributes
+    ----------
+    month : datetime
+        Timestamp of the first day of the month.
+    category_id : int
+        ID of the category of the expenses.
+    currency_id : int
+        ID of the currency of the expenses.
+    expenses_sum : float
+        Total amount of the expenses.
+    expenses_number : int
+        Number of budget entries with the expenses.
+
+    """
+
+    __tablename__ = 'monthly_category_rollup'
+    month = sql.Column(sql.DateTime, primary_key=True)
+    category_id = sql.Column(sql.SmallInteger, primary_key=True)
+    currency_id = sql.Column(sql.SmallInteger, primary_key=True)
+    expenses_sum = sql.Column(sql.Float, nullable=False, server_default='0')
+    expenses_number = sql.Column(
+        sql.BigInteger,
+        nullable=False,
+        server_default='0',
+    )
 
 
 class BudgetEntrySchema(BaseModel):
@@ -92,3 +275,131 @@ class BudgetEntrySchema(BaseModel):
         """
 
         from_attributes = True
+
+
+class BudgetEntriesPage(BaseModel):
+    """
+    Pydantic schema for a page of budget entries.
+
+    Attributes
+    ----------
+    entries : list of BudgetEntrySchema
+        Budget entries of the page.
+    next_cursor : str, optional
+        Opaque cursor of the next page, or None for the last page.
+
+    """
+
+    entries: list[BudgetEntrySchema]
+    next_cursor: str | None = None
+
+
+class SortColumn(Enum):
+    """
+    Enumeration for columns sorting budget entries.
+
+    Shops, categories, persons and currencies are sorted by IDs
+    of their names in lookup tables, so that sorting is index-backed.
+    Entries with equal names are grouped in the order the names
+    were first saved, which is not the alphabetical order.
+
+    """
+
+    date: str = 'date'
+    amount: str = 'amount'
+    shop: str = 'shop'
+    product: str = 'product'
+    category: str = 'category'
+    person: str = 'person'
+    currency: str = 'currency'
+
+
+class SortOrder(Enum):
+    """Enumeration for directions of sorting budget entries."""
+
+    asc: str = 'asc'
+    desc: str = 'desc'
+
+
+class ExportFormat(Enum):
+    """Enumeration for file formats of exported budget entries."""
+
+    csv: str = 'csv'
+    ndjson: str = 'ndjson'
+    parquet: str = 'parquet'
+
+
+class BudgetEntriesFilter(BaseModel):
+    """
+    Pydantic schema for filtering and sorting of budget entries.
+
+    Attributes
+    ----------
+    date_from : datetime, optional
+        Minimum timestamp of entries, inclusive.
+    date_to : datetime, optional
+        Maximum timestamp of entries, inclusive.
+    category : list of str
+        Categories of entries. If empty, entries are not filtered by it.
+    person : list of str
+        Persons of entries. If empty, entries are not filtered by it.
+    shop : list of str
+        Shops of entries. If empty, entries are not filtered by it.
+    currency : list of str
+        Currencies of entries. If empty, entries are not filtered by it.
+    amount_min : float, optional
+        Minimum amount of entries, inclusive.
+    amount_max : float, optional
+        Maximum amount of entries, inclusive.
+    sort_by : SortColumn
+        Column sorting entries (default: date). Entries with equal
+        values are sorted by ID in the same direction. Fields stored
+        in lookup tables are sorted by IDs of their names.
+    sort_order : SortOrder
+        Direction of sorting (default: descending).
+
+    """
+
+    date_from: datetime | None = None
+    date_to: datetime | None = None
+    category: list[str] = []
+    person: list[str] = []
+    shop: list[str] = []
+    currency: list[str] = []
+    amount_min: float | None = None
+    amount_max: float | None = None
+    sort_by: SortColumn = SortColumn.date
+    sort_order: SortOrder = SortOrder.desc
+
+
+class BudgetEntriesQuery(BudgetEntriesFilter):
+    """
+    Pydantic schema for query parameters of a page of budget entries.
+
+    Attributes
+    ----------
+    limit : int
+        Maximum number of entries in the page (default: 10).
+    cursor : str, optional
+        Cursor of the page returned as `next_cursor` with the previous
+        page. It is valid only with the same sorting as that page.
+        If not specified, the first page is returned.
+
+    """
+
+    limit: int = Field(default=10, ge=1, le=MAX_PAGE_SIZE)
+    cursor: str | None = None
+
+
+class BudgetEntriesExport(BudgetEntriesFilter):
+    """
+    Pydantic schema for query parameters of exported budget entries.
+
+    Attributes
+    ----------
+    format : ExportFormat
+        File format of exported entries (default: csv).
+
+    """
+
+    format: ExportFormat = ExportFormat.csv
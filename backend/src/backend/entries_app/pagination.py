@@ -0,0 +1,166 @@
+"""The module providing opaque cursors for keyset pagination of entries."""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+import sqlalchemy as sql
+
+from backend.entries_app.dimensions import SORT_COLUMNS
+from backend.entries_app.exceptions import InvalidCursorError
+from backend.entries_app.models import SortColumn
+
+
+def encode_cursor(
+    entry: sql.Row,
+    sort_by: SortColumn = SortColumn.date,
+) -> str:
+    """
+    Encode the position of a budget entry into an opaque cursor.
+
+    Parameters
+    ----------
+    entry : sql.Row
+        The last budget entry of a page.
+    sort_by : SortColumn, optional
+        Column sorting the entries, by default date.
+
+    Returns
+    -------
+    str
+        URL-safe cursor containing the sort column, its value
+        and the ID of the entry. For fields stored in lookup tables,
+        the value is the ID of the name.
+
+    """
+    value = getattr(entry, SORT_COLUMNS[sort_by.value].key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return _encode_payload(payload=[sort_by.value, value, entry.id])
+
+
+def decode_cursor(
+    cursor: str,
+    sort_by: SortColumn = SortColumn.date,
+) -> tuple[datetime | float | str, int]:
+    """
+    Decode an opaque cursor into the position of a budget entry.
+
+    Parameters
+    ----------
+    cursor : str
+        Cursor returned by `encode_cursor`.
+    sort_by : SortColumn, optional
+        Column sorting the entries, by default date.
+
+    Returns
+    -------
+    tuple
+        The value of the sort column and the ID of the last entry
+        of the previous page.
+
+    Raises
+    ------
+    InvalidCursorError
+        If the cursor cannot be decoded, or it was returned
+        for entries sorted by another column.
+
+    """
+    try:
+        column, value, entry_id = _decode_payload(cursor=cursor)
+        if column != sort_by.value:
+            raise InvalidCursorError
+        python_type = SORT_COLUMNS[column].type.python_type
+        if python_type is datetime:
+            value = datetime.fromisoformat(value)
+        else:
+            value = python_type(value)
+        return value, int(entry_id)
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise InvalidCursorError from exc
+
+
+def encode_rank_cursor(rank: float, entry_id: int) -> str:
+    """
+    Encode the position of a found budget entry into an opaque cursor.
+
+    Parameters
+    ----------
+    rank : float
+        Search rank of the last budget entry of a page.
+    entry_id : int
+        ID of the entry.
+
+    Returns
+    -------
+    str
+        URL-safe cursor containing the rank and the ID of the entry.
+
+    """
+    return _encode_payload(payload=['rank', rank, entry_id])
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Decode an opaque cursor into the position of a found budget entry.
+
+    Parameters
+    ----------
+    cursor : str
+        Cursor returned by `encode_rank_cursor`.
+
+    Returns
+    -------
+    tuple of float and int
+        The search rank and the ID of the last entry of the previous page.
+
+    Raises
+    ------
+    InvalidCursorError
+        If the cursor cannot be decoded.
+
+    """
+    try:
+        column, rank, entry_id = _decode_payload(cursor=cursor)
+        if column != 'rank':
+            raise InvalidCursorError
+        return float(rank), int(entry_id)
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise InvalidCursorError from exc
+
+
+def _encode_payload(payload: list) -> str:
+    """
+    Encode a JSON-serializable position into an opaque cursor.
+
+    Parameters
+    ----------
+    payload : list
+        Values defining the position of an entry.
+
+    Returns
+    -------
+    str
+        URL-safe cursor.
+
+    """
+    data = json.dumps(payload).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+def _decode_payload(cursor: str) -> list:
+    """
+    Decode an opaque cursor into the position of an entry.
+
+    Parameters
+    ----------
+    cursor : str
+        Cursor returned by `_encode_payload`.
+
+    Returns
+    -------
+    list
+        Values defining the position of an entry.
+
+    """
+    return json.loads(base64.urlsafe_b64decode(cursor))
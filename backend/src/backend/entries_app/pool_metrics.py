@@ -0,0 +1,120 @@
+"""
+The module providing connection pools that measure checkout waits.
+
+The pools extend SQLAlchemy queue pools with counters of connection
+checkouts, the time spent waiting for a connection, and timeouts,
+so that the pool size can be tuned against the number of workers.
+
+"""
+import threading
+import time
+
+import sqlalchemy as sql
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.pool.base import ConnectionPoolEntry
+
+
+class PoolWaitMixin:
+    """
+    Mixin measuring the time of getting connections from a queue pool.
+
+    Attributes
+    ----------
+    checkouts_number : int
+        Number of connections taken from the pool.
+    timeouts_number : int
+        Number of checkouts failed because of the pool timeout.
+    wait_seconds_total : float
+        Total time of checkouts, including opening of new connections.
+    wait_seconds_max : float
+        Maximum time of one checkout.
+
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Initialize the pool and its counters.
+
+        Parameters
+        ----------
+        *args
+            Positional arguments of the pool.
+        **kwargs
+            Keyword arguments of the pool.
+
+        """
+        super().__init__(*args, **kwargs)
+        self.checkouts_number = 0
+        self.timeouts_number = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._metrics_lock = threading.Lock()
+
+    def get_stats(self) -> dict[str, int | float]:
+        """
+        Return the current state of the pool and checkout statistics.
+
+        Returns
+        -------
+        dict
+            Pool size, numbers of checked-in, checked-out
+            and overflow connections, and checkout statistics.
+
+        """
+        with self._metrics_lock:
+            checkouts_number = self.checkouts_number
+            wait_seconds_total = self.wait_seconds_total
+            stats = {
+                'checkouts_number': checkouts_number,
+                'timeouts_number': self.timeouts_number,
+                'wait_seconds_total': round(wait_seconds_total, 6),
+                'wait_seconds_max': round(self.wait_seconds_max, 6),
+            }
+        stats['wait_seconds_mean'] = round(
+            wait_seconds_total / checkouts_number if checkouts_number else 0,
+            6,
+        )
+        return {
+            'size': self.size(),
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': self.overflow(),
+            **stats,
+        }
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        """
+        Get a connection from the pool and record the waiting time.
+
+        Returns
+        -------
+        ConnectionPoolEntry
+            The connection record.
+
+        Raises
+        ------
+        sqlalchemy.exc.TimeoutError
+            If no connection becomes available in the pool timeout.
+
+        """
+        start = time.perf_counter()
+        try:
+            connection_record = super()._do_get()
+        except sql.exc.TimeoutError:
+            with self._metrics_lock:
+                self.timeouts_number += 1
+            raise
+        duration = time.perf_counter() - start
+        with self._metrics_lock:
+            self.checkouts_number += 1
+            self.wait_seconds_total += duration
+            self.wait_seconds_max = max(self.wait_seconds_max, duration)
+        return connection_record
+
+
+class TimedQueuePool(PoolWaitMixin, QueuePool):
+    """Queue pool of synchronous connections with checkout statistics."""
+
+
+class TimedAsyncQueuePool(PoolWaitMixin, AsyncAdaptedQueuePool):
+    """Queue pool of asynchronous connections with checkout statistics."""
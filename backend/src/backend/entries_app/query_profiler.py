@@ -0,0 +1,294 @@
+"""
+The module profiling SQL queries executed by database engines.
+
+Queries are counted and timed for the current request, which is
+tracked with a context variable, and slow queries are logged
+together with their execution plans.
+
+"""
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import sqlalchemy as sql
+
+logger = logging.getLogger(__name__)
+QUERY_STARTS_KEY = 'profiler_query_starts'
+EXPLAINED_STATEMENTS = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+EXPLAIN_SAVEPOINT = 'explain_slow_query'
+
+
+class QueryStats:
+    """
+    Number and total duration of queries of one request.
+
+    Attributes
+    ----------
+    queries_number : int
+        Number of executed queries.
+    duration : float
+        Total duration of executed queries in seconds.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize the QueryStats."""
+        self.queries_number = 0
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, duration: float) -> None:
+        """
+        Add an executed query.
+
+        Parameters
+        ----------
+        duration : float
+            Duration of the query in seconds.
+
+        """
+        with self._lock:
+            self.queries_number += 1
+            self.duration += duration
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    'current_query_stats',
+    default=None,
+)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Count queries executed in the current context.
+
+    Yields
+    ------
+    QueryStats
+        Statistics of queries executed inside the block.
+
+    """
+    query_stats = QueryStats()
+    token = current_query_stats.set(query_stats)
+    try:
+        yield query_stats
+    finally:
+        current_query_stats.reset(token)
+
+
+class QueryProfiler:
+    """
+    Listener of engine events counting, timing and logging queries.
+
+    Attributes
+    ----------
+    slow_query_threshold : float or None
+        Duration in seconds from which queries are logged as slow.
+        If None, slow queries are not logged.
+    explain_slow_queries : bool
+        Whether execution plans of slow queries are logged.
+    duration_observers : list of Callable
+        Functions called with the duration of each query in seconds,
+        for example, to record it in metrics.
+
+    """
+
+    def __init__(
+        self,
+        slow_query_threshold: float | None,
+        *,
+        explain_slow_queries: bool = True,
+    ) -> None:
+        """
+        Initialize the QueryProfiler.
+
+        Parameters
+        ----------
+        slow_query_threshold : float or None
+            Duration in seconds from which queries are logged as slow.
+            If None, slow queries are not logged.
+        explain_slow_queries : bool, optional
+            Whether execution plans of slow queries are logged,
+            by default True.
+
+        """
+        self.slow_query_threshold = slow_query_threshold
+        self.explain_slow_queries = explain_slow_queries
+        self.duration_observers: list[Callable[[float], None]] = []
+
+    def attach(self, engine: sql.Engine) -> None:
+        """
+        Listen to query execution events of an engine.
+
+        Parameters
+        ----------
+        engine : sql.Engine
+            SQLAlchemy engine. For an asynchronous engine,
+            its `sync_engine` is passed.
+
+        """
+        sql.event.listen(engine, 'before_cursor_execute', self.before_execute)
+        sql.event.listen(engine, 'after_cursor_execute', self.after_execute)
+        sql.event.listen(engine, 'handle_error', self.handle_error)
+
+    @classmethod
+    def before_execute(  # noqa: PLR0913, PLR0917
+        cls,
+        conn: sql.Connection,
+        cursor: object,
+        statement: str,
+        parameters: object,
+        context: object,
+        executemany: bool,  # noqa: FBT001
+    ) -> None:
+        """
+        Remember the start time of a query.
+
+        Parameters
+        ----------
+        conn : sql.Connection
+            The connection executing the query.
+        cursor : object
+            The DBAPI cursor.
+        statement : str
+            The SQL statement.
+        parameters : object
+            The parameters of the statement.
+        context : object
+            The execution context.
+        executemany : bool
+            Whether the statement is executed for many parameter sets.
+
+        """
+        conn.info.setdefault(QUERY_STARTS_KEY, []).append(
+            time.perf_counter(),
+        )
+
+    def after_execute(  # noqa: PLR0913, PLR0917
+        self,
+        conn: sql.Connection,
+        cursor: object,
+        statement: str,
+        parameters: object,
+        context: object,
+        executemany: bool,  # noqa: FBT001
+    ) -> None:
+        """
+        Count a query and log it if it is slow.
+
+        Parameters
+        ----------
+        conn : sql.Connection
+            The connection executing the query.
+        cursor : object
+            The DBAPI cursor.
+        statement : str
+            The SQL statement.
+        parameters : object
+            The parameters of the statement.
+        context : object
+            The execution context.
+        executemany : bool
+            Whether the statement is executed for many parameter sets.
+
+        """
+        query_starts = conn.info.get(QUERY_STARTS_KEY)
+        if not query_starts:
+            return
+        duration = time.perf_counter() - query_starts.pop()
+        query_stats = current_query_stats.get()
+        if query_stats is not None:
+            query_stats.add(duration=duration)
+        for observe in self.duration_observers:
+            observe(duration)
+        if (
+            self.slow_query_threshold is None
+            or duration < self.slow_query_threshold
+        ):
+            return
+        plan = None
+        if self.explain_slow_queries and not executemany:
+            plan = self._explain(
+                conn=conn,
+                statement=statement,
+                parameters=parameters,
+            )
+        logger.warning(
+            'Slow query (%.3f s): %s%s',
+            duration,
+            statement,
+            f'\n{plan}' if plan else '',
+        )
+
+    @classmethod
+    def handle_error(cls, context: sql.engine.ExceptionContext) -> None:
+        """
+        Forget the start time of a failed query.
+
+        Parameters
+        ----------
+        context : sql.engine.ExceptionContext
+            The context of the error.
+
+        """
+        if context.connection is None:
+            return
+        query_starts = context.connection.info.get(QUERY_STARTS_KEY)
+        if query_starts:
+            query_starts.pop()
+
+    @classmethod
+    def _explain(
+        cls,
+        conn: sql.Connection,
+        statement: str,
+        parameters: object,
+    ) -> str | None:
+        """
+        Return the execution plan of a statement.
+
+        The plan is requested with a separate cursor inside a savepoint,
+        so that a failure does not abort the transaction of the query.
+
+        Parameters
+        ----------
+        conn : sql.Connection
+            The connection that executed the statement.
+        statement : str
+            The SQL statement.
+        parameters : object
+            The parameters of the statement.
+
+        Returns
+        -------
+        str or None
+            The plan, or None if the statement cannot be explained.
+
+        """
+        if conn.dialect.name != 'postgresql':
+            return None
+        if not statement.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            return None
+        dbapi_error = conn.dialect.loaded_dbapi.Error
+        cursor = conn.connection.cursor()
+        try:
+            try:
+                cursor.execute(f'SAVEPOINT {EXPLAIN_SAVEPOINT}')
+            except dbapi_error as exc:
+                logger.debug('Query is not explained: %s', str(exc))
+                return None
+            try:
+                cursor.execute(f'EXPLAIN {statement}', parameters)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+            except dbapi_error as exc:
+                cursor.execute(f'ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}')
+                logger.debug('Query is not explained: %s', str(exc))
+                return None
+            cursor.execute(f'RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}')
+        finally:
+            cursor.close()
+        return plan
@@ -0,0 +1,166 @@
+"""
+The module searching budget entries by product and shop.
+
+If the `pg_trgm` PostgreSQL extension is available, trigram GIN indexes
+are created on products of entries and on names of shops, and matches
+are ranked by word similarity, which also finds misspelled names.
+Matching shops are found before entries, so that entries are selected
+by a bitmap OR of the product index and the index of shop IDs
+instead of a scan of the join of entries and shops.
+Otherwise, entries are searched with `ILIKE` by a sequential scan
+and ranked by the position of the query in product names.
+
+"""
+import logging
+
+import sqlalchemy as sql
+
+from backend.entries_app.models import BudgetEntry, Shop
+
+logger = logging.getLogger(__name__)
+TRIGRAM_EXTENSION = 'pg_trgm'
+SEARCHED_COLUMNS = (BudgetEntry.product, Shop.name)
+LIKE_ESCAPE = '\\'
+
+
+def install_search_indexes(connection: sql.Connection) -> None:
+    """
+    Create the trigram extension and indexes if it is possible.
+
+    The extension is created inside a savepoint, so that its absence
+    or insufficient privileges do not abort the transaction.
+
+    Parameters
+    ----------
+    connection : sql.Connection
+        SQLAlchemy connection to a PostgreSQL database.
+
+    """
+    try:
+        with connection.begin_nested():
+            connection.execute(sql.text(
+                f'CREATE EXTENSION IF NOT EXISTS {TRIGRAM_EXTENSION}',
+            ))
+    except sql.exc.DBAPIError as exc:
+        logger.warning(
+            'Extension %s is not available, entries are searched '
+            'without indexes: %s',
+            TRIGRAM_EXTENSION,
+            str(exc.orig).strip(),
+        )
+        return
+    for column in SEARCHED_COLUMNS:
+        table = column.table.name
+        connection.execute(sql.text(f"""
+            CREATE INDEX IF NOT EXISTS ix_{table}_{column.name}_trgm
+            ON {table} USING gin ({column.name} gin_trgm_ops)
+        """))
+
+
+def has_trigram_search(connection: sql.Connection) -> bool:
+    """
+    Check whether the trigram extension is installed in the database.
+
+    Parameters
+    ----------
+    connection : sql.Connection
+        SQLAlchemy database connection.
+
+    Returns
+    -------
+    bool
+        True if entries can be searched with trigram indexes.
+
+    """
+    if connection.dialect.name != 'postgresql':
+        return False
+    return bool(
+        connection.scalar(
+            sql.text('SELECT 1 FROM pg_extension WHERE extname = :name'),
+            parameters={'name': TRIGRAM_EXTENSION},
+        ),
+    )
+
+
+def get_search_rank(
+    query: str,
+    *,
+    trigram_search: bool,
+) -> tuple[sql.ColumnElement[bool], sql.ColumnElement[float]]:
+    """
+    Return the condition of matching entries and their rank.
+
+    Entries are matched by products and by IDs of matching shops.
+    The rank refers to the shops table, so it is used in queries
+    built on `select_entries`.
+
+    Parameters
+    ----------
+    query : str
+        Searched text.
+    trigram_search : bool
+        Whether trigram indexes and functions are used.
+
+    Returns
+    -------
+    tuple
+        The condition of the WHERE clause and the rank expression.
+        Better matches have higher ranks.
+
+    """
+    pattern = f'%{_escape_like(query)}%'
+    product_condition, shop_condition = (
+        column.ilike(pattern, escape=LIKE_ESCAPE)
+        for column in SEARCHED_COLUMNS
+    )
+    if trigram_search:
+        product_condition |= BudgetEntry.product.bool_op('%>')(query)
+        shop_ids = sql.select(Shop.id).where(
+            shop_condition | Shop.name.bool_op('%>')(query),
+        )
+        rank = sql.func.greatest(
+            *(
+                sql.func.word_similarity(query, column)
+                for column in SEARCHED_COLUMNS
+            ),
+        )
+        # An array of shop IDs is compared with `= ANY`, so that
+        # the condition is indexable and combined in a bitmap OR.
+        shop_match = BudgetEntry.shop_id == sql.any_(
+            sql.func.array(shop_ids.scalar_subquery()),
+        )
+    else:
+        shop_match = BudgetEntry.shop_id.in_(
+            sql.select(Shop.id).where(shop_condition),
+        )
+        product = BudgetEntry.product
+        rank = sql.case(
+            (product.ilike(_escape_like(query), escape=LIKE_ESCAPE), 1),
+            (
+                product.ilike(f'{_escape_like(query)}%', escape=LIKE_ESCAPE),
+                0.75,
+            ),
+            (product.ilike(pattern, escape=LIKE_ESCAPE), 0.5),
+            else_=0.25,
+        )
+    return product_condition | shop_match, sql.cast(rank, sql.Float)
+
+
+def _escape_like(text: str) -> str:
+    """
+    Escape wildcards of a LIKE pattern.
+
+    Parameters
+    ----------
+    text : str
+        Searched text.
+
+    Returns
+    -------
+    str
+        The text matching itself in a LIKE pattern.
+
+    """
+    for char in (LIKE_ESCAPE, '%', '_'):
+        text = text.replace(char, f'{LIKE_ESCAPE}{char}')
+    return text
@@ -1,4 +1,4 @@
-"""The module providing Pydantic settings for the database connection."""
+"""The module providing Pydantic settings for the database and uploads."""
 from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -20,6 +20,33 @@ class DBSettings(BaseSettings):
         Database port number (default: 5432).
     db_name : str
         Name of the database.
+    db_pool_size : int
+        Number of connections kept in the pool of each worker
+        (default: 5).
+    db_max_overflow : int
+        Number of connections opened above the pool size under load
+        (default: 10).
+    db_pool_timeout : float
+        Seconds to wait for a connection from the full pool
+        (default: 30).
+    db_pool_recycle : int
+        Seconds after which a connection is reopened,
+        -1 disables recycling (default: 1800).
+    db_pool_pre_ping : bool
+        Whether connections are checked before use (default: True).
+    db_statement_timeout : int
+        Milliseconds after which a statement is cancelled by PostgreSQL,
+        0 disables the timeout (default: 0).
+    db_slow_query_threshold : float or None
+        Seconds from which queries are logged as slow,
+        None disables the log (default: 1).
+    db_explain_slow_queries : bool
+        Whether execution plans of slow queries are logged
+        (default: True).
+    db_async_mode : bool
+        Whether the entries API uses an asynchronous engine
+        with asyncpg driver (default: False). Otherwise, entries
+        are processed with psycopg2 in the threadpool.
     model_config : SettingsConfigDict
         Configuration for loading settings from an environment file.
         The file is expected to be located at 'src/backend/entries_app/.env'.
@@ -31,6 +58,65 @@ class DBSettings(BaseSettings):
     db_host: str = ''
     db_port: int = 5432
     db_name: str = ''
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout: int = 0
+    db_slow_query_threshold: float | None = 1
+    db_explain_slow_queries: bool = True
+    db_async_mode: bool = False
+
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).parent.joinpath('.env'),
+        env_file_encoding='utf-8',
+    )
+
+
+class UploadSettings(BaseSettings):
+    """
+    Pydantic settings model for the upload of budget entries.
+
+    Attributes
+    ----------
+    upload_batch_size : int
+        Maximum number of rows sent to the database in one batch
+        (default: 10000).
+    upload_chunk_size : int
+        Number of CSV rows parsed and committed at once
+        in the streaming upload mode (default: 100000).
+    model_config : SettingsConfigDict
+        Configuration for loading settings from an environment file.
+        The file is expected to be located at 'src/backend/entries_app/.env'.
+
+    """
+
+    upload_batch_size: int = 10000
+    upload_chunk_size: int = 100000
+
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).parent.joinpath('.env'),
+        env_file_encoding='utf-8',
+    )
+
+
+class ExportSettings(BaseSettings):
+    """
+    Pydantic settings model for the export of budget entries.
+
+    Attributes
+    ----------
+    export_chunk_size : int
+        Number of rows fetched from the server-side cursor and sent
+        to the client at once (default: 10000).
+    model_config : SettingsConfigDict
+        Configuration for loading settings from an environment file.
+        The file is expected to be located at 'src/backend/entries_app/.env'.
+
+    """
+
+    export_chunk_size: int = 10000
 
     model_config = SettingsConfigDict(
         env_file=Path(__file__).parent.joinpath('.env'),
@@ -0,0 +1,310 @@
+"""
+The module maintaining summary statistics of budget entries.
+
+Statistics are stored in `entries_summary` and `entries_dimension_counts`
+tables, and monthly expenses per category and currency are stored in
+`monthly_category_rollup` table. These tables are kept up to date
+by PostgreSQL statement-level triggers on `budget_entries`,
+so that reading them does not scan the entries.
+
+Every statement changing entries updates the single summary row,
+so its lock is held until the end of the transaction, and concurrent
+writing transactions are serialized from their first statement.
+The triggers lock the summary row before the counts and the rollup,
+so that transactions of several statements do not lock these rows
+in opposite orders. The data version is incremented by each
+statement, so that it is a counter of changes rather than
+of transactions.
+
+"""
+import sqlalchemy as sql
+
+from backend.entries_app.models import (
+    BudgetEntry,
+    DimensionCount,
+    EntriesSummary,
+    MonthlyCategoryRollup,
+)
+
+SUMMARY_ID = 1
+SUMMARY_TABLES = (
+    EntriesSummary.__table__,
+    DimensionCount.__table__,
+    MonthlyCategoryRollup.__table__,
+)
+DIMENSIONS = {
+    'category': 'categories_number',
+    'person': 'persons_number',
+}
+SYNC_FUNCTION = 'budget_entries_sync_summary'
+TRIGGERS = {
+    'INSERT': 'REFERENCING NEW TABLE AS new_entries',
+    'UPDATE': 'REFERENCING OLD TABLE AS old_entries NEW TABLE AS new_entries',
+    'DELETE': 'REFERENCING OLD TABLE AS old_entries',
+}
+ENTRIES = BudgetEntry.__tablename__
+SUMMARY = EntriesSummary.__tablename__
+COUNTS = DimensionCount.__tablename__
+ROLLUP = MonthlyCategoryRollup.__tablename__
+
+
+def _add_references(source: str, sign: str) -> str:
+    """
+    Return SQL adding references of entries from a table to the counts.
+
+    Parameters
+    ----------
+    source : str
+        Name of the table containing budget entries.
+    sign : str
+        Sign of added numbers ('+' or '-').
+
+    Returns
+    -------
+    str
+        `INSERT ... ON CONFLICT DO UPDATE` statement. Rows are upserted
+        in the order of the primary key, so that concurrent
+        statements lock them in the same order and do not deadlock.
+
+    """
+    selects = '\nUNION ALL\n'.join(
+        f"""
+        SELECT '{dimension}', {dimension}_id, {sign}count(*)
+        FROM {source}
+        WHERE {dimension}_id IS NOT NULL
+        GROUP BY {dimension}_id
+        """  # noqa: S608
+        for dimension in DIMENSIONS
+    )
+    return f"""
+        INSERT INTO {COUNTS} AS counts (
+            dimension, value_id, references_number
+        )
+        {selects}
+        ORDER BY 1, 2
+        ON CONFLICT (dimension, value_id) DO UPDATE
+        SET references_number = (
+            counts.references_number + excluded.references_number
+        );
+    """  # noqa: S608
+
+
+def _add_expenses(source: str, sign: str) -> str:
+    """
+    Return SQL adding expenses of entries from a table to the rollup.
+
+    Parameters
+    ----------
+    source : str
+        Name of the table containing budget entries.
+    sign : str
+        Sign of added numbers ('+' or '-').
+
+    Returns
+    -------
+    str
+        `INSERT ... ON CONFLICT DO UPDATE` statement
+        followed by removal of empty rollup rows. Rows are upserted
+        in the order of the primary key, so that concurrent
+        statements lock them in the same order and do not deadlock.
+
+    """
+    return f"""
+        INSERT INTO {ROLLUP} AS rollup (
+            month, category_id, currency_id, expenses_sum, expenses_number
+        )
+        SELECT
+            date_trunc('month', date),
+            category_id,
+            currency_id,
+            {sign}sum(amount),
+            {sign}count(*)
+        FROM {source}
+        WHERE amount > 0
+            AND date IS NOT NULL
+            AND category_id IS NOT NULL
+            AND currency_id IS NOT NULL
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        ON CONFLICT (month, category_id, currency_id) DO UPDATE
+        SET
+            expenses_sum = rollup.expenses_sum + excluded.expenses_sum,
+            expenses_number = (
+                rollup.expenses_number + excluded.expenses_number
+            );
+        DELETE FROM {ROLLUP} WHERE expenses_number <= 0;
+    """  # noqa: S608
+
+
+def _refresh_summary(entries_number: str) -> str:
+    """
+    Return SQL refreshing the summary row.
+
+    Date bounds are read from the `(date, id)` index of entries,
+    and numbers of unique values are read from the counts table.
+    The data version is incremented. All fields are set
+    by one `UPDATE`, so that a statement changing entries
+    adds one version of the summary row.
+
+    Parameters
+    ----------
+    entries_number : str
+        SQL expression of the new number of entries.
+
+    Returns
+    -------
+    str
+        `UPDATE` statement of the summary row.
+
+    """
+    unique_numbers = ',\n'.join(
+        f"""
+        {summary_column} = (
+            SELECT count(*) FROM {COUNTS} WHERE dimension = '{dimension}'
+        )
+        """  # noqa: S608
+        for dimension, summary_column in DIMENSIONS.items()
+    )
+    return f"""
+        DELETE FROM {COUNTS} WHERE references_number <= 0;
+        UPDATE {SUMMARY}
+        SET
+            entries_number = {entries_number},
+            min_date = (SELECT min(date) FROM {ENTRIES}),
+            max_date = (SELECT max(date) FROM {ENTRIES}),
+            data_version = data_version + 1,
+            {unique_numbers}
+        WHERE id = {SUMMARY_ID};
+    """  # noqa: S608
+
+
+def install_summary_triggers(connection: sql.Connection) -> None:
+    """
+    Create or replace triggers maintaining summary statistics.
+
+    Parameters
+    ----------
+    connection : sql.Connection
+        SQLAlchemy connection to a PostgreSQL database.
+
+    """
+    refresh_summary = _refresh_summary(
+        entries_number='entries_number + added_entries',
+    )
+    connection.execute(sql.text(f"""
+        CREATE OR REPLACE FUNCTION {SYNC_FUNCTION}() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            added_entries bigint := 0;
+        BEGIN
+            PERFORM FROM {SUMMARY} WHERE id = {SUMMARY_ID} FOR UPDATE;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                {_add_references(source='old_entries', sign='-')}
+                {_add_expenses(source='old_entries', sign='-')}
+                added_entries := added_entries - (
+                    SELECT count(*) FROM old_entries
+                );
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                {_add_references(source='new_entries', sign='+')}
+                {_add_expenses(source='new_entries', sign='+')}
+                added_entries := added_entries + (
+                    SELECT count(*) FROM new_entries
+                );
+            END IF;
+            {refresh_summary}
+            RETURN NULL;
+        END;
+        $$
+    """))  # noqa: S608
+    existing_triggers = set(
+        connection.scalars(
+            sql.text(
+                """
+                SELECT tgname FROM pg_trigger
+                WHERE tgrelid = CAST(:table_name AS regclass)
+                """,
+            ),
+            parameters={'table_name': ENTRIES},
+        ),
+    )
+    for event, transition_tables in TRIGGERS.items():
+        trigger_name = f'{ENTRIES}_summary_{event.lower()}'
+        if trigger_name in existing_triggers:
+            continue
+        connection.execute(sql.text(f"""
+            CREATE TRIGGER {trigger_name}
+            AFTER {event} ON {ENTRIES}
+            {transition_tables}
+            FOR EACH STATEMENT EXECUTE FUNCTION {SYNC_FUNCTION}()
+        """))
+
+
+def uninstall_summary(connection: sql.Connection) -> None:
+    """
+    Drop triggers maintaining summary statistics and their tables.
+
+    It is used before changes of columns of budget entries that are
+    referenced by the triggers. The summary row is kept, and it is
+    updated again once the triggers are installed and the statistics
+    are rebuilt.
+
+    Parameters
+    ----------
+    connection : sql.Connection
+        SQLAlchemy connection to a PostgreSQL database.
+
+    """
+    connection.execute(
+        sql.text(f'DROP FUNCTION IF EXISTS {SYNC_FUNCTION}() CASCADE'),
+    )
+    for table in (DimensionCount.__table__, MonthlyCategoryRollup.__table__):
+        table.drop(bind=connection, checkfirst=True)
+
+
+def rebuild_summary(connection: sql.Connection) -> None:
+    """
+    Recalculate summary statistics and rollup from all budget entries.
+
+    Parameters
+    ----------
+    connection : sql.Connection
+        SQLAlchemy connection to a PostgreSQL database.
+
+    """
+    connection.execute(sql.delete(DimensionCount))
+    connection.execute(sql.delete(MonthlyCategoryRollup))
+    refresh_summary = _refresh_summary(
+        entries_number=f'(SELECT count(*) FROM {ENTRIES})',  # noqa: S608
+    )
+    connection.execute(sql.text(f"""
+        INSERT INTO {SUMMARY} (id, entries_number)
+        VALUES ({SUMMARY_ID}, 0)
+        ON CONFLICT (id) DO NOTHING;
+        {_add_references(source=ENTRIES, sign='+')}
+        {_add_expenses(source=ENTRIES, sign='+')}
+        {refresh_summary}
+    """))  # noqa: S608
+
+
+def get_data_version(connection: sql.Connection) -> int | None:
+    """
+    Return the counter of changes of budget entries.
+
+    Parameters
+    ----------
+    connection : sql.Connection
+        SQLAlchemy database connection.
+
+    Returns
+    -------
+    int or None
+        The data version, or None if summary statistics
+        are not maintained by the database.
+
+    """
+    return connection.scalar(
+        sql.select(EntriesSummary.data_version).where(
+            EntriesSummary.id == SUMMARY_ID,
+        ),
+    )
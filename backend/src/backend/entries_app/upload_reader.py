@@ -0,0 +1,342 @@
+"""
+The module reading uploaded files of budget entries.
+
+Semicolon-separated CSV files, optionally compressed with gzip or zstd,
+are parsed with pandas. Parquet files and Arrow IPC files (Feather v2)
+or streams are read with pyarrow and validated on typed columns.
+Formats are detected from magic bytes, and then from the content type.
+
+"""
+import shutil
+import tempfile
+from collections.abc import Iterator
+from enum import Enum
+from typing import BinaryIO
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import UploadFile
+
+from backend.entries_app.bulk_loader import BulkLoader
+from backend.entries_app.exceptions import ProcessingError
+
+CSV_SEPARATOR = ';'
+MAGIC_BYTES_LENGTH = 8
+READ_ERRORS = (OSError, ValueError, pa.ArrowException)
+
+
+class UploadFormat(Enum):
+    """Enumeration for formats of uploaded files."""
+
+    csv: str = 'csv'
+    gzip_csv: str = 'gzip_csv'
+    zstd_csv: str = 'zstd_csv'
+    parquet: str = 'parquet'
+    arrow_file: str = 'arrow_file'
+    arrow_stream: str = 'arrow_stream'
+
+
+MAGIC_BYTES = {
+    b'PAR1': UploadFormat.parquet,
+    b'ARROW1': UploadFormat.arrow_file,
+    b'\xff\xff\xff\xff': UploadFormat.arrow_stream,
+    b'\x1f\x8b': UploadFormat.gzip_csv,
+    b'\x28\xb5\x2f\xfd': UploadFormat.zstd_csv,
+}
+CONTENT_TYPES = {
+    'application/vnd.apache.parquet': UploadFormat.parquet,
+    'application/x-parquet': UploadFormat.parquet,
+    'application/vnd.apache.arrow.file': UploadFormat.arrow_file,
+    'application/vnd.apache.arrow.stream': UploadFormat.arrow_stream,
+    'application/gzip': UploadFormat.gzip_csv,
+    'application/x-gzip': UploadFormat.gzip_csv,
+    'application/zstd': UploadFormat.zstd_csv,
+}
+COMPRESSIONS = {
+    UploadFormat.gzip_csv: 'gzip',
+    UploadFormat.zstd_csv: 'zstd',
+}
+CSV_FORMATS = (UploadFormat.csv, *COMPRESSIONS)
+
+
+class UploadReader:
+    """
+    Reader of uploaded budget entries in CSV, Parquet and Arrow formats.
+
+    Attributes
+    ----------
+    chunk_size : int
+        Number of rows validated at once in the streaming upload mode.
+
+    """
+
+    def __init__(self, chunk_size: int) -> None:
+        """
+        Initialize the UploadReader.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Number of rows validated at once in the streaming upload mode.
+
+        """
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def detect_format(cls, uploaded_entries: UploadFile) -> UploadFormat:
+        """
+        Detect the format of an uploaded file.
+
+        Parameters
+        ----------
+        uploaded_entries : UploadFile
+            The uploaded file.
+
+        Returns
+        -------
+        UploadFormat
+            The format matching the magic bytes of the file,
+            or its content type. By default, plain CSV.
+
+        """
+        file = uploaded_entries.file
+        header = file.read(MAGIC_BYTES_LENGTH)
+        file.seek(0)
+        for magic_bytes, upload_format in MAGIC_BYTES.items():
+            if header.startswith(magic_bytes):
+                return upload_format
+        content_type = (uploaded_entries.content_type or '').split(';')[0]
+        return CONTENT_TYPES.get(content_type.strip(), UploadFormat.csv)
+
+    @classmethod
+    def detach(cls, uploaded_entries: UploadFile) -> UploadFile:
+        """
+        Copy an uploaded file, so that it can be read after the request.
+
+        The files of a request are closed when the response is sent,
+        so files processed by background jobs are copied
+        to temporary files that are deleted once they are closed.
+
+        Parameters
+        ----------
+        uploaded_entries : UploadFile
+            The uploaded file.
+
+        Returns
+        -------
+        UploadFile
+            The copy of the uploaded file with the same name and headers.
+
+        """
+        file = tempfile.TemporaryFile()  # noqa: SIM115
+        shutil.copyfileobj(uploaded_entries.file, file)
+        file.seek(0)
+        return UploadFile(
+            file=file,
+            size=uploaded_entries.size,
+            filename=uploaded_entries.filename,
+            headers=uploaded_entries.headers,
+        )
+
+    @classmethod
+    def get_read_fraction(cls, uploaded_entries: UploadFile) -> float | None:
+        """
+        Return the fraction of an uploaded file that is read.
+
+        Parameters
+        ----------
+        uploaded_entries : UploadFile
+            The uploaded file.
+
+        Returns
+        -------
+        float or None
+            The position of the file divided by its size,
+            or None if the size is unknown.
+
+        """
+        if not uploaded_entries.size:
+            return None
+        position = uploaded_entries.file.tell()
+        return min(position / uploaded_entries.size, 1)
+
+    def read(self, uploaded_entries: UploadFile) -> pd.DataFrame:
+        """
+        Read and validate all uploaded entries.
+
+        Parameters
+        ----------
+        uploaded_entries : UploadFile
+            The uploaded file.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing the validated budget entries.
+
+        Raises
+        ------
+        MissedColumnsError
+            If required columns are missing from the uploaded file.
+        ProcessingError
+            If the uploaded file cannot be read, or contains
+            missing or invalid values.
+
+        """
+        upload_format = self.detect_format(uploaded_entries=uploaded_entries)
+        file = uploaded_entries.file
+        try:
+            if upload_format in CSV_FORMATS:
+                df = pd.read_csv(
+                    self._open_csv(file=file, upload_format=upload_format),
+                    sep=CSV_SEPARATOR,
+                )
+                return BulkLoader.validate(df=df)
+            table = pa.Table.from_batches(
+                list(self._iter_batches(file, upload_format=upload_format)),
+            )
+        except READ_ERRORS as exc:
+            raise ProcessingError from exc
+        return BulkLoader.validate_table(table=table)
+
+    def iter_chunks(
+        self,
+        uploaded_entries: UploadFile,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Read and validate uploaded entries chunk by chunk.
+
+        Parameters
+        ----------
+        uploaded_entries : UploadFile
+            The uploaded file.
+
+        Yields
+        ------
+        pd.DataFrame
+            DataFrames containing up to `chunk_size` validated entries.
+
+        Raises
+        ------
+        MissedColumnsError
+            If required columns are missing from the uploaded file.
+        ProcessingError
+            If the uploaded file cannot be read, or contains
+            missing or invalid values.
+
+        """
+        upload_format = self.detect_format(uploaded_entries=uploaded_entries)
+        file = uploaded_entries.file
+        try:
+            if upload_format in CSV_FORMATS:
+                with pd.read_csv(
+                    self._open_csv(file=file, upload_format=upload_format),
+                    sep=CSV_SEPARATOR,
+                    chunksize=self.chunk_size,
+                ) as reader:
+                    for chunk in reader:
+                        yield BulkLoader.validate(df=chunk)
+            else:
+                for table in self._iter_tables(
+                    file,
+                    upload_format=upload_format,
+                ):
+                    yield BulkLoader.validate_table(table=table)
+        except READ_ERRORS as exc:
+            raise ProcessingError from exc
+
+    @classmethod
+    def _open_csv(
+        cls,
+        file: BinaryIO,
+        upload_format: UploadFormat,
+    ) -> BinaryIO | pa.CompressedInputStream:
+        """
+        Return a readable stream of CSV data.
+
+        Parameters
+        ----------
+        file : BinaryIO
+            The uploaded file.
+        upload_format : UploadFormat
+            The format of the file.
+
+        Returns
+        -------
+        BinaryIO or pa.CompressedInputStream
+            The file itself, or a stream decompressing it.
+
+        """
+        compression = COMPRESSIONS.get(upload_format)
+        if compression is None:
+            return file
+        return pa.CompressedInputStream(
+            pa.PythonFile(file, mode='r'),
+            compression,
+        )
+
+    def _iter_batches(
+        self,
+        file: BinaryIO,
+        upload_format: UploadFormat,
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Yield record batches of a columnar file.
+
+        Parameters
+        ----------
+        file : BinaryIO
+            The uploaded file.
+        upload_format : UploadFormat
+            The format of the file.
+
+        Yields
+        ------
+        pa.RecordBatch
+            Record batches of the file.
+
+        """
+        if upload_format == UploadFormat.parquet:
+            yield from pq.ParquetFile(file).iter_batches(
+                batch_size=self.chunk_size,
+            )
+        elif upload_format == UploadFormat.arrow_file:
+            reader = pa.ipc.open_file(file)
+            for index in range(reader.num_record_batches):
+                yield reader.get_batch(index)
+        else:
+            yield from pa.ipc.open_stream(file)
+
+    def _iter_tables(
+        self,
+        file: BinaryIO,
+        upload_format: UploadFormat,
+    ) -> Iterator[pa.Table]:
+        """
+        Yield tables of about `chunk_size` rows from a columnar file.
+
+        Parameters
+        ----------
+        file : BinaryIO
+            The uploaded file.
+        upload_format : UploadFormat
+            The format of the file.
+
+        Yields
+        ------
+        pa.Table
+            Tables of consecutive record batches.
+
+        """
+        batches = []
+        rows_number = 0
+        for batch in self._iter_batches(file, upload_format=upload_format):
+            batches.append(batch)
+            rows_number += batch.num_rows
+            if rows_number >= self.chunk_size:
+                yield pa.Table.from_batches(batches)
+                batches = []
+                rows_number = 0
+        if batches:
+            yield pa.Table.from_batches(batches)
@@ -0,0 +1 @@
+"""The package runs long operations as background jobs."""
@@ -0,0 +1,27 @@
+"""Custom exception classes for job-related errors."""
+
+from http import HTTPStatus
+
+from fastapi import HTTPException
+
+
+class JobNotFound(HTTPException):
+    """Exception raised when a job is not found."""
+
+    def __init__(self) -> None:
+        """Initialize JobNotFound with a default message."""
+        super().__init__(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='Job not found.',
+        )
+
+
+class JobQueueStopped(HTTPException):
+    """Exception raised when a job is submitted to a stopped queue."""
+
+    def __init__(self) -> None:
+        """Initialize JobQueueStopped with a default message."""
+        super().__init__(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='The server is stopping, submit the job again later.',
+        )
@@ -0,0 +1,426 @@
+"""
+The module providing a queue of background jobs.
+
+Jobs run in a thread pool of the worker process that accepted them,
+and their states are stored in the database, so that the progress
+of a job can be polled from any worker. Workers periodically save
+heartbeats of their unfinished jobs, and fail the unfinished jobs
+of other workers whose heartbeats are stale, so that jobs of stopped
+workers are failed on any host, even if a restarted container
+reuses the host name and the process ID of a stopped worker.
+
+"""
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from typing import Any
+
+import sqlalchemy as sql
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from backend.jobs_app.exceptions import JobNotFound, JobQueueStopped
+from backend.jobs_app.models import (
+    UNFINISHED_STATUSES,
+    Job,
+    JobSchema,
+    JobStatus,
+    JobType,
+)
+
+logger = logging.getLogger(__name__)
+INTERNAL_ERROR = 'Internal Server Error'
+INTERRUPTED_ERROR = 'The job is interrupted by the stop of its worker.'
+
+
+class JobQueue:
+    """
+    Queue running long operations as background jobs.
+
+    A job function is called with the keyword argument `progress`,
+    a callback taking the number of processed rows and the completed
+    fraction of the job (or None if it is unknown).
+    The result of the function is stored as JSON.
+
+    Attributes
+    ----------
+    engine : sql.Engine
+        SQLAlchemy database engine storing states of jobs.
+    worker : str
+        Host name, process ID and a random boot ID of the current
+        worker. The boot ID distinguishes processes that get the same
+        host name and process ID after a restart of a container.
+    heartbeat_interval : float
+        Number of seconds between heartbeats of unfinished jobs.
+    heartbeat_timeout : float
+        Number of seconds without heartbeats after which unfinished
+        jobs of other workers are failed.
+    executor : ThreadPoolExecutor
+        Thread pool running the jobs.
+
+    """
+
+    def __init__(
+        self,
+        engine: sql.Engine,
+        max_workers: int,
+        heartbeat_interval: float = 10,
+        heartbeat_timeout: float = 60,
+    ) -> None:
+        """
+        Initialize the JobQueue.
+
+        Parameters
+        ----------
+        engine : sql.Engine
+            SQLAlchemy database engine storing states of jobs.
+        max_workers : int
+            Number of jobs running concurrently.
+        heartbeat_interval : float, optional
+            Number of seconds between heartbeats of unfinished jobs,
+            by default 10.
+        heartbeat_timeout : float, optional
+            Number of seconds without heartbeats after which unfinished
+            jobs of other workers are failed, by default 60.
+
+        """
+        self.engine = engine
+        boot_id = uuid.uuid4().hex[:8]
+        self.worker = f'{socket.gethostname()}:{os.getpid()}:{boot_id}'
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='job',
+        )
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(
+            target=self._beat,
+            name='job-heartbeat',
+            daemon=True,
+        )
+
+    def submit(
+        self,
+        job_type: JobType,
+        function: Callable[..., Any],
+        *args,
+        **kwargs,
+    ) -> JobSchema:
+        """
+        Save a new job and schedule it for execution.
+
+        Parameters
+        ----------
+        job_type : JobType
+            Type of the job.
+        function : Callable
+            Function running the job.
+        *args
+            Positional arguments of the function.
+        **kwargs
+            Keyword arguments of the function.
+
+        Returns
+        -------
+        JobSchema
+            The pending job.
+
+        Raises
+        ------
+        JobQueueStopped
+            If the executor is shut down. The saved job is failed,
+            so that it does not stay pending.
+
+        """
+        job = Job(
+            job_type=job_type.value,
+            status=JobStatus.pending.value,
+            worker=self.worker,
+            created_at=datetime.now(UTC),
+            heartbeat_at=datetime.now(UTC),
+        )
+        with Session(self.engine) as session:
+            session.add(job)
+            session.commit()
+            job_schema = JobSchema.model_validate(job)
+        try:
+            self.executor.submit(
+                self._run,
+                job_schema.id,
+                function,
+                *args,
+                **kwargs,
+            )
+        except RuntimeError as exc:
+            logger.warning('Job %s is not submitted: %s', job_schema.id, exc)
+            self._update(
+                job_id=job_schema.id,
+                status=JobStatus.failed.value,
+                error=INTERRUPTED_ERROR,
+                finished_at=datetime.now(UTC),
+            )
+            raise JobQueueStopped from exc
+        logger.info('Job %s (%s) is submitted.', job_schema.id, job_type.value)
+        return job_schema
+
+    def get_job(self, job_id: uuid.UUID) -> JobSchema:
+        """
+        Return a job by its ID.
+
+        Parameters
+        ----------
+        job_id : uuid.UUID
+            The ID of the job.
+
+        Returns
+        -------
+        JobSchema
+            The job with its current state.
+
+        Raises
+        ------
+        JobNotFound
+            If the job does not exist.
+
+        """
+        with Session(self.engine) as session:
+            job = session.get(Job, job_id)
+            if job is None:
+                raise JobNotFound
+            return JobSchema.model_validate(job)
+
+    def list_jobs(
+        self,
+        limit: int,
+        status: JobStatus | None = None,
+    ) -> list[JobSchema]:
+        """
+        Return the latest jobs.
+
+        Parameters
+        ----------
+        limit : int
+            Maximum number of returned jobs.
+        status : JobStatus, optional
+            Status of returned jobs. By default, jobs of all statuses
+            are returned.
+
+        Returns
+        -------
+        list of JobSchema
+            Jobs sorted from the latest submitted.
+
+        """
+        stmt = sql.select(Job).order_by(Job.created_at.desc()).limit(limit)
+        if status is not None:
+            stmt = stmt.where(Job.status == status.value)
+        with Session(self.engine) as session:
+            return [
+                JobSchema.model_validate(job)
+                for job in session.scalars(stmt)
+            ]
+
+    def start(self) -> int:
+        """
+        Fail stale jobs of other workers and start sending heartbeats.
+
+        Returns
+        -------
+        int
+            Number of failed jobs.
+
+        """
+        failed_jobs_number = self.recover()
+        self._heartbeat.start()
+        return failed_jobs_number
+
+    def recover(self) -> int:
+        """
+        Fail unfinished jobs of other workers whose heartbeats are stale.
+
+        Returns
+        -------
+        int
+            Number of failed jobs.
+
+        """
+        now = datetime.now(UTC)
+        with self.engine.begin() as connection:
+            result = connection.execute(
+                sql.update(Job)
+                .where(
+                    Job.status.in_(
+                        [status.value for status in UNFINISHED_STATUSES],
+                    ),
+                    Job.worker != self.worker,
+                    sql.func.coalesce(Job.heartbeat_at, Job.created_at)
+                    < now - timedelta(seconds=self.heartbeat_timeout),
+                )
+                .values(
+                    status=JobStatus.failed.value,
+                    error=INTERRUPTED_ERROR,
+                    finished_at=now,
+                ),
+            )
+        if result.rowcount:
+            logger.warning(
+                '%d jobs of stopped workers are failed.',
+                result.rowcount,
+            )
+        return result.rowcount
+
+    def shutdown(self) -> None:
+        """Wait for running jobs and fail the pending ones."""
+        self._stopped.set()
+        if self._heartbeat.is_alive():
+            self._heartbeat.join()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        with self.engine.begin() as connection:
+            connection.execute(
+                sql.update(Job)
+                .where(
+                    Job.status == JobStatus.pending.value,
+                    Job.worker == self.worker,
+                )
+                .values(
+                    status=JobStatus.failed.value,
+                    error=INTERRUPTED_ERROR,
+                    finished_at=datetime.now(UTC),
+                ),
+            )
+
+    def _run(
+        self,
+        job_id: uuid.UUID,
+        function: Callable[..., Any],
+        *args,
+        **kwargs,
+    ) -> None:
+        """
+        Run a job and save its result or error.
+
+        Errors of saving the state of the job are logged
+        and fail the job, because exceptions of the executor's threads
+        are otherwise lost.
+
+        Parameters
+        ----------
+        job_id : uuid.UUID
+            The ID of the job.
+        function : Callable
+            Function running the job.
+        *args
+            Positional arguments of the function.
+        **kwargs
+            Keyword arguments of the function.
+
+        """
+        try:
+            self._update(
+                job_id=job_id,
+                status=JobStatus.running.value,
+                started_at=datetime.now(UTC),
+            )
+            job_result = function(
+                *args,
+                progress=partial(self._set_progress, job_id),
+                **kwargs,
+            )
+            self._update(
+                job_id=job_id,
+                status=JobStatus.succeeded.value,
+                progress=1,
+                result=jsonable_encoder(job_result),
+                finished_at=datetime.now(UTC),
+            )
+        except HTTPException as exc:
+            logger.warning('Job %s failed: %s', job_id, exc.detail)
+            error = str(exc.detail)
+        except Exception:
+            logger.exception('Job %s failed.', job_id)
+            error = INTERNAL_ERROR
+        else:
+            logger.info('Job %s succeeded.', job_id)
+            return
+        try:
+            self._update(
+                job_id=job_id,
+                status=JobStatus.failed.value,
+                error=error,
+                finished_at=datetime.now(UTC),
+            )
+        except sql.exc.SQLAlchemyError:
+            logger.exception('Failure of job %s is not saved.', job_id)
+
+    def _set_progress(
+        self,
+        job_id: uuid.UUID,
+        rows_processed: int,
+        progress: float | None,
+    ) -> None:
+        """
+        Save the progress of a running job.
+
+        Parameters
+        ----------
+        job_id : uuid.UUID
+            The ID of the job.
+        rows_processed : int
+            Number of rows processed by the job.
+        progress : float or None
+            Completed fraction of the job, if it is known.
+
+        """
+        self._update(
+            job_id=job_id,
+            rows_processed=rows_processed,
+            progress=progress,
+        )
+
+    def _update(self, job_id: uuid.UUID, **values: Any) -> None:  # noqa: ANN401
+        """
+        Update fields of a job.
+
+        Parameters
+        ----------
+        job_id : uuid.UUID
+            The ID of the job.
+        **values
+            New values of the fields.
+
+        """
+        with self.engine.begin() as connection:
+            connection.execute(
+                sql.update(Job).where(Job.id == job_id).values(**values),
+            )
+
+    def _beat(self) -> None:
+        """Send heartbeats and recover stale jobs until the shutdown."""
+        while not self._stopped.wait(self.heartbeat_interval):
+            try:
+                self._send_heartbeat()
+                self.recover()
+            except sql.exc.SQLAlchemyError:
+                logger.exception('Heartbeat of %s failed.', self.worker)
+
+    def _send_heartbeat(self) -> None:
+        """Save heartbeats of unfinished jobs of the current worker."""
+        with self.engine.begin() as connection:
+            connection.execute(
+                sql.update(Job)
+                .where(
+                    Job.status.in_(
+                        [status.value for status in UNFINISHED_STATUSES],
+                    ),
+                    Job.worker == self.worker,
+                )
+                .values(heartbeat_at=datetime.now(UTC)),
+            )
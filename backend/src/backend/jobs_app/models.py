@@ -0,0 +1,158 @@
+"""The module providing models of background jobs."""
+import uuid
+from datetime import UTC, datetime
+from enum import Enum
+from typing import Any
+
+import sqlalchemy as sql
+from pydantic import BaseModel, computed_field
+
+from backend.entries_app.models import Base
+
+
+class JobType(Enum):
+    """Enumeration for types of background jobs."""
+
+    upload: str = 'upload'
+    report: str = 'report'
+
+
+class JobStatus(Enum):
+    """Enumeration for statuses of background jobs."""
+
+    pending: str = 'pending'
+    running: str = 'running'
+    succeeded: str = 'succeeded'
+    failed: str = 'failed'
+
+
+UNFINISHED_STATUSES = (JobStatus.pending, JobStatus.running)
+
+
+class Job(Base):
+    """
+    SQLAlchemy model representing a background job.
+
+    Attributes
+    ----------
+    id : uuid.UUID
+        Unique identifier for the job.
+    job_type : str
+        Type of the job.
+    status : str
+        Status of the job.
+    worker : str
+        Host name, process ID and boot ID of the worker running the job.
+    progress : float, optional
+        Completed fraction of the job, if it is known.
+    rows_processed : int
+        Number of rows processed by the job.
+    result : dict, optional
+        Result of the succeeded job.
+    error : str, optional
+        Error message of the failed job.
+    created_at : datetime
+        Timestamp of the job submission.
+    started_at : datetime, optional
+        Timestamp of the job start.
+    finished_at : datetime, optional
+        Timestamp of the job finish.
+    heartbeat_at : datetime, optional
+        Timestamp of the last heartbeat of the worker of the job.
+
+    """
+
+    __tablename__ = 'jobs'
+    id = sql.Column(sql.Uuid, primary_key=True, default=uuid.uuid4)
+    job_type = sql.Column(sql.String, nullable=False)
+    status = sql.Column(sql.String, nullable=False, index=True)
+    worker = sql.Column(sql.String, nullable=False)
+    progress = sql.Column(sql.Float)
+    rows_processed = sql.Column(
+        sql.BigInteger,
+        nullable=False,
+        server_default='0',
+    )
+    result = sql.Column(sql.JSON)
+    error = sql.Column(sql.String)
+    created_at = sql.Column(sql.DateTime(timezone=True), nullable=False)
+    started_at = sql.Column(sql.DateTime(timezone=True))
+    finished_at = sql.Column(sql.DateTime(timezone=True))
+    heartbeat_at = sql.Column(sql.DateTime(timezone=True))
+
+    __table_args__ = (
+        sql.Index('ix_jobs_created_at', 'created_at'),
+    )
+
+
+class JobSchema(BaseModel):
+    """
+    Pydantic schema for a background job.
+
+    Attributes
+    ----------
+    id : uuid.UUID
+        Unique identifier for the job.
+    job_type : JobType
+        Type of the job.
+    status : JobStatus
+        Status of the job.
+    progress : float, optional
+        Completed fraction of the job, if it is known.
+    rows_processed : int
+        Number of rows processed by the job.
+    result : Any, optional
+        Result of the succeeded job.
+    error : str, optional
+        Error message of the failed job.
+    created_at : datetime
+        Timestamp of the job submission.
+    started_at : datetime, optional
+        Timestamp of the job start.
+    finished_at : datetime, optional
+        Timestamp of the job finish.
+
+    """
+
+    id: uuid.UUID
+    job_type: JobType
+    status: JobStatus
+    progress: float | None = None
+    rows_processed: int = 0
+    result: Any = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        """
+        Configuration for the Pydantic model.
+
+        Attributes
+        ----------
+        from_attributes : bool, optional
+            Enables model initialization from ORM objects.
+
+        """
+
+        from_attributes = True
+
+    @computed_field
+    @property
+    def duration(self) -> float | None:
+        """
+        Return the number of seconds the job has been running.
+
+        Returns
+        -------
+        float or None
+            Seconds from the start to the finish of the job,
+            or to the current time if it is running.
+            None if the job has not started.
+
+        """
+        if self.started_at is None:
+            return None
+        finished_at = self.finished_at or datetime.now(UTC)
+        return (finished_at - self.started_at).total_seconds()
@@ -0,0 +1,35 @@
+"""The module providing Pydantic settings for background jobs."""
+from pathlib import Path
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class JobsSettings(BaseSettings):
+    """
+    Pydantic settings model for background jobs.
+
+    Attributes
+    ----------
+    jobs_max_workers : int
+        Number of jobs running concurrently in each worker process
+        (default: 2). The other submitted jobs wait in the queue.
+    jobs_heartbeat_interval : float
+        Number of seconds between heartbeats of unfinished jobs
+        of a worker process (default: 10).
+    jobs_heartbeat_timeout : float
+        Number of seconds without heartbeats after which unfinished
+        jobs are failed by other workers (default: 60).
+    model_config : SettingsConfigDict
+        Configuration for loading settings from an environment file.
+        The file is expected to be located at 'src/backend/jobs_app/.env'.
+
+    """
+
+    jobs_max_workers: int = 2
+    jobs_heartbeat_interval: float = 10
+    jobs_heartbeat_timeout: float = 60
+
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).parent.joinpath('.env'),
+        env_file_encoding='utf-8',
+    )
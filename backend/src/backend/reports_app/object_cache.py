@@ -0,0 +1,257 @@
+"""
+Module providing an in-memory cache of objects loaded from S3.
+
+The cache is bounded by the number of objects and evicts the least
+recently used ones. Cached objects are served without requests to S3
+for a configured time, after which they are revalidated with
+conditional requests using their ETags. If the ETag of the current
+version of an object is already known, the cached object is served
+only if it has this ETag, regardless of its age.
+
+Objects downloaded before an invalidation are not stored, so that
+a load racing a save does not put the replaced object back.
+
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple
+
+from backend.reports_app.settings import S3Settings
+
+CacheKey = tuple[str, str]
+
+
+class CachedObject(NamedTuple):
+    """
+    Object stored in the cache.
+
+    Attributes
+    ----------
+    data : object
+        The loaded object.
+    etag : str
+        The entity tag of the object in S3.
+    last_modified : datetime or None
+        The last modification time of the object in S3.
+    validated_at : float
+        Monotonic time of the last validation against S3.
+
+    """
+
+    data: object
+    etag: str
+    last_modified: datetime | None
+    validated_at: float
+
+
+class ObjectCache:
+    """
+    Thread-safe LRU cache of S3 objects with time-based revalidation.
+
+    Attributes
+    ----------
+    max_size : int
+        Maximum number of cached objects. Zero disables caching.
+    ttl : float
+        Number of seconds a cached object is served without revalidation.
+    hits : int
+        Number of loads served from the cache without requests to S3.
+    misses : int
+        Number of loads downloading the object from S3.
+    revalidations : int
+        Number of loads served from the cache after S3 confirmed
+        that the object is not modified.
+    generation : int
+        Number of invalidations of the cache. Downloads started
+        in an earlier generation are not stored.
+
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """
+        Initialize the ObjectCache.
+
+        Parameters
+        ----------
+        max_size : int
+            Maximum number of cached objects. Zero disables caching.
+        ttl : float
+            Number of seconds a cached object is served
+            without revalidation.
+
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.generation = 0
+        self._objects: OrderedDict[CacheKey, CachedObject] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: CacheKey,
+        etag: str | None = None,
+    ) -> tuple[CachedObject | None, bool]:
+        """
+        Return a cached object and whether it can be served as is.
+
+        A fresh object is counted as a cache hit.
+
+        Parameters
+        ----------
+        key : tuple of str
+            The bucket and the path of the object.
+        etag : str, optional
+            The entity tag of the current version of the object.
+            If specified, the object is fresh only if it has this tag.
+            Otherwise, it is fresh until its time to live expires.
+
+        Returns
+        -------
+        tuple
+            The cached object or None, and True if the object
+            does not need revalidation.
+
+        """
+        with self._lock:
+            cached = self._objects.get(key)
+            if cached is None:
+                return None, False
+            self._objects.move_to_end(key)
+            if etag is not None:
+                is_fresh = cached.etag == etag
+            else:
+                is_fresh = time.monotonic() - cached.validated_at < self.ttl
+            if is_fresh:
+                self.hits += 1
+            return cached, is_fresh
+
+    def put(
+        self,
+        key: CacheKey,
+        data: object,
+        etag: str,
+        last_modified: datetime | None = None,
+        generation: int | None = None,
+    ) -> None:
+        """
+        Store an object downloaded from S3, counting a cache miss.
+
+        Parameters
+        ----------
+        key : tuple of str
+            The bucket and the path of the object.
+        data : object
+            The loaded object.
+        etag : str
+            The entity tag of the object in S3.
+        last_modified : datetime, optional
+            The last modification time of the object in S3.
+        generation : int, optional
+            The generation of the cache when the download started.
+            If the cache has been invalidated since then,
+            the object is not stored.
+
+        """
+        with self._lock:
+            self.misses += 1
+            if self.max_size <= 0:
+                return
+            if generation is not None and generation != self.generation:
+                return
+            self._objects[key] = CachedObject(
+                data=data,
+                etag=etag,
+                last_modified=last_modified,
+                validated_at=time.monotonic(),
+            )
+            self._objects.move_to_end(key)
+            while len(self._objects) > self.max_size:
+                self._objects.popitem(last=False)
+
+    def revalidate(self, key: CacheKey, etag: str) -> None:
+        """
+        Mark a cached object as confirmed by S3 to be not modified.
+
+        Parameters
+        ----------
+        key : tuple of str
+            The bucket and the path of the object.
+        etag : str
+            The entity tag confirmed by S3. The object is not marked
+            if it has been replaced by another version.
+
+        """
+        with self._lock:
+            self.revalidations += 1
+            cached = self._objects.get(key)
+            if cached is not None and cached.etag == etag:
+                self._objects[key] = cached._replace(
+                    validated_at=time.monotonic(),
+                )
+
+    def invalidate(self, key: CacheKey) -> None:
+        """
+        Remove an object from the cache.
+
+        Parameters
+        ----------
+        key : tuple of str
+            The bucket and the path of the object.
+
+        """
+        with self._lock:
+            self._objects.pop(key, None)
+            self.generation += 1
+
+    def clear(self) -> None:
+        """Remove all objects from the cache and reset counters."""
+        with self._lock:
+            self._objects.clear()
+            self.generation += 1
+            self.hits = 0
+            self.misses = 0
+            self.revalidations = 0
+
+    def get_stats(self) -> dict[str, int | float]:
+        """
+        Return the cache size, its limits and counters.
+
+        Returns
+        -------
+        dict
+            Cache statistics.
+
+        """
+        with self._lock:
+            return {
+                'size': len(self._objects),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+            }
+
+
+@functools.cache
+def get_shared_cache() -> ObjectCache:
+    """
+    Return the object cache shared by all S3 clients of the process.
+
+    Returns
+    -------
+    ObjectCache
+        The cache configured with S3 settings.
+
+    """
+    s3config = S3Settings()
+    return ObjectCache(
+        max_size=s3config.s3_cache_size,
+        ttl=s3config.s3_cache_ttl,
+    )
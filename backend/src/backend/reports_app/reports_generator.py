@@ -4,7 +4,9 @@ from enum import Enum
 import pandas as pd
 import sqlalchemy as sql
 
-from backend.entries_app.models import BudgetEntry
+from backend.entries_app.dimensions import DimensionCache
+from backend.entries_app.models import BudgetEntry, MonthlyCategoryRollup
+from backend.entries_app.summary import get_data_version
 
 ReportType = dict[
     str,
@@ -31,8 +33,38 @@ class Column(Enum):
     amount: str = 'amount'
 
 
+# The type of amounts is specified, so that it is the same
+# for empty results, which have no values to infer it from.
+AMOUNT_DTYPE = {Column.amount.value: 'float64'}
+
+
+class AggregationBackend(Enum):
+    """Enumeration for backends aggregating financial data."""
+
+    rollup: str = 'rollup'
+    sql: str = 'sql'
+    pandas: str = 'pandas'
+
+
 class ReportsGenerator:
-    """Class for generating financial reports based on budget entries."""
+    """
+    Class for generating financial reports based on budget entries.
+
+    Expenses are grouped by IDs of categories, which are replaced
+    with their names once the data are aggregated.
+
+    Attributes
+    ----------
+    report_names : tuple of str
+        Names of methods generating reports.
+    engine : sql.Engine
+        SQLAlchemy database engine for executing queries.
+    dimensions : DimensionCache
+        Cache of names of categories.
+
+    """
+
+    report_names = ('expenses_per_category', 'expenses_per_interval')
 
     def __init__(
         self,
@@ -48,11 +80,24 @@ class ReportsGenerator:
 
         """
         self.engine = engine
+        self.dimensions = DimensionCache(engine=engine)
 
-    def expenses_per_category(self) -> ReportsType:
+    def expenses_per_category(
+        self,
+        backend: AggregationBackend = AggregationBackend.rollup,
+        grouped_df: pd.DataFrame | None = None,
+    ) -> ReportsType:
         """
         Generate expense reports categorized by time intervals.
 
+        Parameters
+        ----------
+        backend : AggregationBackend, optional
+            Backend aggregating financial data, by default rollup.
+        grouped_df : pd.DataFrame, optional
+            Data returned by `fetch_grouped_data`, by default None.
+            If specified, the data are not fetched again.
+
         Returns
         -------
         ReportsType
@@ -60,7 +105,8 @@ class ReportsGenerator:
             per category.
 
         """
-        grouped_df = self._fetch_data(query=sql.select(BudgetEntry))
+        if grouped_df is None:
+            grouped_df = self.fetch_grouped_data(backend=backend)
         reports = {}
         for field in TimeInterval:
             if field == TimeInterval.total:
@@ -88,10 +134,22 @@ class ReportsGenerator:
                 }
         return reports
 
-    def expenses_per_interval(self) -> ReportsType:
+    def expenses_per_interval(
+        self,
+        backend: AggregationBackend = AggregationBackend.rollup,
+        grouped_df: pd.DataFrame | None = None,
+    ) -> ReportsType:
         """
         Generate expense reports grouped by category and time intervals.
 
+        Parameters
+        ----------
+        backend : AggregationBackend, optional
+            Backend aggregating financial data, by default rollup.
+        grouped_df : pd.DataFrame, optional
+            Data returned by `fetch_grouped_data`, by default None.
+            If specified, the data are not fetched again.
+
         Returns
         -------
         ReportsType
@@ -99,7 +157,8 @@ class ReportsGenerator:
             per category.
 
         """
-        grouped_df = self._fetch_data(query=sql.select(BudgetEntry))
+        if grouped_df is None:
+            grouped_df = self.fetch_grouped_data(backend=backend)
         reports = {}
         for category, group in grouped_df.groupby(Column.category.value):
             reports[str(category)] = {}
@@ -122,6 +181,140 @@ class ReportsGenerator:
                     )
         return reports
 
+    def get_data_version(self) -> int | None:
+        """
+        Return the version of financial data used in reports.
+
+        Returns
+        -------
+        int or None
+            The counter of changes of budget entries, or None
+            if it is not maintained by the database.
+
+        """
+        with self.engine.connect() as connection:
+            return get_data_version(connection=connection)
+
+    def fetch_grouped_data(
+        self,
+        backend: AggregationBackend,
+    ) -> pd.DataFrame:
+        """
+        Fetch financial data aggregated by the specified backend.
+
+        Parameters
+        ----------
+        backend : AggregationBackend
+            Backend aggregating financial data.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing expenses per category
+            with year and month columns.
+
+        """
+        if backend == AggregationBackend.pandas:
+            return self._fetch_data(
+                query=sql.select(
+                    BudgetEntry.date.label(Column.date.value),
+                    BudgetEntry.category_id.label(Column.category.value),
+                    BudgetEntry.amount.label(Column.amount.value),
+                ),
+            )
+        if backend == AggregationBackend.sql:
+            return self._fetch_aggregated_data()
+        return self._fetch_rollup_data()
+
+    def _fetch_rollup_data(self) -> pd.DataFrame:
+        """
+        Fetch monthly expenses per category from the rollup table.
+
+        The rollup table is maintained incrementally by the database,
+        so the cost of the query depends on the number of months
+        and categories rather than on the number of budget entries.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing expenses per month and category
+            with year and month columns.
+
+        """
+        expenses = sql.func.sum(MonthlyCategoryRollup.expenses_sum)
+        query = (
+            sql.select(
+                MonthlyCategoryRollup.month.label(Column.date.value),
+                MonthlyCategoryRollup.category_id.label(Column.category.value),
+                expenses.label(Column.amount.value),
+            )
+            .group_by(
+                MonthlyCategoryRollup.month,
+                MonthlyCategoryRollup.category_id,
+            )
+        )
+        return self._read_monthly_data(query=query)
+
+    def _fetch_aggregated_data(self) -> pd.DataFrame:
+        """
+        Fetch monthly expenses per category aggregated in the database.
+
+        Only aggregated rows are transferred from the database,
+        instead of all budget entries.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing expenses per month and category
+            with year and month columns.
+
+        """
+        month_start = sql.func.date_trunc('month', BudgetEntry.date)
+        expenses = sql.func.sum(BudgetEntry.amount).filter(
+            BudgetEntry.amount > 0,
+        )
+        query = (
+            sql.select(
+                month_start.label(Column.date.value),
+                BudgetEntry.category_id.label(Column.category.value),
+                expenses.label(Column.amount.value),
+            )
+            .group_by(month_start, BudgetEntry.category_id)
+            .having(expenses.is_not(None))
+        )
+        return self._read_monthly_data(query=query)
+
+    def _read_monthly_data(self, query: sql.Select) -> pd.DataFrame:
+        """
+        Read monthly expenses per category and add time columns.
+
+        Parameters
+        ----------
+        query : sql.Select
+            SQLAlchemy query returning date, category ID and amount
+            columns, where date is the first day of the month.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing expenses per month and category
+            with year and month columns.
+
+        """
+        with self.engine.connect() as connection:
+            expenses_df = pd.read_sql(
+                query,
+                connection,
+                parse_dates=[Column.date.value],
+                dtype=AMOUNT_DTYPE,
+            )
+        return self._decode_categories(
+            df=expenses_df.assign(
+                year=expenses_df[Column.date.value].dt.year.astype(str),
+                month=expenses_df[Column.date.value].dt.strftime('%Y-%m'),
+            ),
+        )
+
     def _fetch_data(self, query: sql.Select) -> pd.DataFrame:
         """
         Fetch financial data from the database.
@@ -129,7 +322,8 @@ class ReportsGenerator:
         Parameters
         ----------
         query : sql.Select
-            SQLAlchemy query to fetch budget entries.
+            SQLAlchemy query returning date, category ID and amount
+            columns of budget entries.
 
         Returns
         -------
@@ -141,17 +335,49 @@ class ReportsGenerator:
         with self.engine.connect() as connection:
             amount_column = Column.amount.value
             expenses = (
-                pd.read_sql(query, connection)
+                pd.read_sql(
+                    query,
+                    connection,
+                    parse_dates=[Column.date.value],
+                    dtype=AMOUNT_DTYPE,
+                )
                 .query(f'{amount_column} > 0')
             )
             columns = [col.name for col in Column if col.name != 'amount']
-            return (
-                expenses
-                .assign(
-                    year=expenses[Column.date.value].dt.year.astype(str),
-                    month=expenses[Column.date.value].dt.strftime('%Y-%m'),
-                )
-                .groupby(columns)
-                .sum(numeric_only=True)
-                .reset_index()
+            return self._decode_categories(
+                df=(
+                    expenses
+                    .assign(
+                        year=expenses[Column.date.value].dt.year.astype(str),
+                        month=expenses[Column.date.value].dt.strftime(
+                            '%Y-%m',
+                        ),
+                    )
+                    .groupby(columns)
+                    .sum(numeric_only=True)
+                    .reset_index()
+                ),
             )
+
+    def _decode_categories(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Replace IDs of categories with their names.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            A DataFrame containing IDs of categories
+            in the category column.
+
+        Returns
+        -------
+        pd.DataFrame
+            The DataFrame containing names of categories.
+
+        """
+        category_column = Column.category.value
+        names = self.dimensions.get_names(
+            dimension=category_column,
+            ids=df[category_column].dropna().unique().tolist(),
+        )
+        return df.assign(**{category_column: df[category_column].map(names)})
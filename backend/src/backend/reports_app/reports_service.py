@@ -5,12 +5,23 @@ This module provides a service class to generate and retrieve reports using
 SQLAlchemy for data retrieval and S3 for storage.
 
 """
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
 import sqlalchemy as sql
 
 from backend.reports_app.exceptions import InvalidReportType, ReportNotFound
-from backend.reports_app.reports_generator import ReportsGenerator, ReportsType
+from backend.reports_app.reports_generator import (
+    AggregationBackend,
+    ReportsGenerator,
+    ReportsType,
+)
 from backend.reports_app.s3client import S3Client
 
+logger = logging.getLogger(__name__)
+DATA_VERSION_KEY = 'data-version'
+
 
 class ReportsService:
     """
@@ -28,6 +39,7 @@ class ReportsService:
     def __init__(
         self,
         engine: sql.Engine,
+        s3client: S3Client | None = None,
     ) -> None:
         """
         Initialize ReportsService.
@@ -36,19 +48,41 @@ class ReportsService:
         ----------
         engine : sql.Engine
             SQLAlchemy database engine for executing queries.
+        s3client : S3Client, optional
+            Interface for interacting with S3 storage.
+            By default, a new client is created.
 
         """
         self.reports_generator = ReportsGenerator(engine)
-        self.s3client = S3Client()
+        self.s3client = s3client if s3client is not None else S3Client()
 
-    def generate_report(self, report_name: str) -> ReportsType:
+    def generate_report(
+        self,
+        report_name: str,
+        backend: AggregationBackend = AggregationBackend.rollup,
+        *,
+        force: bool = False,
+        progress: Callable[[int, float | None], None] | None = None,
+    ) -> ReportsType:
         """
         Generate a report and store it in S3.
 
+        If the stored report is built from the current version
+        of financial data, it is returned without regeneration.
+
         Parameters
         ----------
         report_name : str
             The name of the report to generate.
+        backend : AggregationBackend, optional
+            Backend aggregating financial data, by default rollup.
+        force : bool, optional
+            Whether to regenerate the report even if the stored one
+            is up to date, by default False.
+        progress : Callable, optional
+            Callback called after the report is generated with
+            the number of rows of aggregated data and the completed
+            fraction of generation.
 
         Returns
         -------
@@ -61,20 +95,91 @@ class ReportsService:
             If the requested report type is not found in ReportsGenerator.
 
         """
-        report_method = getattr(
-            self.reports_generator,
-            report_name,
-            None,
+        reports = self.generate_reports(
+            report_names=[report_name],
+            backend=backend,
+            force=force,
+            progress=progress,
         )
-        if report_method is None:
-            raise InvalidReportType
+        return reports[report_name]
 
-        report = report_method()
-        self.s3client.save_object(
-            remote_path=f'reports/{report_name}.json',
-            json_data=report,
-        )
-        return report
+    def generate_reports(
+        self,
+        report_names: list[str],
+        backend: AggregationBackend = AggregationBackend.rollup,
+        *,
+        force: bool = False,
+        progress: Callable[[int, float | None], None] | None = None,
+    ) -> dict[str, ReportsType]:
+        """
+        Generate several reports from one data fetch and store them in S3.
+
+        Stored reports built from the current version of financial data
+        are returned without regeneration. For the other reports,
+        financial data are fetched and aggregated once,
+        and the reports are saved to S3 concurrently.
+
+        Parameters
+        ----------
+        report_names : list of str
+            The names of the reports to generate.
+        backend : AggregationBackend, optional
+            Backend aggregating financial data, by default rollup.
+        force : bool, optional
+            Whether to regenerate the reports even if the stored ones
+            are up to date, by default False.
+        progress : Callable, optional
+            Callback called after each report is generated with
+            the number of rows of aggregated data and the completed
+            fraction of generation.
+
+        Returns
+        -------
+        dict
+            The generated reports data by their names.
+
+        Raises
+        ------
+        InvalidReportType
+            If any requested report type is not found in ReportsGenerator.
+
+        """
+        report_methods = {
+            report_name: self.get_report_method(report_name=report_name)
+            for report_name in report_names
+        }
+        data_version = self.reports_generator.get_data_version()
+        reports = {}
+        if not force:
+            reports = self._load_actual_reports(
+                report_names=list(report_methods),
+                data_version=data_version,
+            )
+        outdated_methods = {
+            report_name: report_method
+            for report_name, report_method in report_methods.items()
+            if report_name not in reports
+        }
+        if outdated_methods:
+            grouped_df = self.reports_generator.fetch_grouped_data(
+                backend=backend,
+            )
+            generated_reports = {}
+            for report_name, report_method in outdated_methods.items():
+                generated_reports[report_name] = report_method(
+                    grouped_df=grouped_df,
+                )
+                if progress is not None:
+                    progress(
+                        grouped_df.shape[0],
+                        len(generated_reports) / len(outdated_methods),
+                    )
+            self._save_reports(
+                reports=generated_reports,
+                data_version=data_version,
+            )
+            reports.update(generated_reports)
+        return reports
 
     def get_latest_report(self, report_name: str) -> ReportsType:
         """
@@ -97,8 +202,149 @@ class ReportsService:
 
         """
         report = self.s3client.load_object(
-            remote_path=f'reports/{report_name}.json',
+            remote_path=self._get_remote_path(report_name=report_name),
         )
         if report:
             return report
         raise ReportNotFound
+
+    def get_cache_stats(self) -> dict[str, int | float]:
+        """
+        Return statistics of the cache of reports loaded from S3.
+
+        Returns
+        -------
+        dict
+            The cache size, its limits, and numbers of hits,
+            misses and revalidations.
+
+        """
+        return self.s3client.cache.get_stats()
+
+    def _load_actual_reports(
+        self,
+        report_names: list[str],
+        data_version: int | None,
+    ) -> dict[str, ReportsType]:
+        """
+        Load stored reports built from the specified data version.
+
+        Versions of reports are checked with HEAD requests, and cached
+        reports are served only if they have the ETags of these
+        versions, so that reports replaced by other workers
+        are not served from the cache.
+
+        Parameters
+        ----------
+        report_names : list of str
+            The names of the reports to load.
+        data_version : int or None
+            The current version of financial data. If None,
+            no reports are considered up to date.
+
+        Returns
+        -------
+        dict
+            The up-to-date reports data by their names.
+
+        """
+        reports = {}
+        if data_version is None:
+            return reports
+        for report_name in report_names:
+            remote_path = self._get_remote_path(report_name=report_name)
+            head = self.s3client.get_head(remote_path=remote_path)
+            if (
+                head is None
+                or head.metadata.get(DATA_VERSION_KEY) != str(data_version)
+            ):
+                continue
+            report = self.s3client.load_object(
+                remote_path=remote_path,
+                etag=head.etag,
+            )
+            if report:
+                logger.info(
+                    'Report "%s" is up to date (data version %d).',
+                    report_name,
+                    data_version,
+                )
+                reports[report_name] = report
+        return reports
+
+    def _save_reports(
+        self,
+        reports: dict[str, ReportsType],
+        data_version: int | None,
+    ) -> None:
+        """
+        Save reports to S3 concurrently.
+
+        Parameters
+        ----------
+        reports : dict
+            The reports data by their names.
+        data_version : int or None
+            The version of financial data the reports are built from.
+
+        """
+        metadata = {}
+        if data_version is not None:
+            metadata[DATA_VERSION_KEY] = str(data_version)
+        with ThreadPoolExecutor(max_workers=len(reports)) as executor:
+            futures = [
+                executor.submit(
+                    self.s3client.save_object,
+                    remote_path=self._get_remote_path(report_name=name),
+                    json_data=report,
+                    metadata=metadata,
+                )
+                for name, report in reports.items()
+            ]
+            for future in futures:
+                future.result()
+
+    def get_report_method(
+        self,
+        report_name: str,
+    ) -> Callable[..., ReportsType]:
+        """
+        Return the method of ReportsGenerator generating a report.
+
+        Parameters
+        ----------
+        report_name : str
+            The name of the report.
+
+        Returns
+        -------
+        Callable
+            The bound method generating the report.
+
+        Raises
+        ------
+        InvalidReportType
+            If the requested report type is not found in ReportsGenerator.
+
+        """
+        if report_name not in self.reports_generator.report_names:
+            raise InvalidReportType
+        return getattr(self.reports_generator, report_name)
+
+    @classmethod
+    def _get_remote_path(cls, report_name: str) -> str:
+        """
+        Return the S3 path of a report.
+
+        Parameters
+        ----------
+        report_name : str
+            The name of the report.
+
+        Returns
+        -------
+        str
+            The relative path of the report in S3.
+
+        """
+        return f'reports/{report_name}.json'
@@ -2,17 +2,22 @@
 Module providing an interface for interacting with S3 storage.
 
 This module defines a client class for handling S3 operations such as listing,
-saving, loading, and deleting objects.
+saving, loading, and deleting objects. Loaded objects are cached in memory
+and revalidated with conditional requests.
 
 """
 import json
 import logging
+from http import HTTPStatus
 from pathlib import Path
+from typing import NamedTuple
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 from dotenv import load_dotenv
 
+from backend.reports_app.object_cache import ObjectCache, get_shared_cache
 from backend.reports_app.reports_generator import ReportType
 from backend.reports_app.settings import S3Settings
 
@@ -20,17 +25,60 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 
+class ObjectHead(NamedTuple):
+    """
+    Version and metadata of an S3 object.
+
+    Attributes
+    ----------
+    etag : str
+        The entity tag of the object.
+    metadata : dict
+        User-defined metadata of the object.
+
+    """
+
+    etag: str
+    metadata: dict[str, str]
+
+
 class S3Client:
-    """Interface for interacting with S3 storage."""
+    """
+    Interface for interacting with S3 storage.
+
+    The underlying boto3 client is thread-safe, so one instance
+    can be shared by concurrent requests.
+
+    """
+
+    def __init__(
+        self,
+        cache: ObjectCache | None = None,
+        s3config: S3Settings | None = None,
+    ) -> None:
+        """
+        Initialize the S3 client with configuration settings.
+
+        Parameters
+        ----------
+        cache : ObjectCache, optional
+            Cache of loaded objects. By default, the cache shared
+            by all clients of the process is used.
+        s3config : S3Settings, optional
+            Settings of S3 storage. By default, they are read
+            from the environment.
 
-    def __init__(self) -> None:
-        """Initialize the S3 client with configuration settings."""
-        self.s3config = S3Settings()
+        """
+        self.s3config = s3config if s3config is not None else S3Settings()
+        self.cache = cache if cache is not None else get_shared_cache()
         self.bucket = self.s3config.s3_bucket
         self.s3 = boto3.client(
             's3',
             aws_access_key_id=self.s3config.s3_access_key_id,
             aws_secret_access_key=self.s3config.s3_secret_access_key,
+            config=Config(
+                max_pool_connections=self.s3config.s3_max_pool_connections,
+            ),
         )
 
     def get_s3path(self, remote_path: str) -> str:
@@ -84,6 +132,7 @@ class S3Client:
         self,
         json_data: ReportType,
         remote_path: str,
+        metadata: dict[str, str] | None = None,
     ) -> None:
         """
         Save a JSON object to S3.
@@ -94,6 +143,8 @@ class S3Client:
             The data to store in S3.
         remote_path : str
             The target S3 path.
+        metadata : dict, optional
+            User-defined metadata stored with the object.
 
         """
         try:
@@ -102,44 +153,115 @@ class S3Client:
                 Key=remote_path,
                 Body=json.dumps(json_data),
                 ContentType='application/json',
+                Metadata=metadata or {},
             )
         except (NoCredentialsError, ClientError) as exc:
             logger.error('Error saving JSON: %s', str(exc))
+        finally:
+            self.cache.invalidate(key=(self.bucket, remote_path))
         logger.info(
             'Data are saved into "%s"',
             self.get_s3path(remote_path=remote_path),
         )
 
-    def load_object(self, remote_path: str) -> ReportType:
+    def get_head(self, remote_path: str) -> ObjectHead | None:
+        """
+        Return the ETag and metadata of an object without loading it.
+
+        Parameters
+        ----------
+        remote_path : str
+            The S3 path of the object.
+
+        Returns
+        -------
+        ObjectHead or None
+            The ETag and user-defined metadata of the object,
+            or None if the object is not found.
+
+        """
+        try:
+            response = self.s3.head_object(
+                Bucket=self.bucket,
+                Key=remote_path,
+            )
+        except (NoCredentialsError, ClientError) as exc:
+            logger.warning('Error getting metadata: %s', str(exc))
+            return None
+        return ObjectHead(
+            etag=response.get('ETag', ''),
+            metadata=response.get('Metadata', {}),
+        )
+
+    def load_object(
+        self,
+        remote_path: str,
+        etag: str | None = None,
+    ) -> ReportType:
         """
         Load a JSON object from S3.
 
+        A cached object is returned without requests to S3 until
+        its time to live expires. Then it is revalidated
+        with a conditional request and downloaded only if modified.
+
         Parameters
         ----------
         remote_path : str
             The S3 path to retrieve.
+        etag : str, optional
+            The ETag of the expected version of the object, for example,
+            returned by `get_head`. If specified, a cached object
+            is returned without requests to S3 only if it has this ETag,
+            regardless of its age.
 
         Returns
         -------
         ReportType
-            The retrieved JSON data.
+            The retrieved JSON data. It is shared with the cache
+            and must not be modified.
 
         """
+        key = (self.bucket, remote_path)
+        cached, is_fresh = self.cache.get(key=key, etag=etag)
+        if is_fresh:
+            return cached.data
+        generation = self.cache.generation
+        conditions = {}
+        if cached is not None and cached.etag:
+            conditions['IfNoneMatch'] = cached.etag
+        elif cached is not None and cached.last_modified is not None:
+            conditions['IfModifiedSince'] = cached.last_modified
         try:
             response = self.s3.get_object(
                 Bucket=self.bucket,
                 Key=remote_path,
+                **conditions,
             )
         except self.s3.exceptions.NoSuchKey:
+            self.cache.invalidate(key=key)
             logger.warning(
                 '"%s" is not found',
                 self.get_s3path(remote_path=remote_path),
             )
             return {}
-        except (NoCredentialsError, ClientError) as exc:
+        except ClientError as exc:
+            if cached is not None and self._is_not_modified(exc=exc):
+                self.cache.revalidate(key=key, etag=cached.etag)
+                return cached.data
+            logger.error('Error loading JSON: %s', str(exc))
+            return {}
+        except NoCredentialsError as exc:
             logger.error('Error loading JSON: %s', str(exc))
             return {}
         json_data = json.loads(response['Body'].read().decode('utf-8'))
+        self.cache.put(
+            key=key,
+            data=json_data,
+            etag=response.get('ETag', ''),
+            last_modified=response.get('LastModified'),
+            generation=generation,
+        )
         logger.info(
             'Data are loaded from "%s"',
             self.get_s3path(remote_path=remote_path),
@@ -163,7 +285,30 @@ class S3Client:
             )
         except (NoCredentialsError, ClientError) as exc:
             logger.error('Error removing object: %s', str(exc))
+        finally:
+            self.cache.invalidate(key=(self.bucket, remote_path))
         logger.info(
             'Data are removed from "%s"',
             self.get_s3path(remote_path=remote_path),
         )
+
+    @classmethod
+    def _is_not_modified(cls, exc: ClientError) -> bool:
+        """
+        Check whether a conditional request found the object not modified.
+
+        Parameters
+        ----------
+        exc : ClientError
+            The error raised by a conditional request.
+
+        Returns
+        -------
+        bool
+            True if S3 responded with status 304.
+
+        """
+        status_code = exc.response.get('ResponseMetadata', {}).get(
+            'HTTPStatusCode',
+        )
+        return status_code == HTTPStatus.NOT_MODIFIED
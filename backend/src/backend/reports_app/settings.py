@@ -18,6 +18,15 @@ class S3Settings(BaseSettings):
         The access key ID for S3 authentication.
     s3_secret_access_key : str
         The secret access key for S3 authentication.
+    s3_max_pool_connections : int
+        Maximum number of connections kept in the pool of the S3 client.
+        It should not be less than the number of concurrent requests.
+    s3_cache_size : int
+        Maximum number of S3 objects cached in memory.
+        Zero disables caching.
+    s3_cache_ttl : float
+        Number of seconds a cached object is served without
+        revalidation against S3.
     model_config : SettingsConfigDict
         Configuration for loading settings from an environment file.
         The file is expected to be located at 'src/backend/reports_app/.env'.
@@ -28,6 +37,9 @@ class S3Settings(BaseSettings):
     s3_bucket: str = ''
     s3_access_key_id: str = ''
     s3_secret_access_key: str = ''
+    s3_max_pool_connections: int = 50
+    s3_cache_size: int = 128
+    s3_cache_ttl: float = 5.0
 
     model_config = SettingsConfigDict(
         env_file=Path(__file__).parent.joinpath('.env'),
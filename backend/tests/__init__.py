@@ -0,0 +1 @@
+"""The package provides tests for the budget analytics backend."""
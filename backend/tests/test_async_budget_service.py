@@ -0,0 +1,78 @@
+"""Tests for `entries_app.async_budget_service` objects."""
+import threading
+from collections.abc import Iterator
+
+import anyio
+
+from backend.entries_app.async_budget_service import AsyncBudgetService
+from backend.entries_app.models import BudgetEntriesExport
+
+CHUNKS = (b'a', b'b', b'c')
+
+
+class ExportingService:
+    """
+    Synchronous service recording the thread closing its export.
+
+    The generator of the export is kept, so that it is not closed
+    when it is garbage collected.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize the ExportingService."""
+        self.chunks: Iterator[bytes] | None = None
+        self.closing_thread: threading.Thread | None = None
+
+    def export_entries(self, query: BudgetEntriesExport) -> Iterator[bytes]:
+        """Return a generator of chunks of an export."""
+        assert query
+        self.chunks = self._generate()
+        return self.chunks
+
+    def _generate(self) -> Iterator[bytes]:
+        """Yield chunks and record the thread closing the generator."""
+        try:
+            yield from CHUNKS
+        finally:
+            self.closing_thread = threading.current_thread()
+
+
+def is_closed_in_threadpool(service: AsyncBudgetService) -> bool:
+    """Return whether the export was closed by a worker thread."""
+    closing_thread = service.budget_service.closing_thread
+    return closing_thread not in {None, threading.main_thread()}
+
+
+class TestExportEntries:
+    """Tests for `AsyncBudgetService.export_entries`."""
+
+    @classmethod
+    def test_all_chunks_are_yielded(cls) -> None:
+        """Test that the whole export is yielded."""
+        service = AsyncBudgetService(budget_service=ExportingService())
+
+        async def export() -> list[bytes]:
+            return [
+                chunk
+                async for chunk in service.export_entries(
+                    query=BudgetEntriesExport(),
+                )
+            ]
+
+        assert anyio.run(export) == list(CHUNKS)
+
+    @classmethod
+    def test_cancelled_export_is_closed(cls) -> None:
+        """Test that the export is closed when its reader is cancelled."""
+        service = AsyncBudgetService(budget_service=ExportingService())
+
+        async def export() -> bool:
+            chunks = service.export_entries(query=BudgetEntriesExport())
+            await anext(chunks)
+            with anyio.CancelScope() as scope:
+                scope.cancel()
+                await anext(chunks)
+            return is_closed_in_threadpool(service=service)
+
+        assert anyio.run(export)
@@ -0,0 +1,112 @@
+"""Tests for `entries_app.batch_updater` objects."""
+from collections.abc import Iterator
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sql
+from sqlalchemy.orm import Session
+
+from backend.entries_app.batch_updater import BatchUpdater
+from backend.entries_app.models import BudgetEntry
+
+EXISTING_ID = 10
+MISSING_ID = 20
+
+
+def get_row(entry_id: int | None, product: str) -> dict:
+    """Return a row of a budget entry."""
+    return {
+        'id': entry_id,
+        'date': datetime.fromisoformat('2024-01-01'),
+        'shop_id': 1,
+        'product': product,
+        'amount': 1.5,
+        'category_id': 1,
+        'person_id': 1,
+        'currency_id': 1,
+    }
+
+
+@pytest.fixture
+def session() -> Iterator[Session]:
+    """Return a session of an in-memory database with one entry."""
+    engine = sql.create_engine('sqlite://')
+    BudgetEntry.__table__.create(bind=engine)
+    with Session(engine) as session:
+        session.execute(
+            sql.insert(BudgetEntry),
+            [get_row(entry_id=EXISTING_ID, product='bread')],
+        )
+        yield session
+    engine.dispose()
+
+
+def get_products(session: Session) -> dict[int, str]:
+    """Return products of saved entries by their IDs."""
+    return dict(
+        session.execute(
+            sql.select(BudgetEntry.id, BudgetEntry.product),
+        ).all(),
+    )
+
+
+class TestBatchUpdater:
+    """Tests for `BatchUpdater` with a database other than PostgreSQL."""
+
+    @classmethod
+    def test_save(cls, session: Session) -> None:
+        """Test inserts of new entries and updates of existing ones."""
+        counts = BatchUpdater(batch_size=10).save(
+            rows=[
+                get_row(entry_id=None, product='milk'),
+                get_row(entry_id=-1, product='tea'),
+                get_row(entry_id=EXISTING_ID, product='butter'),
+                get_row(entry_id=MISSING_ID, product='jam'),
+            ],
+            session=session,
+        )
+        assert counts == [{'inserted': 3, 'updated': 1}]
+        products = get_products(session=session)
+        assert products[EXISTING_ID] == 'butter'
+        assert products[MISSING_ID] == 'jam'
+        assert sorted(products.values()) == ['butter', 'jam', 'milk', 'tea']
+
+    @classmethod
+    def test_save_in_batches(cls, session: Session) -> None:
+        """Test that numbers of saved entries are returned per batch."""
+        counts = BatchUpdater(batch_size=2).save(
+            rows=[
+                get_row(entry_id=EXISTING_ID, product='butter'),
+                get_row(entry_id=None, product='milk'),
+                get_row(entry_id=None, product='tea'),
+            ],
+            session=session,
+        )
+        assert counts == [
+            {'inserted': 1, 'updated': 1},
+            {'inserted': 1, 'updated': 0},
+        ]
+        assert len(get_products(session=session)) == len(counts) + 1
+
+    @classmethod
+    def test_save_repeated_ids(cls, session: Session) -> None:
+        """Test that the last row of an ID repeated in a batch is saved."""
+        counts = BatchUpdater(batch_size=10).save(
+            rows=[
+                get_row(entry_id=EXISTING_ID, product='butter'),
+                get_row(entry_id=MISSING_ID, product='jam'),
+                get_row(entry_id=EXISTING_ID, product='cheese'),
+                get_row(entry_id=MISSING_ID, product='honey'),
+            ],
+            session=session,
+        )
+        assert counts == [{'inserted': 1, 'updated': 1}]
+        assert get_products(session=session) == {
+            EXISTING_ID: 'cheese',
+            MISSING_ID: 'honey',
+        }
+
+    @classmethod
+    def test_save_nothing(cls, session: Session) -> None:
+        """Test that no batches are saved without rows."""
+        assert not BatchUpdater(batch_size=2).save(rows=[], session=session)
@@ -0,0 +1,68 @@
+"""Tests for `entries_app.bulk_loader` objects."""
+from collections.abc import Iterator
+
+import pandas as pd
+import pytest
+import sqlalchemy as sql
+
+from backend.entries_app.bulk_loader import BulkLoader
+from backend.entries_app.dimensions import DIMENSIONS, DimensionCache
+from backend.entries_app.models import BudgetEntry
+
+BATCH_SIZE = 2
+ENTRIES_NUMBER = 3
+
+
+@pytest.fixture
+def engine() -> Iterator[sql.Engine]:
+    """Return an in-memory database with entries and lookup tables."""
+    engine = sql.create_engine('sqlite://')
+    for model in (BudgetEntry, *DIMENSIONS.values()):
+        model.__table__.create(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def entries() -> pd.DataFrame:
+    """Return validated entries, two of which are equal."""
+    return BulkLoader.validate(
+        df=pd.DataFrame({
+            'date': ['2024-01-01', '2024-01-01', '2024-01-02'],
+            'shop': ['bakery'] * ENTRIES_NUMBER,
+            'product': ['bread', 'bread', 'milk'],
+            'amount': [1.5] * ENTRIES_NUMBER,
+            'category': ['food'] * ENTRIES_NUMBER,
+            'person': ['me'] * ENTRIES_NUMBER,
+            'currency': ['EUR'] * ENTRIES_NUMBER,
+        }),
+    )
+
+
+class TestBulkLoader:
+    """Tests for `BulkLoader`."""
+
+    @classmethod
+    def test_fallback_inserts_all_entries(
+        cls,
+        engine: sql.Engine,
+        entries: pd.DataFrame,
+    ) -> None:
+        """Test that databases without fingerprints save every entry."""
+        loader = BulkLoader(
+            batch_size=BATCH_SIZE,
+            dimensions=DimensionCache(engine=engine),
+        )
+        with engine.begin() as connection:
+            assert not BulkLoader.supports_fingerprints(connection)
+            counts = loader.load(df=entries, connection=connection)
+        assert counts == {
+            'new_entries_number': ENTRIES_NUMBER,
+            'skipped_entries_number': 0,
+            'duplicates_number': 0,
+        }
+        with engine.connect() as connection:
+            products = connection.execute(
+                sql.select(BudgetEntry.product).order_by(BudgetEntry.id),
+            ).scalars().all()
+        assert products == ['bread', 'bread', 'milk']
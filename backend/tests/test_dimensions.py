@@ -0,0 +1,109 @@
+"""Tests for `entries_app.dimensions` objects."""
+from collections.abc import Iterator
+
+import pytest
+import sqlalchemy as sql
+
+from backend.entries_app.dimensions import (
+    COMPOUND_SELECT_LIMIT,
+    DIMENSIONS,
+    DimensionCache,
+)
+from backend.entries_app.models import Shop
+
+SAVED_SHOP = 'bakery'
+NEW_SHOP = 'market'
+MISSING_ID = 100
+
+
+@pytest.fixture
+def engine() -> Iterator[sql.Engine]:
+    """Return an in-memory database with lookup tables and one shop."""
+    engine = sql.create_engine('sqlite://')
+    for model in DIMENSIONS.values():
+        model.__table__.create(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(sql.insert(Shop).values(name=SAVED_SHOP))
+    yield engine
+    engine.dispose()
+
+
+def get_shops(engine: sql.Engine) -> dict[str, int]:
+    """Return IDs of saved shops by their names."""
+    with engine.connect() as connection:
+        return dict(
+            connection.execute(sql.select(Shop.name, Shop.id)).all(),
+        )
+
+
+class TestDimensionCache:
+    """Tests for `DimensionCache`."""
+
+    @classmethod
+    def test_get_ids_adds_missing_names(cls, engine: sql.Engine) -> None:
+        """Test that missing names are saved and existing ones reused."""
+        cache = DimensionCache(engine=engine)
+        ids = cache.get_ids(
+            dimension='shop',
+            names=[SAVED_SHOP, NEW_SHOP, NEW_SHOP],
+        )
+        assert ids == get_shops(engine)
+        assert set(ids) == {SAVED_SHOP, NEW_SHOP}
+
+    @classmethod
+    def test_get_ids_adds_many_names(cls, engine: sql.Engine) -> None:
+        """Test that names exceeding the limit of SQLite are all added."""
+        cache = DimensionCache(engine=engine)
+        names = [f'shop {index}' for index in range(COMPOUND_SELECT_LIMIT + 1)]
+        ids = cache.get_ids(dimension='shop', names=names)
+        shops = get_shops(engine)
+        assert ids == {name: shops[name] for name in names}
+        assert len(shops) == len(names) + 1
+
+    @classmethod
+    def test_get_ids_uses_cache(cls, engine: sql.Engine) -> None:
+        """Test that cached names are not read from the database again."""
+        cache = DimensionCache(engine=engine)
+        ids = cache.get_ids(dimension='shop', names=[SAVED_SHOP])
+        with engine.begin() as connection:
+            connection.execute(sql.delete(Shop))
+        assert cache.get_ids(dimension='shop', names=[SAVED_SHOP]) == ids
+
+    @classmethod
+    def test_find_ids_skips_missing_names(cls, engine: sql.Engine) -> None:
+        """Test that names that are not saved are neither added nor found."""
+        cache = DimensionCache(engine=engine)
+        ids = cache.find_ids(dimension='shop', names=[SAVED_SHOP, NEW_SHOP])
+        shops = get_shops(engine)
+        assert ids == [shops[SAVED_SHOP]]
+        assert NEW_SHOP not in shops
+        assert cache.find_ids(dimension='shop', names=[NEW_SHOP]) == []
+
+    @classmethod
+    def test_get_names_skips_missing_ids(cls, engine: sql.Engine) -> None:
+        """Test that names are returned for saved IDs only."""
+        cache = DimensionCache(engine=engine)
+        shop_id = get_shops(engine)[SAVED_SHOP]
+        names = cache.get_names(dimension='shop', ids=[shop_id, MISSING_ID])
+        assert names == {shop_id: SAVED_SHOP}
+
+    @classmethod
+    def test_encode_replaces_names_with_ids(cls, engine: sql.Engine) -> None:
+        """Test that fields of rows are replaced with IDs of their names."""
+        cache = DimensionCache(engine=engine)
+        rows = [
+            {'shop': SAVED_SHOP, 'product': 'bread', 'category': 'food'},
+            {'shop': NEW_SHOP, 'product': 'milk'},
+        ]
+        encoded = cache.encode(rows=rows)
+        shops = get_shops(engine)
+        food_id, = cache.find_ids(dimension='category', names=['food'])
+        assert encoded == [
+            {
+                'shop_id': shops[SAVED_SHOP],
+                'product': 'bread',
+                'category_id': food_id,
+            },
+            {'shop_id': shops[NEW_SHOP], 'product': 'milk'},
+        ]
+        assert rows[0]['shop'] == SAVED_SHOP
@@ -0,0 +1,210 @@
+"""Tests for `jobs_app.job_queue` objects."""
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+
+import pytest
+import sqlalchemy as sql
+from sqlalchemy.pool import StaticPool
+
+from backend.jobs_app.exceptions import JobQueueStopped
+from backend.jobs_app.job_queue import (
+    INTERNAL_ERROR,
+    INTERRUPTED_ERROR,
+    JobQueue,
+)
+from backend.jobs_app.models import Job, JobStatus, JobType
+
+HEARTBEAT_TIMEOUT = 60
+PROCESSED_ROWS = 10
+
+
+@pytest.fixture
+def engine() -> Iterator[sql.Engine]:
+    """Return an engine of an in-memory database with the jobs table."""
+    engine = sql.create_engine(
+        'sqlite://',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool,
+    )
+    Job.__table__.create(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def job_queue(engine: sql.Engine) -> Iterator[JobQueue]:
+    """Return a job queue sending heartbeats every 50 ms."""
+    job_queue = JobQueue(
+        engine,
+        max_workers=1,
+        heartbeat_interval=0.05,
+        heartbeat_timeout=HEARTBEAT_TIMEOUT,
+    )
+    yield job_queue
+    job_queue.shutdown()
+
+
+def add_job(
+    engine: sql.Engine,
+    worker: str,
+    heartbeat_at: datetime | None,
+    status: JobStatus = JobStatus.running,
+) -> uuid.UUID:
+    """Save a job of another worker and return its ID."""
+    job_id = uuid.uuid4()
+    with engine.begin() as connection:
+        connection.execute(
+            sql.insert(Job).values(
+                id=job_id,
+                job_type=JobType.upload.value,
+                status=status.value,
+                worker=worker,
+                created_at=datetime.now(UTC) - timedelta(hours=1),
+                heartbeat_at=heartbeat_at,
+            ),
+        )
+    return job_id
+
+
+class TestJobQueue:
+    """Tests for `JobQueue`."""
+
+    @classmethod
+    def test_workers_of_one_process_differ(cls, engine: sql.Engine) -> None:
+        """Test that boot IDs distinguish workers with the same PID."""
+        first = JobQueue(engine, max_workers=1)
+        second = JobQueue(engine, max_workers=1)
+        assert first.worker != second.worker
+        assert first.worker.rsplit(':', 1)[0] == (
+            second.worker.rsplit(':', 1)[0]
+        )
+
+    @classmethod
+    def test_recover_fails_stale_jobs(
+        cls,
+        engine: sql.Engine,
+        job_queue: JobQueue,
+    ) -> None:
+        """Test recovery of jobs of a stopped worker with the same PID."""
+        restarted_worker = f'{job_queue.worker.rsplit(":", 1)[0]}:0a1b2c3d'
+        stale_at = datetime.now(UTC) - timedelta(
+            seconds=2 * HEARTBEAT_TIMEOUT,
+        )
+        job_ids = (
+            add_job(engine, restarted_worker, stale_at),
+            add_job(
+                engine,
+                'another-host:1:0a1b2c3d',
+                heartbeat_at=None,
+                status=JobStatus.pending,
+            ),
+        )
+        assert job_queue.recover() == len(job_ids)
+        for job_id in job_ids:
+            job = job_queue.get_job(job_id=job_id)
+            assert job.status == JobStatus.failed
+            assert job.error == INTERRUPTED_ERROR
+            assert job.finished_at is not None
+
+    @classmethod
+    def test_recover_keeps_alive_jobs(
+        cls,
+        engine: sql.Engine,
+        job_queue: JobQueue,
+    ) -> None:
+        """Test that jobs with recent heartbeats are not failed."""
+        job_id = add_job(
+            engine,
+            worker='another-host:1:0a1b2c3d',
+            heartbeat_at=datetime.now(UTC),
+        )
+        assert job_queue.recover() == 0
+        assert job_queue.get_job(job_id=job_id).status == JobStatus.running
+
+    @classmethod
+    def test_recover_keeps_own_jobs(
+        cls,
+        engine: sql.Engine,
+        job_queue: JobQueue,
+    ) -> None:
+        """Test that jobs of the current worker are not failed."""
+        job_id = add_job(engine, job_queue.worker, heartbeat_at=None)
+        assert job_queue.recover() == 0
+        assert job_queue.get_job(job_id=job_id).status == JobStatus.running
+
+    @classmethod
+    def test_heartbeats_of_running_job(
+        cls,
+        engine: sql.Engine,
+        job_queue: JobQueue,
+    ) -> None:
+        """Test that heartbeats of a running job are saved."""
+        released = threading.Event()
+        job_queue.start()
+        job = job_queue.submit(
+            JobType.upload,
+            lambda progress: released.wait(timeout=5),
+        )
+        with engine.connect() as connection:
+            submitted_at = connection.scalar(
+                sql.select(Job.heartbeat_at).where(Job.id == job.id),
+            )
+        time.sleep(0.2)
+        with engine.connect() as connection:
+            heartbeat_at = connection.scalar(
+                sql.select(Job.heartbeat_at).where(Job.id == job.id),
+            )
+        released.set()
+        assert heartbeat_at > submitted_at
+
+    @classmethod
+    def test_submitted_job_succeeds(cls, job_queue: JobQueue) -> None:
+        """Test that the result and progress of a job are saved."""
+
+        def count_rows(progress: object) -> dict[str, int]:
+            progress(PROCESSED_ROWS, 0.5)
+            return {'rows': PROCESSED_ROWS}
+
+        job = job_queue.submit(JobType.upload, count_rows)
+        job_queue.executor.shutdown(wait=True)
+        job = job_queue.get_job(job_id=job.id)
+        assert job.status == JobStatus.succeeded
+        assert job.result == {'rows': PROCESSED_ROWS}
+        assert job.rows_processed == PROCESSED_ROWS
+        assert job.progress == 1
+
+    @classmethod
+    def test_submit_to_stopped_queue(cls, job_queue: JobQueue) -> None:
+        """Test that a job submitted after the shutdown is failed."""
+        job_queue.shutdown()
+        with pytest.raises(JobQueueStopped):
+            job_queue.submit(JobType.upload, lambda progress: progress)
+        job, = job_queue.list_jobs(limit=1)
+        assert job.status == JobStatus.failed
+        assert job.error == INTERRUPTED_ERROR
+
+    @classmethod
+    def test_job_fails_if_it_is_not_started(
+        cls,
+        job_queue: JobQueue,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """Test that an error of saving the running status fails the job."""
+        update = job_queue._update  # noqa: SLF001
+
+        def fail_start(job_id: uuid.UUID, **values: object) -> None:
+            if values.get('status') == JobStatus.running.value:
+                raise sql.exc.OperationalError('UPDATE', {}, OSError())
+            update(job_id, **values)
+
+        monkeypatch.setattr(job_queue, '_update', fail_start)
+        job = job_queue.submit(JobType.upload, lambda progress: progress)
+        job_queue.executor.shutdown(wait=True)
+        job = job_queue.get_job(job_id=job.id)
+        assert job.status == JobStatus.failed
+        assert job.error == INTERNAL_ERROR
+        assert f'Job {job.id} failed.' in caplog.messages
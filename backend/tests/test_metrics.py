@@ -0,0 +1,178 @@
+"""Tests for `api.metrics` objects."""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sql
+
+from backend.api.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    instrument_queries,
+    render_snapshots,
+    write_snapshot,
+)
+from backend.api.run_backend import get_metrics
+from backend.entries_app.query_profiler import QueryProfiler
+
+ROUTE_LABELS = ('GET', '/entries', '200')
+
+
+def get_stopped_pid() -> int:
+    """Return the ID of a process that has exited."""
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+    return process.pid
+
+
+def write_worker_snapshot(
+    directory: Path,
+    pid: int,
+    requests_number: int,
+) -> None:
+    """Write a snapshot of a worker with requests in progress."""
+    metrics_registry = MetricsRegistry()
+    metrics_registry.requests_total.inc(
+        labels=ROUTE_LABELS,
+        amount=requests_number,
+    )
+    metrics_registry.request_duration.observe(0.1, labels=ROUTE_LABELS[:2])
+    metrics_registry.requests_in_progress.inc(labels=ROUTE_LABELS[:1])
+    directory.joinpath(f'{pid}.json').write_text(
+        json.dumps(metrics_registry.dump()),
+    )
+
+
+class TestMetricsRendering:
+    """Tests for rendering of metrics in Prometheus text format."""
+
+    @classmethod
+    def test_counter_with_labels(cls) -> None:
+        """Test samples of a counter and escaping of label values."""
+        counter = Counter('requests_total', 'Requests.', ('route',))
+        counter.inc(labels=('/a"b',))
+        counter.inc(labels=('/a"b',), amount=2.5)
+        assert counter.render() == [
+            '# HELP requests_total Requests.',
+            '# TYPE requests_total counter',
+            'requests_total{route="/a\\"b"} 3.5',
+        ]
+
+    @classmethod
+    def test_histogram_buckets_are_cumulative(cls) -> None:
+        """Test cumulative buckets, the sum and the count of a histogram."""
+        histogram = Histogram('duration', 'Duration.', buckets=(1, 0.5))
+        for observed in (0.1, 0.7, 3):
+            histogram.observe(observed)
+        assert histogram.render()[2:] == [
+            'duration_bucket{le="0.5"} 1',
+            'duration_bucket{le="1"} 2',
+            'duration_bucket{le="+Inf"} 3',
+            'duration_sum 3.8',
+            'duration_count 3',
+        ]
+
+    @classmethod
+    def test_registry_renders_all_metrics(cls) -> None:
+        """Test that the exposition contains types of all metrics."""
+        exposition = MetricsRegistry().render()
+        assert exposition.endswith('\n')
+        assert exposition.count('# TYPE ') == len([
+            line
+            for line in exposition.splitlines()
+            if line.startswith('# HELP ')
+        ])
+        assert '# TYPE db_query_duration_seconds histogram' in exposition
+
+
+class TestSnapshots:
+    """Tests for aggregation of metrics of several workers."""
+
+    @classmethod
+    def test_snapshots_are_summed(cls, tmp_path: Path) -> None:
+        """Test that gauges of stopped workers are skipped."""
+        write_worker_snapshot(tmp_path, pid=os.getpid(), requests_number=2)
+        write_worker_snapshot(
+            tmp_path,
+            pid=get_stopped_pid(),
+            requests_number=3,
+        )
+        lines = render_snapshots(directory=tmp_path).splitlines()
+        assert (
+            'http_requests_total{method="GET",route="/entries",status="200"} 5'
+        ) in lines
+        assert (
+            'http_request_duration_seconds_count'
+            '{method="GET",route="/entries"} 2'
+        ) in lines
+        assert (
+            'http_requests_in_progress{method="GET"} 1'
+        ) in lines
+
+    @classmethod
+    def test_write_snapshot(cls, tmp_path: Path) -> None:
+        """Test that a written snapshot renders like its registry."""
+        metrics_registry = MetricsRegistry()
+        metrics_registry.requests_total.inc(labels=ROUTE_LABELS)
+        metrics_registry.response_size.observe(500, labels=ROUTE_LABELS[:2])
+        write_snapshot(directory=tmp_path, metrics_registry=metrics_registry)
+        assert [path.name for path in tmp_path.iterdir()] == [
+            f'{os.getpid()}.json',
+        ]
+        assert render_snapshots(directory=tmp_path) == (
+            metrics_registry.render()
+        )
+
+
+class TestInstrumentQueries:
+    """Tests for `instrument_queries`."""
+
+    @classmethod
+    def test_queries_are_timed_once(cls) -> None:
+        """Test that each query is observed once by the registry."""
+        metrics_registry = MetricsRegistry()
+        profiler = QueryProfiler(slow_query_threshold=None)
+        instrument_queries(profiler, metrics_registry=metrics_registry)
+        instrument_queries(profiler, metrics_registry=metrics_registry)
+        engine = sql.create_engine('sqlite://')
+        profiler.attach(engine=engine)
+        with engine.connect() as connection:
+            connection.execute(sql.text('SELECT 1'))
+            connection.execute(sql.text('SELECT 2'))
+        engine.dispose()
+        assert 'db_query_duration_seconds_count 2' in (
+            metrics_registry.render().splitlines()
+        )
+
+
+class TestGetMetrics:
+    """Tests for the `/metrics` route."""
+
+    @classmethod
+    def test_single_worker(cls, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that metrics are exposed by a single worker."""
+        monkeypatch.delenv('SERVER_METRICS_DIR', raising=False)
+        assert b'# TYPE http_requests_total counter' in get_metrics().body
+
+    @classmethod
+    def test_several_workers(
+        cls,
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        """Test that metrics of other workers are added."""
+        monkeypatch.setenv('SERVER_METRICS_DIR', str(tmp_path))
+        write_worker_snapshot(
+            tmp_path,
+            pid=get_stopped_pid(),
+            requests_number=1,
+        )
+        body = get_metrics().body.decode()
+        assert tmp_path.joinpath(f'{os.getpid()}.json').exists()
+        assert (
+            'http_requests_total{method="GET",route="/entries",status="200"}'
+        ) in body
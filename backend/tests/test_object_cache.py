@@ -0,0 +1,170 @@
+"""Tests for `reports_app.object_cache` and the cache of `S3Client`."""
+import io
+import json
+from collections.abc import Iterator
+
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+from backend.reports_app.object_cache import ObjectCache
+from backend.reports_app.s3client import S3Client
+from backend.reports_app.settings import S3Settings
+
+KEY = ('bucket', 'reports/a.json')
+OTHER_KEY = ('bucket', 'reports/b.json')
+NEW_KEY = ('bucket', 'reports/c.json')
+REPORT_PATH = 'reports/report.json'
+
+
+class TestObjectCache:
+    """Tests for `ObjectCache`."""
+
+    @classmethod
+    def test_object_is_fresh_within_ttl(cls) -> None:
+        """Test that an object is served as is until its TTL expires."""
+        cache = ObjectCache(max_size=2, ttl=60)
+        cache.put(key=KEY, data={'a': 1}, etag='"1"')
+        cached, is_fresh = cache.get(key=KEY)
+        assert cached.data == {'a': 1}
+        assert is_fresh
+        assert cache.get_stats()['hits'] == 1
+
+    @classmethod
+    def test_object_is_stale_after_ttl(cls) -> None:
+        """Test that an object needs revalidation after its TTL."""
+        cache = ObjectCache(max_size=2, ttl=0)
+        cache.put(key=KEY, data={'a': 1}, etag='"1"')
+        cached, is_fresh = cache.get(key=KEY)
+        assert cached is not None
+        assert not is_fresh
+        assert cache.get_stats()['hits'] == 0
+
+    @classmethod
+    def test_expected_etag_overrides_ttl(cls) -> None:
+        """Test that freshness is decided by the expected ETag."""
+        cache = ObjectCache(max_size=2, ttl=0)
+        cache.put(key=KEY, data={'a': 1}, etag='"1"')
+        assert cache.get(key=KEY, etag='"1"')[1]
+        cache = ObjectCache(max_size=2, ttl=60)
+        cache.put(key=KEY, data={'a': 1}, etag='"1"')
+        assert not cache.get(key=KEY, etag='"2"')[1]
+
+    @classmethod
+    def test_least_recently_used_object_is_evicted(cls) -> None:
+        """Test the eviction of the least recently used object."""
+        cache = ObjectCache(max_size=2, ttl=60)
+        cache.put(key=KEY, data='a', etag='"1"')
+        cache.put(key=OTHER_KEY, data='b', etag='"2"')
+        cache.get(key=KEY)
+        cache.put(key=NEW_KEY, data='c', etag='"3"')
+        assert cache.get(key=OTHER_KEY)[0] is None
+        assert cache.get(key=KEY)[0].data == 'a'
+        assert cache.get(key=NEW_KEY)[0].data == 'c'
+        assert cache.get_stats()['size'] == cache.max_size
+
+    @classmethod
+    def test_download_before_invalidation_is_not_stored(cls) -> None:
+        """Test that a load racing a save does not store the old object."""
+        cache = ObjectCache(max_size=2, ttl=60)
+        generation = cache.generation
+        cache.invalidate(key=KEY)
+        cache.put(key=KEY, data='old', etag='"1"', generation=generation)
+        assert cache.get(key=KEY)[0] is None
+        assert cache.get_stats()['misses'] == 1
+
+    @classmethod
+    def test_revalidation_of_replaced_object(cls) -> None:
+        """Test that only the confirmed version is revalidated."""
+        cache = ObjectCache(max_size=2, ttl=0)
+        cache.put(key=KEY, data={'a': 1}, etag='"2"')
+        validated_at = cache.get(key=KEY)[0].validated_at
+        cache.revalidate(key=KEY, etag='"1"')
+        assert cache.get(key=KEY)[0].validated_at == validated_at
+
+
+@pytest.fixture
+def s3client() -> Iterator[tuple[S3Client, Stubber]]:
+    """Return an S3 client with a cache and a stubber of its requests."""
+    s3client = S3Client(
+        cache=ObjectCache(max_size=2, ttl=0),
+        s3config=S3Settings(
+            _env_file=None,
+            s3_bucket='bucket',
+            s3_access_key_id='key',
+            s3_secret_access_key='secret',  # noqa: S106
+        ),
+    )
+    with Stubber(s3client.s3) as stubber:
+        yield s3client, stubber
+        stubber.assert_no_pending_responses()
+
+
+def add_object(stubber: Stubber, data: object, etag: str) -> None:
+    """Add a response of `get_object` returning JSON data."""
+    body = json.dumps(data).encode()
+    stubber.add_response(
+        'get_object',
+        {
+            'Body': StreamingBody(io.BytesIO(body), len(body)),
+            'ETag': etag,
+        },
+    )
+
+
+class TestS3ClientCache:
+    """Tests for caching of objects loaded by `S3Client`."""
+
+    @classmethod
+    def test_not_modified_object_is_revalidated(
+        cls,
+        s3client: tuple[S3Client, Stubber],
+    ) -> None:
+        """Test that a response with status 304 returns the cached object."""
+        client, stubber = s3client
+        add_object(stubber, data={'a': 1}, etag='"1"')
+        stubber.add_client_error(
+            'get_object',
+            service_error_code='304',
+            http_status_code=304,
+            expected_params={
+                'Bucket': client.bucket,
+                'Key': REPORT_PATH,
+                'IfNoneMatch': '"1"',
+            },
+        )
+        assert client.load_object(remote_path=REPORT_PATH) == {'a': 1}
+        assert client.load_object(remote_path=REPORT_PATH) == {'a': 1}
+        stats = client.cache.get_stats()
+        assert (stats['misses'], stats['revalidations']) == (1, 1)
+
+    @classmethod
+    def test_expected_etag_skips_request(
+        cls,
+        s3client: tuple[S3Client, Stubber],
+    ) -> None:
+        """Test that an object with the expected ETag is not requested."""
+        client, stubber = s3client
+        add_object(stubber, data={'a': 1}, etag='"1"')
+        client.load_object(remote_path=REPORT_PATH)
+        assert client.load_object(
+            remote_path=REPORT_PATH,
+            etag='"1"',
+        ) == {'a': 1}
+        assert client.cache.get_stats()['hits'] == 1
+
+    @classmethod
+    def test_changed_etag_downloads_object(
+        cls,
+        s3client: tuple[S3Client, Stubber],
+    ) -> None:
+        """Test that an object with another ETag is downloaded again."""
+        client, stubber = s3client
+        client.cache.ttl = 60
+        add_object(stubber, data={'a': 1}, etag='"1"')
+        add_object(stubber, data={'a': 2}, etag='"2"')
+        client.load_object(remote_path=REPORT_PATH)
+        assert client.load_object(
+            remote_path=REPORT_PATH,
+            etag='"2"',
+        ) == {'a': 2}
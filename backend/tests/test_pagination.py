@@ -0,0 +1,141 @@
+"""Tests for `entries_app.pagination` objects."""
+import base64
+import json
+from collections.abc import Iterator
+from datetime import datetime
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+import sqlalchemy as sql
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api.dependencies import get_budget_service
+from backend.api.entries import entries_router
+from backend.entries_app.async_budget_service import AsyncBudgetService
+from backend.entries_app.budget_service import BudgetService
+from backend.entries_app.dimensions import SORT_COLUMNS
+from backend.entries_app.exceptions import InvalidCursorError
+from backend.entries_app.models import SortColumn
+from backend.entries_app.pagination import (
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+)
+
+ENTRY = SimpleNamespace(
+    id=42,
+    date=datetime.fromisoformat('2024-03-01T12:30:00'),
+    amount=9.99,
+    shop='Corner "shop"',
+    product='milk',
+    category='food',
+    person='me',
+    currency='USD',
+    shop_id=3,
+    category_id=2,
+    person_id=1,
+    currency_id=4,
+)
+
+
+def encode_json(payload: object) -> str:
+    """Return a cursor encoding an arbitrary JSON payload."""
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+class TestCursor:
+    """Tests for `encode_cursor` and `decode_cursor`."""
+
+    @classmethod
+    @pytest.mark.parametrize('sort_by', list(SortColumn))
+    def test_round_trip(cls, sort_by: SortColumn) -> None:
+        """Test that a cursor is decoded into the encoded position."""
+        cursor = encode_cursor(entry=ENTRY, sort_by=sort_by)
+        assert decode_cursor(cursor=cursor, sort_by=sort_by) == (
+            getattr(ENTRY, SORT_COLUMNS[sort_by.value].key),
+            ENTRY.id,
+        )
+
+    @classmethod
+    def test_lookup_fields_are_sorted_by_ids(cls) -> None:
+        """Test that cursors of lookup fields contain IDs of names."""
+        cursor = encode_cursor(entry=ENTRY, sort_by=SortColumn.shop)
+        assert decode_cursor(cursor=cursor, sort_by=SortColumn.shop) == (
+            ENTRY.shop_id,
+            ENTRY.id,
+        )
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(
+                cursor=encode_json(['shop', ENTRY.shop, ENTRY.id]),
+                sort_by=SortColumn.shop,
+            )
+
+    @classmethod
+    def test_cursor_of_another_sort_column(cls) -> None:
+        """Test that a cursor is rejected for another sort column."""
+        cursor = encode_cursor(entry=ENTRY, sort_by=SortColumn.date)
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor=cursor, sort_by=SortColumn.amount)
+
+    @classmethod
+    @pytest.mark.parametrize(
+        'cursor',
+        [
+            'not a cursor',
+            'bm90IGpzb24=',
+            encode_json({'date': '2024-01-01'}),
+            encode_json(['date', '2024-01-01']),
+            encode_json(['date', 'yesterday', 1]),
+            encode_json(['date', None, 1]),
+            encode_json(['date', '2024-01-01', 'first']),
+        ],
+    )
+    def test_invalid_cursor(cls, cursor: str) -> None:
+        """Test that malformed cursors are rejected with status 400."""
+        with pytest.raises(InvalidCursorError) as exc_info:
+            decode_cursor(cursor=cursor)
+        assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST
+
+
+class TestRankCursor:
+    """Tests for `encode_rank_cursor` and `decode_rank_cursor`."""
+
+    @classmethod
+    def test_round_trip(cls) -> None:
+        """Test that a cursor is decoded into the encoded rank and ID."""
+        cursor = encode_rank_cursor(rank=0.75, entry_id=ENTRY.id)
+        assert decode_rank_cursor(cursor=cursor) == (0.75, ENTRY.id)
+
+    @classmethod
+    def test_cursor_of_sorted_entries(cls) -> None:
+        """Test that a cursor of sorted entries is not a rank cursor."""
+        cursor = encode_cursor(entry=ENTRY, sort_by=SortColumn.amount)
+        with pytest.raises(InvalidCursorError):
+            decode_rank_cursor(cursor=cursor)
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    """Return a client of the entries API backed by an empty database."""
+    engine = sql.create_engine('sqlite://')
+    app = FastAPI()
+    app.include_router(entries_router, prefix='/entries')
+    app.dependency_overrides[get_budget_service] = lambda: (
+        AsyncBudgetService(budget_service=BudgetService(engine))
+    )
+    with TestClient(app) as test_client:
+        yield test_client
+    engine.dispose()
+
+
+class TestReadEntries:
+    """Tests for cursors of `GET /entries/`."""
+
+    @classmethod
+    def test_invalid_cursor(cls, client: TestClient) -> None:
+        """Test that an invalid cursor is a bad request."""
+        response = client.get('/entries/', params={'cursor': 'not a cursor'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,83 @@
+"""Tests for `reports_app.reports_generator` objects."""
+import datetime
+from collections.abc import Iterator
+
+import pytest
+import sqlalchemy as sql
+
+from backend.entries_app.models import (
+    BudgetEntry,
+    Category,
+    MonthlyCategoryRollup,
+)
+from backend.reports_app.reports_generator import (
+    AggregationBackend,
+    ReportsGenerator,
+)
+
+EMPTY_REPORT = {
+    'month': {},
+    'year': {},
+    'total': {'total': {'category': [], 'amount': []}},
+}
+# The SQL backend truncates dates with a PostgreSQL function.
+SQLITE_BACKENDS = (AggregationBackend.rollup, AggregationBackend.pandas)
+
+
+@pytest.fixture
+def engine() -> Iterator[sql.Engine]:
+    """Return an engine of an in-memory database without entries."""
+    engine = sql.create_engine('sqlite://')
+    for model in (Category, BudgetEntry, MonthlyCategoryRollup):
+        model.__table__.create(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+class TestReportsGenerator:
+    """Tests for `ReportsGenerator`."""
+
+    @classmethod
+    @pytest.mark.parametrize('backend', SQLITE_BACKENDS)
+    def test_reports_of_empty_table(
+        cls,
+        engine: sql.Engine,
+        backend: AggregationBackend,
+    ) -> None:
+        """Test that reports of an empty table are empty."""
+        reports_generator = ReportsGenerator(engine)
+        grouped_df = reports_generator.fetch_grouped_data(backend=backend)
+        assert grouped_df.empty
+        assert reports_generator.expenses_per_category(
+            grouped_df=grouped_df,
+        ) == EMPTY_REPORT
+        assert not reports_generator.expenses_per_interval(
+            grouped_df=grouped_df,
+        )
+
+    @classmethod
+    def test_reports_of_entries(cls, engine: sql.Engine) -> None:
+        """Test that expenses are grouped by categories and months."""
+        with engine.begin() as connection:
+            connection.execute(
+                sql.insert(Category),
+                [{'id': 1, 'name': 'food'}],
+            )
+            connection.execute(
+                sql.insert(BudgetEntry),
+                [
+                    {
+                        'date': datetime.date(2024, 1, day),
+                        'product': 'bread',
+                        'amount': amount,
+                        'category_id': 1,
+                    }
+                    for day, amount in ((1, 1.5), (2, 2), (3, -10))
+                ],
+            )
+        reports = ReportsGenerator(engine).expenses_per_category(
+            backend=AggregationBackend.pandas,
+        )
+        assert reports['month'] == {
+            '2024-01': {'category': ['food'], 'amount': [3.5]},
+        }
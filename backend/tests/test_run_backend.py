@@ -0,0 +1,87 @@
+"""Tests for `api.run_backend` objects."""
+import os
+from pathlib import Path
+
+import pytest
+
+from backend.api import run_backend
+
+MAX_REQUESTS = 1000
+
+
+@pytest.fixture
+def uvicorn_options(monkeypatch: pytest.MonkeyPatch) -> dict[str, object]:
+    """
+    Return options passed to `uvicorn.run` by `start_backend`.
+
+    The directory of metrics passed to workers is removed
+    from the environment and stored with the options, along with
+    its files while the server runs.
+
+    """
+    options = {}
+
+    def run(**kwargs: object) -> None:
+        metrics_dir = os.environ.pop('SERVER_METRICS_DIR', None)
+        options.update(kwargs, metrics_dir=metrics_dir and Path(metrics_dir))
+        if metrics_dir is not None:
+            options['metrics_files'] = list(Path(metrics_dir).iterdir())
+
+    monkeypatch.setattr(run_backend.uvicorn, 'run', run)
+    monkeypatch.delenv('SERVER_METRICS_DIR', raising=False)
+    monkeypatch.setenv('SERVER_LIMIT_MAX_REQUESTS', str(MAX_REQUESTS))
+    return options
+
+
+class TestStartBackend:
+    """Tests for `start_backend`."""
+
+    @classmethod
+    def test_limit_of_single_worker_is_ignored(
+        cls,
+        uvicorn_options: dict[str, object],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that the only worker is not stopped by the limit."""
+        monkeypatch.setenv('SERVER_WORKERS', '1')
+        run_backend.start_backend()
+        assert uvicorn_options['limit_max_requests'] is None
+        assert uvicorn_options['metrics_dir'] is None
+
+    @classmethod
+    def test_limit_of_several_workers(
+        cls,
+        uvicorn_options: dict[str, object],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that restarted workers are limited."""
+        monkeypatch.setenv('SERVER_WORKERS', '2')
+        run_backend.start_backend()
+        assert uvicorn_options['limit_max_requests'] == MAX_REQUESTS
+
+    @classmethod
+    def test_temporary_metrics_dir(
+        cls,
+        uvicorn_options: dict[str, object],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that several workers share a temporary directory."""
+        monkeypatch.setenv('SERVER_WORKERS', '2')
+        run_backend.start_backend()
+        metrics_dir = uvicorn_options['metrics_dir']
+        assert uvicorn_options['metrics_files'] == []
+        assert not metrics_dir.exists()
+
+    @classmethod
+    def test_configured_metrics_dir(
+        cls,
+        uvicorn_options: dict[str, object],
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        """Test that snapshots of a previous run are removed."""
+        tmp_path.joinpath('1.json').write_text('{}')
+        monkeypatch.setenv('SERVER_METRICS_DIR', str(tmp_path))
+        run_backend.start_backend()
+        assert uvicorn_options['metrics_dir'] == tmp_path
+        assert uvicorn_options['metrics_files'] == []
@@ -0,0 +1,188 @@
+"""Tests for `entries_app.upload_reader` objects."""
+import gzip
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from backend.entries_app.upload_reader import UploadFormat, UploadReader
+
+CHUNK_SIZE = 4
+ROWS_NUMBER = 10
+CSV_DATA = (
+    b'date;shop;product;amount;category;person;currency\n'
+    b'2024-01-01;shop;bread;1.5;food;me;EUR\n'
+)
+
+
+def get_upload(data: bytes, content_type: str | None = None) -> UploadFile:
+    """Return an uploaded file with the specified content type."""
+    headers = None
+    if content_type is not None:
+        headers = Headers({'content-type': content_type})
+    return UploadFile(
+        file=io.BytesIO(data),
+        size=len(data),
+        filename='entries',
+        headers=headers,
+    )
+
+
+def get_table(rows_number: int) -> pa.Table:
+    """Return a table of budget entries."""
+    return pa.table({
+        'date': ['2024-01-01'] * rows_number,
+        'shop': ['shop'] * rows_number,
+        'product': [f'product {index}' for index in range(rows_number)],
+        'amount': [1.5] * rows_number,
+        'category': ['food'] * rows_number,
+        'person': ['me'] * rows_number,
+        'currency': ['EUR'] * rows_number,
+    })
+
+
+def write_parquet(table: pa.Table, row_group_size: int) -> bytes:
+    """Return a Parquet file of a table."""
+    sink = io.BytesIO()
+    pq.write_table(table, sink, row_group_size=row_group_size)
+    return sink.getvalue()
+
+
+def write_arrow_stream(table: pa.Table, batch_size: int) -> bytes:
+    """Return an Arrow IPC stream of a table."""
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=batch_size)
+    return sink.getvalue()
+
+
+def write_arrow_file(table: pa.Table, batch_size: int) -> bytes:
+    """Return an Arrow IPC file of a table."""
+    sink = io.BytesIO()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=batch_size)
+    return sink.getvalue()
+
+
+@pytest.fixture
+def reader() -> UploadReader:
+    """Return a reader with a small chunk size."""
+    return UploadReader(chunk_size=CHUNK_SIZE)
+
+
+class TestDetectFormat:
+    """Tests for `UploadReader.detect_format`."""
+
+    @classmethod
+    @pytest.mark.parametrize(
+        ('data', 'upload_format'),
+        [
+            (write_parquet(get_table(1), 1), UploadFormat.parquet),
+            (write_arrow_file(get_table(1), 1), UploadFormat.arrow_file),
+            (write_arrow_stream(get_table(1), 1), UploadFormat.arrow_stream),
+            (gzip.compress(CSV_DATA), UploadFormat.gzip_csv),
+            (b'\x28\xb5\x2f\xfd' + CSV_DATA, UploadFormat.zstd_csv),
+            (CSV_DATA, UploadFormat.csv),
+        ],
+    )
+    def test_format_is_detected_from_magic_bytes(
+        cls,
+        data: bytes,
+        upload_format: UploadFormat,
+    ) -> None:
+        """Test that magic bytes are detected and the file is rewound."""
+        upload = get_upload(data=data)
+        assert UploadReader.detect_format(upload) == upload_format
+        assert upload.file.tell() == 0
+
+    @classmethod
+    def test_magic_bytes_override_content_type(cls) -> None:
+        """Test that magic bytes take precedence over the content type."""
+        upload = get_upload(
+            data=write_parquet(get_table(1), 1),
+            content_type='text/csv',
+        )
+        assert UploadReader.detect_format(upload) == UploadFormat.parquet
+
+    @classmethod
+    def test_format_is_detected_from_content_type(cls) -> None:
+        """Test the content type of a file without known magic bytes."""
+        upload = get_upload(
+            data=CSV_DATA,
+            content_type='application/gzip; charset=binary',
+        )
+        assert UploadReader.detect_format(upload) == UploadFormat.gzip_csv
+
+    @classmethod
+    def test_unknown_content_type_is_csv(cls) -> None:
+        """Test that unknown files are read as plain CSV."""
+        upload = get_upload(data=CSV_DATA, content_type='text/plain')
+        assert UploadReader.detect_format(upload) == UploadFormat.csv
+
+
+class TestIterTables:
+    """Tests for `UploadReader._iter_tables`."""
+
+    @classmethod
+    @pytest.mark.parametrize(
+        ('batch_size', 'chunk_sizes'),
+        [
+            (1, [4, 4, 2]),
+            (4, [4, 4, 2]),
+            (3, [6, 4]),
+            (ROWS_NUMBER, [ROWS_NUMBER]),
+        ],
+    )
+    def test_batches_are_merged_into_chunks(
+        cls,
+        reader: UploadReader,
+        batch_size: int,
+        chunk_sizes: list[int],
+    ) -> None:
+        """Test that chunks end at the first batch reaching chunk size."""
+        data = write_arrow_stream(get_table(ROWS_NUMBER), batch_size)
+        tables = list(
+            reader._iter_tables(  # noqa: SLF001
+                io.BytesIO(data),
+                upload_format=UploadFormat.arrow_stream,
+            ),
+        )
+        assert [table.num_rows for table in tables] == chunk_sizes
+        assert pa.concat_tables(tables).equals(get_table(ROWS_NUMBER))
+
+    @classmethod
+    def test_parquet_is_read_in_chunks(cls, reader: UploadReader) -> None:
+        """Test that Parquet row groups are split by the chunk size."""
+        data = write_parquet(get_table(ROWS_NUMBER), ROWS_NUMBER)
+        tables = list(
+            reader._iter_tables(  # noqa: SLF001
+                io.BytesIO(data),
+                upload_format=UploadFormat.parquet,
+            ),
+        )
+        assert [table.num_rows for table in tables] == [4, 4, 2]
+
+    @classmethod
+    def test_empty_file_yields_no_tables(cls, reader: UploadReader) -> None:
+        """Test that a file without rows yields no chunks."""
+        data = write_arrow_file(get_table(0), CHUNK_SIZE)
+        tables = list(
+            reader._iter_tables(  # noqa: SLF001
+                io.BytesIO(data),
+                upload_format=UploadFormat.arrow_file,
+            ),
+        )
+        assert tables == []
+
+    @classmethod
+    def test_chunks_are_validated(cls, reader: UploadReader) -> None:
+        """Test that `iter_chunks` validates each chunk of a file."""
+        upload = get_upload(
+            data=write_arrow_file(get_table(ROWS_NUMBER), 1),
+        )
+        chunks = list(reader.iter_chunks(upload))
+        assert [chunk.shape[0] for chunk in chunks] == [4, 4, 2]
+        assert str(chunks[0]['amount'].dtype) == 'float64'
@@ -9,12 +9,17 @@ and handling responses.
 import logging
 from io import BytesIO
 
+import pandas as pd
+import pyarrow as pa
 import requests
 import streamlit as st
 
 logger = logging.getLogger(__name__)
 API_BASE_URL = 'http://127.0.0.1:8000'
 TIMEOUT = 10
+ARROW_STREAM_TYPE = 'application/vnd.apache.arrow.stream'
+ARROW_ACCEPT = f'{ARROW_STREAM_TYPE}, application/json;q=0.9'
+TABLE_FIELD = 'table'
 EntryType = dict[str, str | int | None]
 ReportType = dict[
     str,
@@ -39,16 +44,23 @@ class APIClient:
         """
         return st.session_state.get('token', '')
 
-    def make_request(
+    def make_request(  # noqa: PLR0913
         self,
         endpoint: str,
         method: str = 'POST',
         json_data: EntryType | list[EntryType] | None = None,
         files: dict[str, tuple[str, BytesIO, str]] | None = None,
-    ) -> dict[str, str | int] | ReportsType:
+        params: dict[str, str | int] | None = None,
+        *,
+        table: pd.DataFrame | None = None,
+        arrow: bool = False,
+    ) -> dict[str, str | int | pd.DataFrame] | ReportsType:
         """
         Send a request to API and return a response.
 
+        Tables are sent and received as Apache Arrow IPC streams,
+        so that they are transferred as typed columns.
+
         Parameters
         ----------
         endpoint : str
@@ -59,22 +71,39 @@ class APIClient:
             JSON object to send with the request.
         files : dict, optional
             Files to upload.
+        params : dict, optional
+            Query parameters of the request.
+        table : pd.DataFrame, optional
+            Table to send as an Arrow IPC stream.
+        arrow : bool, optional
+            Whether an Arrow IPC stream is preferred
+            to JSON in the response (default is False).
 
         Returns
         -------
         dict or ReportsType
             The JSON response from the server, or an error message.
+            An Arrow response is returned as a dictionary with
+            the table under the 'table' key and the metadata
+            of the stream under other keys.
 
         """
         url = f'{API_BASE_URL}{endpoint}'
 
         response = None
+        headers = self._get_headers()
+        if arrow:
+            headers['Accept'] = ARROW_ACCEPT
         request_kwargs = {
             'method': method,
             'url': url,
-            'headers': {**self._get_headers()},
+            'headers': headers,
+            'params': params,
         }
-        if files is None and json_data is not None:
+        if table is not None:
+            headers['Content-Type'] = ARROW_STREAM_TYPE
+            request_kwargs['data'] = self._encode_table(table=table)
+        elif files is None and json_data is not None:
             request_kwargs['json'] = json_data
         elif files is not None:
             request_kwargs['files'] = files
@@ -86,12 +115,85 @@ class APIClient:
         except requests.exceptions.RequestException as exc:
             logger.error('API request failed: %s', str(exc))
         try:
-            return response.json()
+            return self._decode_response(response=response)
         except AttributeError:
             return {'detail': 'Failed to connect to the server.'}
         except requests.exceptions.JSONDecodeError:
             return {'detail': 'Failed to decode response.'}
 
+    def get_job(self, job_id: str) -> dict[str, str | int | float | None]:
+        """
+        Return the state of a background job.
+
+        Parameters
+        ----------
+        job_id : str
+            The ID of the job.
+
+        Returns
+        -------
+        dict
+            The status, progress and result of the job,
+            or an error message.
+
+        """
+        return self.make_request(endpoint=f'/jobs/{job_id}', method='GET')
+
+    @classmethod
+    def _encode_table(cls, table: pd.DataFrame) -> bytes:
+        """
+        Encode a table as an Arrow IPC stream.
+
+        Parameters
+        ----------
+        table : pd.DataFrame
+            The table to encode.
+
+        Returns
+        -------
+        bytes
+            The stream containing the table.
+
+        """
+        arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, schema=arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+        return sink.getvalue().to_pybytes()
+
+    @classmethod
+    def _decode_response(
+        cls,
+        response: requests.Response,
+    ) -> dict[str, str | int | pd.DataFrame] | ReportsType:
+        """
+        Decode a JSON response or an Arrow IPC stream.
+
+        Parameters
+        ----------
+        response : requests.Response
+            The response from the server.
+
+        Returns
+        -------
+        dict or ReportsType
+            The JSON response, or the table of the stream
+            with its metadata.
+
+        """
+        content_type = response.headers.get('Content-Type', '')
+        if not content_type.startswith(ARROW_STREAM_TYPE):
+            return response.json()
+        arrow_table = pa.ipc.open_stream(response.content).read_all()
+        metadata = arrow_table.schema.metadata or {}
+        return {
+            **{
+                key.decode('utf-8'): value.decode('utf-8')
+                for key, value in metadata.items()
+            },
+            TABLE_FIELD: arrow_table.to_pandas(),
+        }
+
     def _get_headers(self) -> dict[str, str]:
         """
         Return authorization headers if the user is logged in.
@@ -3,30 +3,55 @@
 import logging
 from io import BytesIO
 
-from frontend.api.api_client import APIClient
+import pandas as pd
+
+from frontend.api.api_client import TABLE_FIELD, APIClient
 
 logger = logging.getLogger(__name__)
+PAGE_SIZE = 10
 
 
 class EntriesAPIClient(APIClient):
     """Handles API requests related to budget entries."""
 
-    def get_budget_entries(self) -> dict[str, str]:
+    def get_budget_entries(
+        self,
+        cursor: str | None = None,
+    ) -> dict[str, str | pd.DataFrame]:
         """
-        Return all budget entries.
+        Return a page of budget entries.
+
+        Entries are received as an Arrow IPC stream.
+
+        Parameters
+        ----------
+        cursor : str, optional
+            Cursor of the page returned with the previous page.
+            If None, the first page is returned.
 
         Returns
         -------
         dict
-            A dictionary containing budget entries.
+            A dictionary containing a table of budget entries of the page
+            and the cursor of the next page.
 
         """
-        entries = self.make_request(
+        params = {'limit': PAGE_SIZE}
+        if cursor:
+            params['cursor'] = cursor
+        page = self.make_request(
             method='GET',
             endpoint='/entries/',
+            params=params,
+            arrow=True,
         )
-        if entries:
-            return entries
+        if TABLE_FIELD in page:
+            return {
+                'entries': page[TABLE_FIELD],
+                'next_cursor': page.get('next_cursor'),
+            }
+        if page:
+            return page
         return {}
 
     def get_entries_info(self) -> dict[str, str | int]:
@@ -75,15 +100,17 @@ class EntriesAPIClient(APIClient):
 
     def save_changed_entries(
         self,
-        entries: list[dict[str, str | int | None]],
+        entries: pd.DataFrame,
     ) -> dict[str, str]:
         """
         Save updates to multiple budget entries.
 
+        Entries are sent as an Arrow IPC stream.
+
         Parameters
         ----------
-        entries : list of dict
-            A list of dictionaries containing updated budget entries.
+        entries : pd.DataFrame
+            A table containing updated budget entries.
 
         Returns
         -------
@@ -93,7 +120,7 @@ class EntriesAPIClient(APIClient):
         """
         response = self.make_request(
             endpoint='/entries/update',
-            json_data=entries,
+            table=entries,
         )
         if response:
             return response
@@ -104,7 +131,10 @@ class EntriesAPIClient(APIClient):
         entries_files: dict[str, tuple[str, BytesIO, str]],
     ) -> dict[str, str]:
         """
-        Upload budget entries from a CSV file.
+        Upload budget entries from a CSV, Parquet or Feather file.
+
+        The file is uploaded in a background job, which is saved
+        in chunks, so that the request does not wait for the upload.
 
         Parameters
         ----------
@@ -115,12 +145,13 @@ class EntriesAPIClient(APIClient):
         Returns
         -------
         dict
-            The API response confirming the upload.
+            The submitted job, or an error message.
 
         """
         response = self.make_request(
             endpoint='/entries/upload',
             files=entries_files,
+            params={'streaming': 'true', 'background': 'true'},
         )
         if response:
             return response
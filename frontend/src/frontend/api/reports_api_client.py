@@ -12,7 +12,7 @@ class ReportsAPIClient(APIClient):
 
     def generate_report(self, report_type: str) -> ReportsType:
         """
-        Generate a report of the specified type.
+        Submit a background job generating a report of the specified type.
 
         Parameters
         ----------
@@ -22,17 +22,45 @@ class ReportsAPIClient(APIClient):
         Returns
         -------
         ReportsType
-            A dictionary containing the generated report data.
+            The submitted job, or an error message.
 
         """
         report = self.make_request(
             method='POST',
             endpoint=f'/reports/generate/{report_type}',
+            params={'background': 'true'},
         )
         if report:
             return report
         return {}
 
+    def generate_reports(
+        self,
+        report_types: list[str],
+    ) -> dict[str, ReportsType]:
+        """
+        Generate reports of the specified types in one request.
+
+        Parameters
+        ----------
+        report_types : list of str
+            The types of reports to generate.
+
+        Returns
+        -------
+        dict
+            A dictionary containing the generated reports data by types.
+
+        """
+        reports = self.make_request(
+            method='POST',
+            endpoint='/reports/generate',
+            json_data=report_types,
+        )
+        if reports:
+            return reports
+        return {}
+
     def load_last_report(self, report_type: str) -> ReportsType:
         """
         Load the latest report of the specified type.
@@ -6,12 +6,56 @@ to handle responses from the backend service
 and display relevant messages to the user through Streamlit.
 
 """
+import time
+
 import streamlit as st
 
+from frontend.api.api_client import APIClient
+
+JOB_POLL_INTERVAL = 0.5
+FINISHED_STATUSES = frozenset(('succeeded', 'failed'))
+
 
 class BasePage:
     """A class to handle responses and display messages through Streamlit."""
 
+    @classmethod
+    def wait_for_job(
+        cls,
+        api: APIClient,
+        job: dict[str, str | int | float | None],
+    ) -> dict:
+        """
+        Poll a background job and display its progress.
+
+        Parameters
+        ----------
+        api : APIClient
+            API client requesting states of the job.
+        job : dict
+            The submitted job, or an error message.
+
+        Returns
+        -------
+        dict
+            The result of the succeeded job, or an error message.
+
+        """
+        progress_bar = st.progress(0, text='Waiting for the job...')
+        while job.get('status', 'failed') not in FINISHED_STATUSES:
+            time.sleep(JOB_POLL_INTERVAL)
+            job = api.get_job(job_id=job['id'])
+            progress_bar.progress(
+                job.get('progress') or 0,
+                text=f'{job.get("rows_processed") or 0} rows processed.',
+            )
+        progress_bar.empty()
+        if 'detail' in job:
+            return job
+        if job['status'] == 'failed':
+            return {'detail': job.get('error')}
+        return job.get('result') or {}
+
     @classmethod
     def handle_response(cls, response: dict[str, str]) -> int:
         """
@@ -6,14 +6,14 @@ logic for managing budget entries, including viewing, adding, saving, deleting,
 and uploading budget entries.
 
 """
-import json
-
 import pandas as pd
 import streamlit as st
 
 from frontend.api.entries_api_client import EntriesAPIClient
 from frontend.apps.base_page import BasePage
 
+UPLOAD_TYPES = ['csv', 'gz', 'zst', 'parquet', 'feather', 'arrow']
+
 
 class EntriesPage(BasePage):  # noqa: WPS214
     """
@@ -54,16 +54,38 @@ class EntriesPage(BasePage):  # noqa: WPS214
 
     def _view_budget_entries(self) -> None:
         """Display the budget entries and allow users to make changes."""
-        entries = self.api.get_budget_entries()
-        if entries:
+        page = self.api.get_budget_entries(
+            cursor=st.session_state.get('entries_cursor'),
+        )
+        entries = pd.DataFrame(page.get('entries', []))
+        if not entries.empty:
             entries_table = st.data_editor(
                 entries,
                 column_config={'id': None},
                 num_rows='dynamic',
             )
             self._save_changes(entries=entries_table)
+            self._switch_page(next_cursor=page.get('next_cursor'))
             self._clean_data()
 
+    @classmethod
+    def _switch_page(cls, next_cursor: str | None) -> None:
+        """
+        Display buttons for switching pages of budget entries.
+
+        Parameters
+        ----------
+        next_cursor : str, optional
+            Cursor of the next page, or None if the page is the last one.
+
+        """
+        if next_cursor and st.button('Next page'):
+            st.session_state.entries_cursor = next_cursor
+            st.rerun()
+        if st.session_state.get('entries_cursor') and st.button('First page'):
+            st.session_state.entries_cursor = None
+            st.rerun()
+
     def _save_changes(self, entries: pd.DataFrame) -> None:
         """
         Save the changes made to the budget entries.
@@ -82,38 +104,39 @@ class EntriesPage(BasePage):  # noqa: WPS214
             is_full_row = self._check_full_row(entries=entries_df)
             if is_full_row:
                 response = self.api.save_changed_entries(
-                    entries=json.loads(
-                        entries_df.to_json(orient='records'),
-                    ),
+                    entries=entries_df,
                 )
                 self._rerun_after_success(response=response)
 
     def _upload_csv(self) -> None:
         """
-        Handle uploading and processing of a CSV file with budget entries.
+        Handle uploading and processing of a file with budget entries.
 
         This method is triggered when the 'Upload CSV' button is pressed.
-        It displays a file uploader for the user to upload a CSV file,
-        processes the file, and adds the entries from the file to the database.
+        It displays a file uploader for the user to upload a CSV file
+        (optionally compressed with gzip or zstd), a Parquet file
+        or a Feather file, processes the file, and adds the entries
+        from the file to the database.
         """
         upload = st.file_uploader(
-            'Upload CSV (sep: ";")',
-            type=['csv'],
+            'Upload CSV (sep: ";"), Parquet or Feather',
+            type=UPLOAD_TYPES,
         )
         if upload and 'uploaded_file' not in st.session_state:
             st.session_state['uploaded_file'] = upload
-            with st.spinner('Uploading and processing...'):
+            with st.spinner('Uploading...'):
                 entries_files = {
                     'uploaded_file': (
                         upload.name,
                         upload.read(),
-                        'text/csv',
+                        upload.type or 'text/csv',
                     ),
                 }
-                response = self.api.upload_entries_from_csv(
+                job = self.api.upload_entries_from_csv(
                     entries_files=entries_files,
                 )
-                self._rerun_after_success(response=response)
+            response = self.wait_for_job(api=self.api, job=job)
+            self._rerun_after_success(response=response)
 
     def _add_budget_entry(self) -> None:
         """
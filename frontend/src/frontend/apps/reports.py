@@ -48,6 +48,7 @@ class ReportsPage(BasePage):
             'expenses_per_category': 'Expenses Per Category',
             'expenses_per_interval': 'Expenses Per Time Interval',
         }
+        self._generate_all_reports(report_types=list(report_types))
         for report_type, report_name in report_types.items():
             st.subheader(report_name)
             self._generate_report(
@@ -59,6 +60,27 @@ class ReportsPage(BasePage):
                 report_type=report_type,
             )
 
+    def _generate_all_reports(self, report_types: list[str]) -> None:
+        """
+        Generate reports of all types from one data fetch.
+
+        This method is triggered when the "Generate All Reports" button
+        is clicked. It displays a success or error message.
+
+        Parameters
+        ----------
+        report_types : list of str
+            The types of reports that are sent in a generation request.
+
+        """
+        if st.button('Generate All Reports'):
+            reports_data = self.api.generate_reports(report_types)
+            if 'detail' in reports_data:
+                self.handle_response(response=reports_data)
+                st.error('Failed to generate reports.')
+            else:
+                st.success('Reports generated successfully.')
+
     def _generate_report(
         self,
         report_name: str,
@@ -79,7 +101,10 @@ class ReportsPage(BasePage):
 
         """
         if st.button(f'Generate {report_name}'):
-            report_data = self.api.generate_report(report_type)
+            report_data = self.wait_for_job(
+                api=self.api,
+                job=self.api.generate_report(report_type),
+            )
             self.handle_response(response=report_data)
             if 'detail' in report_data:
                 st.error('Failed to generate report.')